@@ -1,6 +1,4 @@
 from django.apps import AppConfig
-import sys
-import os
 
 
 class ApiConfig(AppConfig):
@@ -10,21 +8,8 @@ class ApiConfig(AppConfig):
     def ready(self):
         """
         Execute code when the app is ready.
-        """
-        import api.urls.countries
-        
-        # Check for the RUN_MAIN environment variable set by runserver.
-        is_runserver = 'runserver' in sys.argv
-        is_main_process = os.environ.get('RUN_MAIN') == 'true'
         
-        if is_runserver and is_main_process:
-            from api.utils.fetch_countries import populate_database
-            
-            
-            try:
-                # Populate the database with the initial data.
-                populate_database()
-            except Exception as e:
-                print(f"Error: Failed to populate the database: {e}")
-                sys.exit(1)
-                
\ No newline at end of file
+        Keep this free of I/O and heavy imports: it runs in every worker on
+        startup. Populate the database with `manage.py populate_countries`.
+        """
+        import api.signals  # noqa: F401  (registers signal receivers)
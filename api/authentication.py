@@ -0,0 +1,171 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from api.utils.metrics import CACHE_LOOKUPS
+
+
+class AsyncJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication with an async entry point for native async views.
+
+    Token parsing and validation are CPU-only and reused as is; the user is
+    loaded with the async ORM, so authenticating never blocks the event loop
+    or occupies a thread-pool slot.
+    """
+
+    async def aauthenticate(self, request):
+        """Async equivalent of authenticate().
+
+        Args:
+            request: A Django HttpRequest (or DRF Request).
+        Returns:
+            tuple: (user, validated token), or None without a bearer token.
+        Raises:
+            AuthenticationFailed: If the token or its user is not valid.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+
+    async def aget_user(self, validated_token):
+        """Async equivalent of get_user(), with the same checks and errors."""
+        user_id = self.get_user_id(validated_token)
+        try:
+            user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+        return self.check_user(user, validated_token)
+
+
+    def get_user_id(self, validated_token):
+        """Return the user id claim of a validated token."""
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+
+    def check_user(self, user, validated_token):
+        """Apply get_user()'s active and revoked-token checks to a loaded user."""
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
+
+
+class UserCache:
+    """Short-lived, in-process cache of user rows keyed by user id.
+
+    Ids are keyed by their string form, as token claims may carry either.
+
+    Entries expire after JWT_USER_CACHE_TTL seconds and are dropped as soon as
+    the user is saved or deleted in this process (see api.signals); other
+    processes pick such changes up when their entry expires. The least
+    recently used entries are evicted beyond JWT_USER_CACHE_MAX_ENTRIES.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+
+    def get(self, user_id):
+        """Return a copy of the cached user, or None if missing or expired."""
+        with self._lock:
+            user_id = str(user_id)
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[user_id]
+                entry = None
+            if entry is None:
+                CACHE_LOOKUPS.inc(cache="users", result="miss")
+                return None
+            user = entry[1]
+            self._entries.move_to_end(user_id)
+        CACHE_LOOKUPS.inc(cache="users", result="hit")
+        # Each request gets its own instance, so nothing a view sets on
+        # request.user leaks into other requests
+        return copy.copy(user)
+
+
+    def set(self, user_id, user):
+        """Cache a user row for JWT_USER_CACHE_TTL seconds."""
+        ttl = getattr(settings, "JWT_USER_CACHE_TTL", 60)
+        if ttl <= 0:
+            return
+        user_id = str(user_id)
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + ttl, copy.copy(user))
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > getattr(settings, "JWT_USER_CACHE_MAX_ENTRIES", 10000):
+                self._entries.popitem(last=False)
+
+
+    def discard(self, user_id):
+        """Drop a user's entry, e.g. after the user changed or was deleted."""
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+class CachedUserJWTAuthentication(AsyncJWTAuthentication):
+    """JWT authentication that serves the user row from user_cache.
+
+    Meant for read endpoints: the token signature, expiry, active flag and
+    revoked-token claim are checked on every request as usual, but the user
+    row is only loaded from the database once per JWT_USER_CACHE_TTL, so a
+    cached read costs no authentication query at all. A user deactivated or
+    given a new password in another process keeps access for at most the
+    TTL; writes should keep using JWTAuthentication.
+    """
+
+    def get_user(self, validated_token):
+        """Return the token's user, loading it from the database on a cache miss."""
+        user_id = self.get_user_id(validated_token)
+        user = user_cache.get(user_id)
+        if user is None:
+            try:
+                user = self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist as e:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+            user_cache.set(user_id, user)
+        return self.check_user(user, validated_token)
+
+
+    async def aget_user(self, validated_token):
+        """Async variant of get_user(), using the async ORM on a cache miss."""
+        user_id = self.get_user_id(validated_token)
+        user = user_cache.get(user_id)
+        if user is None:
+            try:
+                user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist as e:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+            user_cache.set(user_id, user)
+        return self.check_user(user, validated_token)
@@ -0,0 +1,387 @@
+import contextlib
+import io
+import json
+import logging
+import platform
+import random
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from api.authentication import user_cache
+from api.management.commands.load_test import percentile
+from api.models.countries_info import CountryInfo
+from api.utils.fetch_countries import populate_database
+from api.utils.response_cache import bump_version
+from api.utils.revocation import revoked_tokens
+from api.utils.synthetic import (
+    LANGUAGES,
+    SYLLABLES,
+    load_synthetic_countries,
+    stand_in_upstream,
+    write_synthetic_feed,
+)
+from api.views.countries_info import CountryInfoViewSet
+
+
+DEFAULT_SIZES = (250, 10000, 1000000)
+SCENARIOS = (
+    "list", "list_cached", "filter_language", "filter_name", "filter_region_country_id",
+    "detail", "write", "sync",
+)
+# Metrics compared against a baseline, and whether a higher value is better
+COMPARED_METRICS = {
+    "p50_ms": False,
+    "throughput": True,
+    "queries_per_request": False,
+    "peak_memory_kb": False,
+}
+
+
+@contextlib.contextmanager
+def isolated_database(directory):
+    """Run on a fresh, migrated database file instead of the configured one.
+
+    Aliases mirroring the default database (the production profile's reader)
+    are pointed at the same file, like the test runner does.
+    """
+    default = connections["default"]
+    mirrors = [
+        alias for alias in connections
+        if connections[alias].settings_dict.get("TEST", {}).get("MIRROR") == "default"
+    ]
+    saved = {alias: dict(connections[alias].settings_dict) for alias in mirrors}
+    default.settings_dict.setdefault("TEST", {})["NAME"] = str(Path(directory) / "benchmark.sqlite3")
+    old_name = default.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    for alias in mirrors:
+        connections[alias].creation.set_as_test_mirror(default.settings_dict)
+        connections[alias].close()
+    try:
+        yield
+    finally:
+        for alias in mirrors:
+            connections[alias].close()
+            connections[alias].settings_dict.update(saved[alias])
+        default.creation.destroy_test_db(old_name, verbosity=0)
+
+
+@contextlib.contextmanager
+def profiled():
+    """Count the queries on every connection and trace the peak allocation.
+
+    Yields:
+        dict: Filled with "queries" and "peak_bytes" on exit.
+    """
+    result = {}
+    with contextlib.ExitStack() as stack:
+        captures = [stack.enter_context(CaptureQueriesContext(connections[alias])) for alias in connections]
+        # Tracing slows everything down, so it is only on while profiling
+        tracemalloc.start()
+        try:
+            yield result
+        finally:
+            result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    result["queries"] = sum(len(capture) for capture in captures)
+
+
+def summarize(latencies, units, queries, peaks):
+    """Build a scenario's result from its timed latencies and profiled runs.
+
+    Args:
+        latencies (list): Seconds per timed operation.
+        units (int): Work items (requests or synced rows) the latencies cover.
+        queries (list): Query counts of the profiled operations.
+        peaks (list): Peak allocated bytes of the profiled operations.
+    Returns:
+        dict: Throughput (units per second), p50/p99 latency, mean queries
+        per operation and peak memory.
+    """
+    latencies = sorted(seconds * 1000 for seconds in latencies)
+    return {
+        "operations": len(latencies),
+        "throughput": round(units / (sum(latencies) / 1000), 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 0.5), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "queries_per_request": round(sum(queries) / len(queries), 2) if queries else 0.0,
+        "peak_memory_kb": round(max(peaks) / 1024, 1) if peaks else 0.0,
+    }
+
+
+def compare(results, baseline, threshold):
+    """List the metrics that regressed by more than threshold percent.
+
+    Query counts are deterministic for a given seed, so any increase counts.
+
+    Returns:
+        list: Human-readable regression descriptions.
+    """
+    regressions = []
+    for size, scenarios in results.items():
+        for scenario, metrics in scenarios.items():
+            previous = baseline.get(size, {}).get(scenario)
+            if not previous:
+                continue
+            for metric, higher_is_better in COMPARED_METRICS.items():
+                old, new = previous.get(metric), metrics.get(metric)
+                if not old or new is None:
+                    continue
+                if metric == "queries_per_request":
+                    worse = new > old
+                elif higher_is_better:
+                    worse = new < old / (1 + threshold / 100)
+                else:
+                    worse = new > old * (1 + threshold / 100)
+                if worse:
+                    change = (new - old) / old * 100
+                    regressions.append(f"{size} rows, {scenario}: {metric} {old} -> {new} ({change:+.1f}%)")
+    return regressions
+
+
+def git_commit():
+    """Return the current git commit, or None outside a checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark reads, filters, writes and the sync pipeline on synthetic datasets of several sizes "
+        "and record the results as JSON, optionally failing on regressions against a baseline file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+            help="Dataset sizes (rows) to benchmark; each runs on its own fresh database.",
+        )
+        parser.add_argument(
+            "--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS),
+            help="Scenarios to run.",
+        )
+        parser.add_argument(
+            "--requests", type=int, default=200,
+            help="Timed requests per scenario.",
+        )
+        parser.add_argument(
+            "--profile-requests", type=int, default=20,
+            help="Extra requests per scenario run under query capture and tracemalloc.",
+        )
+        parser.add_argument(
+            "--warmup", type=int, default=5,
+            help="Untimed requests per scenario before measuring.",
+        )
+        parser.add_argument(
+            "--sync-runs", type=int, default=3,
+            help="Timed syncs per size; each applies a new feed revision.",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0,
+            help="Seed of the datasets and request mix; keep it fixed to compare runs.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=5000,
+            help="Rows per insert when loading the datasets.",
+        )
+        parser.add_argument(
+            "--output", default=None,
+            help="Result file (default: var/benchmarks/<timestamp>-<commit>.json).",
+        )
+        parser.add_argument(
+            "--baseline", default=None,
+            help="Result file of an earlier run to compare against.",
+        )
+        parser.add_argument(
+            "--threshold", type=float, default=25.0,
+            help="Allowed slowdown in percent before a metric counts as a regression.",
+        )
+
+    def handle(self, *args, **kwargs):
+        if kwargs["requests"] < 1 or kwargs["profile_requests"] < 1 or kwargs["sync_runs"] < 1:
+            raise CommandError("--requests, --profile-requests and --sync-runs must be positive.")
+        if kwargs["threshold"] < 0:
+            raise CommandError("--threshold cannot be negative.")
+        baseline = None
+        if kwargs["baseline"]:
+            try:
+                baseline = json.loads(Path(kwargs["baseline"]).read_text())["results"]
+            except (OSError, ValueError, KeyError) as e:
+                raise CommandError(f"Cannot read the baseline {kwargs['baseline']}: {e}")
+
+        self.options = kwargs
+        commit = git_commit()
+        report = {
+            "meta": {
+                "commit": commit,
+                "timestamp": datetime.now(dt_timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "platform": platform.platform(),
+                "database_profile": getattr(settings, "DATABASE_PROFILE", "default"),
+                "seed": kwargs["seed"],
+                "requests": kwargs["requests"],
+                "profile_requests": kwargs["profile_requests"],
+                "sync_runs": kwargs["sync_runs"],
+            },
+            "results": {},
+        }
+
+        # Throttling would reject the benchmark's own traffic, and only the
+        # per-request log lines flagging a problem are worth printing
+        throttle_classes = CountryInfoViewSet.throttle_classes
+        CountryInfoViewSet.throttle_classes = []
+        request_logger = logging.getLogger("api.requests")
+        log_level = request_logger.level
+        request_logger.setLevel(max(log_level, logging.WARNING))
+        try:
+            for size in sorted(set(kwargs["sizes"])):
+                report["results"][str(size)] = self.run_size(size)
+        finally:
+            request_logger.setLevel(log_level)
+            CountryInfoViewSet.throttle_classes = throttle_classes
+
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = Path(kwargs["output"] or Path(settings.BASE_DIR) / "var" / "benchmarks" / f"{stamp}-{(commit or 'nogit')[:12]}.json")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2) + "\n")
+        self.stdout.write(f"Results written to {output}")
+
+        if baseline is not None:
+            regressions = compare(report["results"], baseline, kwargs["threshold"])
+            if regressions:
+                for regression in regressions:
+                    self.stderr.write(f"Regression: {regression}")
+                raise CommandError(f"{len(regressions)} metric(s) regressed by more than {kwargs['threshold']}%.")
+            self.stdout.write(self.style.SUCCESS(f"No regressions beyond {kwargs['threshold']}% against {kwargs['baseline']}."))
+
+    def run_size(self, size):
+        """Load a dataset of the given size into a fresh database and run every scenario on it."""
+        results = {}
+        with tempfile.TemporaryDirectory(prefix="countries-benchmark-") as directory, \
+                override_settings(ALLOWED_HOSTS=["testserver"], DEBUG=False,
+                                  COUNTRIES_SNAPSHOT_DIR=str(Path(directory) / "snapshots")), \
+                isolated_database(directory):
+            revoked_tokens.reset()
+            user_cache.clear()
+            started = time.perf_counter()
+            load_synthetic_countries(size, seed=self.options["seed"], batch_size=self.options["batch_size"])
+            self.stdout.write(f"{size} rows loaded in {time.perf_counter() - started:.1f} s")
+
+            user = get_user_model().objects.create_user(username="benchmark", password=None)
+            self.client = Client(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+            self.rng = random.Random(self.options["seed"])
+            self.ids = list(CountryInfo.objects.order_by("id").values_list("id", flat=True))
+
+            for scenario in self.options["scenarios"]:
+                if scenario == "sync":
+                    results[scenario] = self.run_sync(size, directory)
+                else:
+                    results[scenario] = self.run_requests(scenario)
+                self.report(size, scenario, results[scenario])
+            revoked_tokens.reset()
+            user_cache.clear()
+        return results
+
+    def build_request(self, scenario):
+        """Return (method, path, body, cached) for one request of a scenario."""
+        rng = self.rng
+        if scenario == "list":
+            pages = max(1, -(-len(self.ids) // 25))
+            return "get", f"/api/v1/countries/?page={rng.randint(1, pages)}", None, False
+        if scenario == "list_cached":
+            return "get", "/api/v1/countries/?page=1", None, True
+        if scenario == "filter_language":
+            return "get", f"/api/v1/countries/?language={rng.choice(LANGUAGES)[1]}", None, False
+        if scenario == "filter_name":
+            return "get", f"/api/v1/countries/?name={rng.choice(SYLLABLES)}", None, False
+        if scenario == "filter_region_country_id":
+            return "get", f"/api/v1/countries/?region_country_id={rng.choice(self.ids)}", None, False
+        if scenario == "detail":
+            return "get", f"/api/v1/countries/{rng.choice(self.ids)}/", None, False
+        body = {"population": rng.randint(1000, 1_400_000_000), "timezones": [f"UTC+{rng.randint(0, 12):02d}:00"]}
+        return "patch", f"/api/v1/countries/{rng.choice(self.ids)}/", body, False
+
+    def send(self, scenario):
+        """Send one request of a scenario.
+
+        Uncached scenarios invalidate the response cache first, outside the
+        timed section, so every timed request does the full database work.
+
+        Returns:
+            float: Seconds taken by the request.
+        """
+        method, path, body, cached = self.build_request(scenario)
+        if not cached:
+            bump_version()
+        started = time.perf_counter()
+        if method == "get":
+            response = self.client.get(path)
+        else:
+            response = self.client.patch(path, json.dumps(body), content_type="application/json")
+        elapsed = time.perf_counter() - started
+        if response.status_code != 200:
+            raise CommandError(f"{method.upper()} {path} answered {response.status_code}: {response.content[:200]!r}")
+        return elapsed
+
+    def run_requests(self, scenario):
+        """Warm up, time and then profile the requests of one scenario."""
+        for _ in range(self.options["warmup"]):
+            self.send(scenario)
+        latencies = [self.send(scenario) for _ in range(self.options["requests"])]
+        queries, peaks = [], []
+        for _ in range(self.options["profile_requests"]):
+            with profiled() as profile:
+                self.send(scenario)
+            queries.append(profile["queries"])
+            peaks.append(profile["peak_bytes"])
+        return summarize(latencies, len(latencies), queries, peaks)
+
+    def run_sync(self, size, directory):
+        """Time syncs of successive feed revisions served by a local stand-in upstream.
+
+        Each revision changes the population of 1% of the rows, so every sync
+        streams and compares the whole feed and writes a few changes. The
+        last revision is synced under query capture and tracemalloc.
+        """
+        feed_path = Path(directory) / "feed.json"
+        runs = self.options["sync_runs"]
+        latencies, queries, peaks = [], [], []
+        with stand_in_upstream(feed_path) as url:
+            for revision in range(1, runs + 2):
+                write_synthetic_feed(feed_path, size, seed=self.options["seed"], revision=revision)
+                with contextlib.redirect_stdout(io.StringIO()) as output:
+                    if revision <= runs:
+                        started = time.perf_counter()
+                        result = populate_database(source=url)
+                        latencies.append(time.perf_counter() - started)
+                    else:
+                        with profiled() as profile:
+                            result = populate_database(source=url)
+                        queries.append(profile["queries"])
+                        peaks.append(profile["peak_bytes"])
+                if not result or not result.get("updated"):
+                    raise CommandError(f"Sync of feed revision {revision} failed: {output.getvalue().strip()}")
+        result = summarize(latencies, size * len(latencies), queries, peaks)
+        result["throughput_unit"] = "rows/s"
+        return result
+
+    def report(self, size, scenario, result):
+        self.stdout.write(
+            f"{size:>8} {scenario:<26}{result['throughput']:>12.1f}/s"
+            f"{result['p50_ms']:>10.2f} p50{result['p99_ms']:>10.2f} p99"
+            f"{result['queries_per_request']:>8.1f} q{result['peak_memory_kb']:>10.1f} KiB"
+        )
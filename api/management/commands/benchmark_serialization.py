@@ -0,0 +1,96 @@
+import random
+import string
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from api.models.countries_info import CountryInfo
+from api.renderers import FastJSONRenderer
+from api.serializers.countries_info import (
+    CountryInfoSerializer,
+    country_read_fields,
+    serialize_country_rows,
+)
+from api.utils.synthetic import synthetic_countries
+
+
+DEFAULT_SIZES = (25, 100, 10000)
+
+
+class Rollback(Exception):
+    """Raised to discard the synthetic rows once the benchmark is done."""
+
+
+def best_of(repeat, func):
+    """Return the fastest of repeat runs of func, in seconds, and its result."""
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def unused_name_prefix():
+    """Return a random letters-only name prefix no country name starts with."""
+    while True:
+        prefix = "Bench" + "".join(random.choices(string.ascii_lowercase, k=8))
+        if not CountryInfo.objects.filter(name__startswith=prefix).exists():
+            return prefix
+
+
+class Command(BaseCommand):
+    help = "Compare the DRF serializer path with the fast read path for country list responses."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+            help="Page sizes (row counts) to benchmark.",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5,
+            help="Runs per measurement; the fastest is reported.",
+        )
+
+    def handle(self, *args, **kwargs):
+        sizes = sorted(set(kwargs["sizes"]))
+        repeat = max(1, kwargs["repeat"])
+        fields = country_read_fields()
+
+        # Synthetic rows are inserted in a transaction that is always rolled back
+        try:
+            with transaction.atomic():
+                # Names get a prefix no existing row uses, and codes are left
+                # blank, so the rows cannot clash with real or earlier rows
+                prefix = unused_name_prefix()
+                CountryInfo.objects.bulk_create(
+                    synthetic_countries(max(sizes), codes=False, prefix=prefix), batch_size=1000
+                )
+                queryset = CountryInfo.objects.filter(name__startswith=prefix).order_by("name")
+                for size in sizes:
+                    self.report(size, queryset[:size], fields, repeat)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def report(self, size, queryset, fields, repeat):
+        """Time both paths for one page size and check their output is identical."""
+        def drf_path():
+            rows = list(queryset.all())
+            return JSONRenderer().render(CountryInfoSerializer(rows, many=True).data)
+
+        def fast_path():
+            rows = queryset.values(*fields)
+            return FastJSONRenderer().render(serialize_country_rows(rows, fields))
+
+        drf_seconds, drf_body = best_of(repeat, drf_path)
+        fast_seconds, fast_body = best_of(repeat, fast_path)
+        if drf_body != fast_body:
+            raise CommandError(f"Fast path output differs from the serializer output at {size} rows.")
+
+        self.stdout.write(
+            f"{size:>6} rows: serializer {drf_seconds * 1000:8.2f} ms, "
+            f"fast path {fast_seconds * 1000:8.2f} ms, "
+            f"speedup {drf_seconds / fast_seconds:5.1f}x ({len(fast_body)} bytes, identical)"
+        )
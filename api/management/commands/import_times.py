@@ -0,0 +1,85 @@
+import os
+import subprocess
+import sys
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Imports the WSGI application and resolves the URLconf, i.e. everything a
+# worker loads before it can answer its first request.
+STARTUP_SCRIPT = (
+    "import os;"
+    "os.environ.setdefault('DJANGO_SETTINGS_MODULE', {settings_module!r});"
+    "import {wsgi_module};"
+    "from django.urls import get_resolver;"
+    "get_resolver().url_patterns"
+)
+PROJECT_PACKAGES = ("api", "countries_info_app")
+
+
+def parse_importtime(output):
+    """Parse the stderr output of `python -X importtime`.
+    
+    Args:
+        output (str): The raw stderr text.
+    Returns:
+        list: (module, self_us, cumulative_us, depth) tuples in import order.
+    """
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            module = name.strip()
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            rows.append((module, int(self_us), int(cumulative_us), depth))
+        except ValueError:
+            continue
+    return rows
+
+
+class Command(BaseCommand):
+    help = "Report per-module import time of a cold worker start (settings, WSGI app and URLconf)."
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit", type=int, default=20,
+            help="Number of slowest modules to list.",
+        )
+        parser.add_argument(
+            "--budget-ms", type=float, default=None,
+            help="Fail if the total import time exceeds this many milliseconds.",
+        )
+    
+    def handle(self, *args, **kwargs):
+        settings_module = os.environ.get("DJANGO_SETTINGS_MODULE", "countries_info_app.settings")
+        wsgi_module = settings.WSGI_APPLICATION.rsplit(".", 1)[0]
+        script = STARTUP_SCRIPT.format(settings_module=settings_module, wsgi_module=wsgi_module)
+        
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", script],
+            capture_output=True, text=True, cwd=settings.BASE_DIR,
+        )
+        wall_ms = (time.perf_counter() - started) * 1000
+        if result.returncode != 0:
+            raise CommandError(f"Startup import failed:\n{result.stderr[-2000:]}")
+        
+        rows = parse_importtime(result.stderr)
+        total_ms = sum(cumulative for _, _, cumulative, depth in rows if depth == 0) / 1000
+        
+        self.stdout.write(f"Total import time: {total_ms:.1f} ms (process wall time {wall_ms:.1f} ms)")
+        self.stdout.write(f"\nSlowest {kwargs['limit']} modules by cumulative time:")
+        for module, self_us, cumulative_us, _ in sorted(rows, key=lambda row: -row[2])[:kwargs["limit"]]:
+            self.stdout.write(f"  {cumulative_us / 1000:9.1f} ms  (self {self_us / 1000:7.1f} ms)  {module}")
+        
+        self.stdout.write("\nProject modules:")
+        for module, self_us, cumulative_us, _ in rows:
+            if module.split(".")[0] in PROJECT_PACKAGES:
+                self.stdout.write(f"  {cumulative_us / 1000:9.1f} ms  (self {self_us / 1000:7.1f} ms)  {module}")
+        
+        budget = kwargs["budget_ms"]
+        if budget is not None and total_ms > budget:
+            raise CommandError(f"Import time {total_ms:.1f} ms exceeds the budget of {budget:.1f} ms.")
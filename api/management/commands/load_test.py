@@ -0,0 +1,177 @@
+import asyncio
+import math
+import ssl
+import time
+from urllib.parse import urlsplit
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+
+def percentile(values, fraction):
+    """Return the nearest-rank percentile of an already sorted list."""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+async def timed_request(url, headers, slow_seconds):
+    """Issue one HTTP/1.1 GET on a fresh connection and time it to the last byte.
+
+    With slow_seconds, the request headers are sent in two parts with a pause
+    in between, like a client on a slow mobile link.
+
+    Returns:
+        tuple: (status code or None on a connection error, seconds elapsed).
+    """
+    parts = urlsplit(url)
+    secure = parts.scheme == "https"
+    port = parts.port or (443 if secure else 80)
+    target = parts.path or "/"
+    if parts.query:
+        target += f"?{parts.query}"
+    head = f"GET {target} HTTP/1.1\r\nHost: {parts.netloc}\r\n".encode("ascii")
+    rest = "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+    rest = f"{rest}Connection: close\r\n\r\n".encode("latin-1")
+
+    started = time.perf_counter()
+    try:
+        reader, writer = await asyncio.open_connection(
+            parts.hostname, port, ssl=ssl.create_default_context() if secure else None
+        )
+        try:
+            writer.write(head)
+            if slow_seconds:
+                await writer.drain()
+                await asyncio.sleep(slow_seconds)
+            writer.write(rest)
+            await writer.drain()
+            status_line = await reader.readline()
+            await reader.read()
+        finally:
+            writer.close()
+        status = int(status_line.split()[1])
+    except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+        status = None
+    return status, time.perf_counter() - started
+
+
+async def run_load(url, headers, total, concurrency, slow_seconds):
+    """Send total requests with at most concurrency in flight.
+
+    Returns:
+        tuple: (list of (status, seconds), wall-clock seconds).
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            return await timed_request(url, headers, slow_seconds)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(one() for _ in range(total)))
+    return results, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test running deployments and compare requests/sec and latency percentiles, "
+        "e.g. a WSGI and an ASGI server started from the same code. The default throttle "
+        "rates reject most of a load test with 429; start the targets with raised rates "
+        "(COUNTRIES_THROTTLE_RATE, COUNTRIES_THROTTLE_USER_RATE, COUNTRIES_THROTTLE_ANON_RATE). "
+        "Throttled responses are counted apart and left out of the latencies."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target", action="append", required=True, metavar="NAME=BASE_URL",
+            help="Deployment to test, e.g. wsgi=http://127.0.0.1:8000 (repeatable).",
+        )
+        parser.add_argument(
+            "--path", default="/api/v1/countries/?page_size=25",
+            help="Request path (with query string) appended to each base URL.",
+        )
+        parser.add_argument(
+            "--requests", type=int, default=2000,
+            help="Number of requests per target.",
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=200,
+            help="Maximum number of requests in flight.",
+        )
+        parser.add_argument(
+            "--slow-client-ms", type=int, default=0,
+            help="Pause between the request line and the rest of the headers, simulating slow clients.",
+        )
+        parser.add_argument(
+            "--user", default=None,
+            help="Username to mint a JWT access token for (the endpoints require authentication).",
+        )
+        parser.add_argument(
+            "--token", default=None,
+            help="JWT access token to send instead of minting one.",
+        )
+        parser.add_argument(
+            "--warmup", type=int, default=20,
+            help="Requests sent to each target before measuring.",
+        )
+
+    def handle(self, *args, **kwargs):
+        targets = []
+        for target in kwargs["target"]:
+            name, sep, base_url = target.partition("=")
+            if not sep or not base_url.startswith(("http://", "https://")):
+                raise CommandError(f"Invalid target {target!r}; expected NAME=http(s)://host:port.")
+            targets.append((name, base_url.rstrip("/") + kwargs["path"]))
+        if kwargs["requests"] < 1 or kwargs["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be positive.")
+
+        headers = {"Accept": "application/json"}
+        token = kwargs["token"] or self.mint_token(kwargs["user"])
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        slow_seconds = kwargs["slow_client_ms"] / 1000
+
+        self.stdout.write(
+            f"{kwargs['requests']} requests per target, concurrency {kwargs['concurrency']}, "
+            f"slow client pause {kwargs['slow_client_ms']} ms"
+        )
+        self.stdout.write(
+            f"{'target':<12}{'req/s':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+            f"{'429':>8}{'errors':>8}"
+        )
+        throttled_targets = []
+        for name, url in targets:
+            if kwargs["warmup"]:
+                asyncio.run(run_load(url, headers, kwargs["warmup"], kwargs["concurrency"], 0))
+            results, elapsed = asyncio.run(
+                run_load(url, headers, kwargs["requests"], kwargs["concurrency"], slow_seconds)
+            )
+            # Only successful responses are timed: a 429 is answered before
+            # any of the work being measured
+            latencies = sorted(seconds * 1000 for status, seconds in results if status == 200)
+            throttled = sum(1 for status, _ in results if status == 429)
+            errors = len(results) - len(latencies) - throttled
+            self.stdout.write(
+                f"{name:<12}{len(latencies) / elapsed:>10.1f}{percentile(latencies, 0.5):>10.1f}"
+                f"{percentile(latencies, 0.9):>10.1f}{percentile(latencies, 0.99):>10.1f}"
+                f"{(latencies[-1] if latencies else 0.0):>10.1f}{throttled:>8}{errors:>8}"
+            )
+            if throttled:
+                throttled_targets.append(name)
+        if throttled_targets:
+            self.stdout.write(self.style.WARNING(
+                f"Throttled requests on {', '.join(throttled_targets)}: restart the servers with higher "
+                "COUNTRIES_THROTTLE_RATE and COUNTRIES_THROTTLE_USER_RATE (e.g. 100000/s) to measure them."
+            ))
+
+    def mint_token(self, username):
+        """Return an access token for the given user, or None without a username."""
+        if not username:
+            return None
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        try:
+            user = get_user_model().objects.get(username=username)
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User {username!r} does not exist.")
+        return str(RefreshToken.for_user(user).access_token)
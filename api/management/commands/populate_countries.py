@@ -1,12 +1,49 @@
 from django.core.management.base import BaseCommand
-from api.utils.fetch_countries import populate_database
+from api.utils.fetch_countries import DEFAULT_BATCH_SIZE, populate_database
 
 
 class Command(BaseCommand):
     help = "Populate the database with country information from the API."
     
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+            help="Number of records written per bulk operation.",
+        )
+        parser.add_argument(
+            "--no-stream", action="store_true",
+            help="Load the whole payload and preprocess it with pandas instead of streaming.",
+        )
+        parser.add_argument(
+            "--source", default=None,
+            help="URL or local file path of the feed (defaults to COUNTRIES_API_URL).",
+        )
+        parser.add_argument(
+            "--force", action="store_true",
+            help="Sync even if the upstream payload has not changed since the last sync.",
+        )
+    
     def handle(self, *args, **kwargs):
         self.stdout.write("Starting database population...")
-        populate_database()
+        report = populate_database(
+            stream=not kwargs["no_stream"],
+            batch_size=kwargs["batch_size"],
+            source=kwargs["source"],
+            force=kwargs["force"],
+        )
+        if report is None:
+            self.stdout.write(self.style.ERROR("Database population failed."))
+            return
+        
+        timings = ", ".join(f"{stage}: {seconds:.3f}s" for stage, seconds in report["timings"].items())
+        self.stdout.write(
+            f"Feed: {report['feed_status']} ({report['fetched_bytes']} bytes). "
+            f"Created: {report['created']}, Updated: {report['updated']}, "
+            f"Unchanged: {report['unchanged']}, Deactivated: {report['deactivated']}, "
+            f"Rejected: {report['rejected']}"
+        )
+        for rejected in report["errors"]:
+            self.stdout.write(self.style.WARNING(f"Rejected {rejected['name']!r}: {rejected['errors']}"))
+        self.stdout.write(f"Timings: {timings}")
         self.stdout.write(self.style.SUCCESS("Database population completed successfully."))
     
\ No newline at end of file
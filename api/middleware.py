@@ -0,0 +1,162 @@
+import json
+import logging
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from api.utils.instrumentation import end_request, resume_request, start_request
+from api.utils.metrics import REQUEST_DURATION, REQUESTS_IN_FLIGHT
+
+
+logger = logging.getLogger("api.requests")
+
+# Longest SQL template quoted in a log line
+MAX_LOGGED_SQL = 200
+
+
+class RequestInstrumentationMiddleware:
+    """Measure every request's SQL, serialization and total time.
+
+    Each response gets a Server-Timing header (db, auth, lookup, serialize,
+    render and total durations in milliseconds, with the query count), and
+    one JSON log line is written to the "api.requests" logger: at INFO
+    normally, at WARNING when the request ran more than
+    REQUEST_QUERY_BUDGET queries or repeated one SQL template at least
+    REQUEST_REPEATED_QUERY_THRESHOLD times (an N+1 pattern).
+
+    Queries are counted by a connection execute wrapper and phases by
+    instrumentation.timed(), so the cost is a few counter updates per query
+    and does not depend on DEBUG. Place it first in MIDDLEWARE so the total
+    covers the other middleware. Set REQUEST_SERVER_TIMING to False to keep
+    the timings out of the responses.
+
+    It also feeds the request metrics (latency histogram by route, method and
+    status, requests in flight) exposed by the metrics view.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        metrics, token = start_request()
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            response = self.get_response(request)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            end_request(token)
+        self.finish(request, response, metrics)
+        return response
+
+
+    async def __acall__(self, request):
+        metrics, token = start_request()
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            response = await self.get_response(request)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            end_request(token)
+        self.finish(request, response, metrics)
+        return response
+
+
+    def finish(self, request, response, metrics):
+        """Add the Server-Timing header, and record the request once its body is produced.
+
+        A streaming response produces its body (and runs its queries) after
+        the view returned, so its chunks are generated with the request's
+        metrics active and the request is recorded when the stream ends; its
+        Server-Timing header can only cover the time until then.
+        """
+        if getattr(settings, "REQUEST_SERVER_TIMING", True):
+            durations = {**metrics.spans, "total": metrics.elapsed()}
+            entries = [f'db;dur={metrics.sql_seconds * 1000:.1f};desc="{metrics.queries} queries"']
+            entries.extend(f"{name};dur={seconds * 1000:.1f}" for name, seconds in durations.items())
+            response["Server-Timing"] = ", ".join(entries)
+
+        if not response.streaming:
+            self.record(request, response, metrics)
+        elif response.is_async:
+            response.streaming_content = self.ameasure_stream(request, response, metrics, response.streaming_content)
+        else:
+            response.streaming_content = self.measure_stream(request, response, metrics, response.streaming_content)
+
+
+    def measure_stream(self, request, response, metrics, content):
+        """Yield a sync response's chunks with the request's metrics active."""
+        content = iter(content)
+        try:
+            while True:
+                token = resume_request(metrics)
+                try:
+                    chunk = next(content, None)
+                finally:
+                    end_request(token)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            self.record(request, response, metrics)
+
+
+    async def ameasure_stream(self, request, response, metrics, content):
+        """Yield an async response's chunks with the request's metrics active."""
+        content = aiter(content)
+        try:
+            while True:
+                # sync_to_async copies the context, so queries run in the
+                # sync thread are counted too
+                token = resume_request(metrics)
+                try:
+                    chunk = await anext(content, None)
+                finally:
+                    end_request(token)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            self.record(request, response, metrics)
+
+
+    def record(self, request, response, metrics):
+        """Observe the request's latency and write its log line."""
+        total = metrics.elapsed()
+        durations = {"db": metrics.sql_seconds, **metrics.spans, "total": total}
+        # The URL pattern, not the path, so the label values stay bounded
+        route = getattr(getattr(request, "resolver_match", None), "route", None) or "unmatched"
+        REQUEST_DURATION.observe(total, route=route, method=request.method, status=response.status_code)
+
+        budget = getattr(settings, "REQUEST_QUERY_BUDGET", 20)
+        repeated = metrics.repeated_statements(getattr(settings, "REQUEST_REPEATED_QUERY_THRESHOLD", 5))
+        flags = []
+        if metrics.queries > budget:
+            flags.append("query_budget")
+        if repeated:
+            flags.append("n_plus_one")
+
+        level = logging.WARNING if flags else logging.INFO
+        if not logger.isEnabledFor(level):
+            return
+        entry = {
+            "method": request.method,
+            "path": request.path,
+            "route": route,
+            "status": response.status_code,
+            "queries": metrics.queries,
+            **{f"{name}_ms": round(seconds * 1000, 2) for name, seconds in durations.items()},
+        }
+        if flags:
+            entry["flags"] = flags
+            entry["query_budget"] = budget
+            entry["repeated_queries"] = [
+                {"sql": sql[:MAX_LOGGED_SQL], "count": count} for sql, count in repeated[:3]
+            ]
+        logger.log(level, json.dumps(entry))
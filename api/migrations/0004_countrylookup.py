@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# A frozen copy of api.utils.lookups.iter_lookup_values as of this migration,
+# so later changes to the app code cannot change what this backfill does.
+LOOKUP_FIELDS = {'language': 'languages', 'currency': 'currencies', 'timezone': 'timezones'}
+
+
+def iter_lookup_values(country):
+    """Yield the unique (kind, normalized value) pairs derived from a country."""
+    seen = set()
+    for kind, field in LOOKUP_FIELDS.items():
+        for item in getattr(country, field, None) or []:
+            if isinstance(item, dict):
+                item = item.get('name', '')
+            value = ' '.join(str(item).split()).casefold()[:200]
+            if value and (kind, value) not in seen:
+                seen.add((kind, value))
+                yield kind, value
+
+
+def backfill_lookups(apps, schema_editor):
+    """Build lookup rows for the countries that already exist."""
+    CountryInfo = apps.get_model('api', 'CountryInfo')
+    CountryLookup = apps.get_model('api', 'CountryLookup')
+    CountryLookup.objects.bulk_create([
+        CountryLookup(country_id=country.pk, kind=kind, value=value)
+        for country in CountryInfo.objects.only('languages', 'currencies', 'timezones').iterator()
+        for kind, value in iter_lookup_values(country)
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_countryinfo_is_active_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CountryLookup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('language', 'Language'), ('currency', 'Currency'), ('timezone', 'Timezone')], max_length=10)),
+                ('value', models.CharField(max_length=200)),
+                ('country', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lookups', to='api.countryinfo')),
+            ],
+            options={
+                'verbose_name_plural': 'Country Lookups',
+                'indexes': [models.Index(fields=['kind', 'value'], name='api_country_kind_063746_idx')],
+                'constraints': [models.UniqueConstraint(fields=('country', 'kind', 'value'), name='unique_country_lookup')],
+            },
+        ),
+        migrations.RunPython(backfill_lookups, migrations.RunPython.noop),
+    ]
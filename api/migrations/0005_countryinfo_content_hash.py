@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:54
+
+import hashlib
+import json
+
+from django.db import migrations, models
+
+
+# A frozen copy of api.models.countries_info.compute_content_hash as of this
+# migration, so later changes to the app code cannot change this backfill.
+CONTENT_FIELDS = (
+    'name', 'cca2', 'capital', 'region', 'subregion', 'population', 'area',
+    'languages', 'currencies', 'timezones', 'flag',
+)
+
+
+def compute_content_hash(data):
+    """Compute the SHA-256 hex digest over the content fields of a country."""
+    payload = json.dumps(
+        [data.get(field) for field in CONTENT_FIELDS],
+        sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def backfill_content_hashes(apps, schema_editor):
+    """Compute the content hash of the countries that already exist."""
+    CountryInfo = apps.get_model('api', 'CountryInfo')
+    countries = list(CountryInfo.objects.all())
+    for country in countries:
+        country.content_hash = compute_content_hash(
+            {field: getattr(country, field) for field in CONTENT_FIELDS}
+        )
+    CountryInfo.objects.bulk_update(countries, ['content_hash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_countrylookup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='countryinfo',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.RunPython(backfill_content_hashes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:10
+
+from django.db import migrations, models
+
+
+# A frozen copy of api.utils.region_stats.compute_group_stats as of this
+# migration, so later changes to the app code cannot change this backfill.
+STAT_FIELDS = ('id', 'name', 'region', 'subregion', 'population', 'area', 'is_active')
+
+# Extreme member label -> (field, True for the maximum / False for the minimum)
+EXTREMES = {
+    'largest': ('area', True),
+    'smallest': ('area', False),
+    'most_populous': ('population', True),
+    'least_populous': ('population', False),
+}
+
+
+def offer_member(extremes, member):
+    """Record member as an extreme wherever it beats the current one (ties go to the first name)."""
+    for label, (field, maximum) in EXTREMES.items():
+        current = extremes.get(label)
+        if (
+            current is None
+            or (member[field] != current[field] and (member[field] > current[field]) == maximum)
+            or (member[field] == current[field] and member['name'] < current['name'])
+        ):
+            extremes[label] = member
+
+
+def compute_group_stats(rows):
+    """Aggregate country rows into stats per (scope, region, subregion)."""
+    groups = {}
+    for row in rows:
+        member = {'id': row['id'], 'name': row['name'], 'area': row['area'], 'population': row['population']}
+        scopes = ('all', 'active') if row['is_active'] else ('all',)
+        for scope in scopes:
+            stats = groups.setdefault(
+                (scope, row['region'], row['subregion']),
+                {'countries': 0, 'population': 0, 'area': 0.0, 'extremes': {}},
+            )
+            stats['countries'] += 1
+            stats['population'] += row['population']
+            stats['area'] += row['area']
+            offer_member(stats['extremes'], member)
+    return groups
+
+
+def backfill_region_stats(apps, schema_editor):
+    """Compute the region stats of the countries that already exist."""
+    CountryInfo = apps.get_model('api', 'CountryInfo')
+    RegionStats = apps.get_model('api', 'RegionStats')
+    groups = compute_group_stats(CountryInfo.objects.values(*STAT_FIELDS).iterator())
+    RegionStats.objects.bulk_create([
+        RegionStats(scope=scope, region=region, subregion=subregion, **stats)
+        for (scope, region, subregion), stats in groups.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_countryinfo_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegionStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('region', models.CharField(blank=True, default='', max_length=200)),
+                ('subregion', models.CharField(blank=True, default='', max_length=200)),
+                ('scope', models.CharField(choices=[('active', 'Active countries'), ('all', 'All countries')], max_length=10)),
+                ('countries', models.PositiveIntegerField(default=0)),
+                ('population', models.BigIntegerField(default=0)),
+                ('area', models.FloatField(default=0.0)),
+                ('extremes', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Region Stats',
+                'ordering': ['region', 'subregion'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='regionstats',
+            constraint=models.UniqueConstraint(fields=('scope', 'region', 'subregion'), name='unique_region_stats'),
+        ),
+        migrations.RunPython(backfill_region_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_region_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='countryinfo',
+            index=models.Index(fields=['region', 'subregion'], name='api_country_region_f691f4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='countryinfo',
+            index=models.Index(fields=['subregion'], name='api_country_subregi_e65935_idx'),
+        ),
+    ]
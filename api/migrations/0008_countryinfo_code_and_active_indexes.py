@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:26
+
+from django.db import migrations, models
+
+
+def clear_duplicate_codes(apps, schema_editor):
+    """Keep each non-empty cca2 on one row (active first, then oldest) so it can be made unique."""
+    CountryInfo = apps.get_model('api', 'CountryInfo')
+    seen = set()
+    duplicates = []
+    for pk, cca2 in CountryInfo.objects.exclude(cca2='').order_by('-is_active', 'id').values_list('id', 'cca2'):
+        if cca2 in seen:
+            duplicates.append(pk)
+        seen.add(cca2)
+    if duplicates:
+        CountryInfo.objects.filter(id__in=duplicates).update(cca2='')
+        print(f"Cleared duplicate cca2 codes on {len(duplicates)} countries.")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_countryinfo_subregion_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='countryinfo',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['name', 'id'], name='countryinfo_active_name_idx'),
+        ),
+        migrations.RunPython(clear_duplicate_codes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='countryinfo',
+            constraint=models.UniqueConstraint(condition=models.Q(('cca2', ''), _negated=True), fields=('cca2',), name='countryinfo_unique_cca2'),
+        ),
+    ]
@@ -1,6 +1,10 @@
 from api.models.countries_info import CountryInfo
+from api.models.country_lookups import CountryLookup
+from api.models.region_stats import RegionStats
 
 
 __all__ = [
     "CountryInfo",
+    "CountryLookup",
+    "RegionStats",
 ]
\ No newline at end of file
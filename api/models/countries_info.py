@@ -1,6 +1,30 @@
+import hashlib
+import json
 from django.db import models
 
 
+# Fields sourced from the upstream API; their values make up the content hash.
+CONTENT_FIELDS = (
+    "name", "cca2", "capital", "region", "subregion", "population", "area",
+    "languages", "currencies", "timezones", "flag",
+)
+
+
+def compute_content_hash(data):
+    """Compute a stable SHA-256 hash over the content fields of a country.
+    
+    Args:
+        data (dict): Country values keyed by field name.
+    Returns:
+        str: The hex digest.
+    """
+    payload = json.dumps(
+        [data.get(field) for field in CONTENT_FIELDS],
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
 class CountryInfo(models.Model):
     """Model to store country information.
     This model stores information about countries, including their name, capital,
@@ -28,11 +52,58 @@ class CountryInfo(models.Model):
     # Add a field for soft deletion
     is_active = models.BooleanField(default=True)
     
+    # Hash of the content fields, used by the sync job to detect changed rows
+    content_hash = models.CharField(max_length=64, blank=True, default="", editable=False)
+    
     def __str__(self):
         return self.name
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the (region, subregion) group a row was loaded in.
+        
+        Lets region stats refresh the old group after a row moves. None when
+        either column was deferred.
+        """
+        instance = super().from_db(db, field_names, values)
+        loaded = instance.__dict__
+        instance._loaded_group = (
+            (loaded["region"], loaded["subregion"]) if "region" in loaded and "subregion" in loaded else None
+        )
+        return instance
+    
+    def refresh_content_hash(self):
+        """Recompute content_hash from the current field values."""
+        self.content_hash = compute_content_hash(
+            {field: getattr(self, field) for field in CONTENT_FIELDS}
+        )
+    
+    def save(self, *args, **kwargs):
+        """Refresh the content hash before saving."""
+        self.refresh_content_hash()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "content_hash"}
+        super().save(*args, **kwargs)
+    
     
     class Meta:
-        indexes = [models.Index(fields=["name"])]
+        indexes = [
+            models.Index(fields=["name"]),
+            models.Index(fields=["region", "subregion"]),
+            models.Index(fields=["subregion"]),
+            # Active rows in (name, id) order: the default listing and its
+            # keyset pagination
+            models.Index(
+                fields=["name", "id"], condition=models.Q(is_active=True), name="countryinfo_active_name_idx"
+            ),
+        ]
+        constraints = [
+            # ISO codes identify countries for partner integrations and the
+            # code lookup endpoint; rows without a code are exempt
+            models.UniqueConstraint(
+                fields=["cca2"], condition=~models.Q(cca2=""), name="countryinfo_unique_cca2"
+            ),
+        ]
         verbose_name_plural = "Country Info"
         ordering = ["name"]
\ No newline at end of file
@@ -0,0 +1,36 @@
+from django.db import models
+from api.models.countries_info import CountryInfo
+
+
+class CountryLookup(models.Model):
+    """Model to store normalized language, currency and timezone values.
+    
+    Each row maps one casefolded value from a country's languages, currencies
+    or timezones JSON field to that country, so filters on those values become
+    exact, index-backed lookups instead of scans over serialized JSON. Rows are
+    maintained from CountryInfo writes and by populate_database.
+    """
+    
+    LANGUAGE = "language"
+    CURRENCY = "currency"
+    TIMEZONE = "timezone"
+    KIND_CHOICES = [
+        (LANGUAGE, "Language"),
+        (CURRENCY, "Currency"),
+        (TIMEZONE, "Timezone"),
+    ]
+    
+    country = models.ForeignKey(CountryInfo, on_delete=models.CASCADE, related_name="lookups")
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    value = models.CharField(max_length=200)
+    
+    def __str__(self):
+        return f"{self.kind}: {self.value}"
+    
+    
+    class Meta:
+        indexes = [models.Index(fields=["kind", "value"])]
+        constraints = [
+            models.UniqueConstraint(fields=["country", "kind", "value"], name="unique_country_lookup"),
+        ]
+        verbose_name_plural = "Country Lookups"
@@ -0,0 +1,41 @@
+from django.db import models
+
+
+class RegionStats(models.Model):
+    """Model to store precomputed aggregates per region and subregion.
+    
+    Each row summarizes the countries of one (region, subregion) group, either
+    the active ones only or all of them including soft-deleted rows. Rows are
+    refreshed for just the groups touched by each CountryInfo write, so stats
+    reads never scan the country table.
+    """
+    
+    ACTIVE = "active"
+    ALL = "all"
+    SCOPE_CHOICES = [
+        (ACTIVE, "Active countries"),
+        (ALL, "All countries"),
+    ]
+    
+    region = models.CharField(max_length=200, blank=True, default="")
+    subregion = models.CharField(max_length=200, blank=True, default="")
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES)
+    countries = models.PositiveIntegerField(default=0)
+    population = models.BigIntegerField(default=0)
+    area = models.FloatField(default=0.0)
+    
+    # Largest / smallest (by area) and most / least populous members, as
+    # {"largest": {"id": ..., "name": ..., "area": ..., "population": ...}, ...}
+    extremes = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.region} / {self.subregion} ({self.scope})"
+    
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "region", "subregion"], name="unique_region_stats"),
+        ]
+        verbose_name_plural = "Region Stats"
+        ordering = ["region", "subregion"]
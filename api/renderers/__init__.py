@@ -0,0 +1,6 @@
+from api.renderers.fast_json import FastJSONRenderer
+
+
+__all__ = [
+    "FastJSONRenderer",
+]
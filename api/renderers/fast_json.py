@@ -0,0 +1,81 @@
+from decimal import Decimal
+from rest_framework.renderers import JSONRenderer
+from api.utils.instrumentation import timed
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+# Types orjson would otherwise encode natively are handed to the DRF
+# encoder's default() instead, so they are formatted the same way.
+PASSTHROUGH = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_SUBCLASS
+    if orjson is not None else 0
+)
+
+
+class CheckedList(list):
+    """A list whose items were already checked for ambiguous floats.
+
+    has_ambiguous_float trusts ambiguous_float instead of walking the items,
+    so a serializer that knows which of its columns can hold a float checks
+    only those, once, and cached data is not walked again on every response.
+    """
+
+    ambiguous_float = False
+
+
+def has_ambiguous_float(data):
+    """Return True if data holds a float orjson formats differently.
+    
+    orjson writes floats below 1e-4 in plain notation and exponents without a
+    sign (the stdlib writes e.g. 1e-05 / 1e+16), and encodes NaN and infinity
+    as null where the stdlib raises. Such data is rendered by the stdlib.
+    """
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if value and not 1e-4 <= abs(value) < 1e16:
+                return True
+        elif isinstance(value, Decimal):
+            # May be encoded as a float by the encoder's default()
+            return True
+        elif isinstance(value, CheckedList):
+            if value.ambiguous_float:
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSON renderer backed by orjson when it is installed.
+    
+    Produces byte-identical output to DRF's JSONRenderer with the default
+    settings (compact, unescaped unicode, U+2028/U+2029 escaped), falling back
+    to it for indented output, non-default settings, values orjson cannot
+    encode identically, or when orjson is not available.
+    """
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timed("render"):
+            if (
+                orjson is None
+                or data is None
+                or not self.compact
+                or self.ensure_ascii
+                or self.get_indent(accepted_media_type, renderer_context or {})
+                or has_ambiguous_float(data)
+            ):
+                return super().render(data, accepted_media_type, renderer_context)
+            
+            try:
+                body = orjson.dumps(data, default=self.encoder_class().default, option=PASSTHROUGH)
+            except TypeError:
+                return super().render(data, accepted_media_type, renderer_context)
+            return body.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
@@ -0,0 +1,40 @@
+from django.db import transaction
+
+
+class ReadConnectionRouter:
+    """Route reads of the api models to the read-only 'reader' connection.
+
+    Both aliases open the same SQLite file in WAL mode, so the reader sees
+    every committed write at once and never waits for the writer. Reads made
+    while the writer is inside a transaction (the sync job, bulk writes,
+    stats refreshes) stay on the writer so they see the transaction's own
+    uncommitted rows. All writes and migrations use the writer.
+    """
+
+    reader = "reader"
+    writer = "default"
+    route_app_labels = {"api"}
+
+
+    def db_for_read(self, model, **hints):
+        """Use the reader unless the writer is inside an atomic block."""
+        if model._meta.app_label not in self.route_app_labels:
+            return None
+        if transaction.get_connection(self.writer).in_atomic_block:
+            return self.writer
+        return self.reader
+
+
+    def db_for_write(self, model, **hints):
+        """Always write through the writer."""
+        return self.writer
+
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Both aliases are the same database."""
+        return True
+
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """Only migrate through the writer."""
+        return db == self.writer
@@ -1,6 +1,7 @@
-from api.serializers.countries_info import CountryInfoSerializer
+from api.serializers.countries_info import CountryInfoBulkItemSerializer, CountryInfoSerializer
 
 
 __all__ = [
+    "CountryInfoBulkItemSerializer",
     "CountryInfoSerializer",
 ]
\ No newline at end of file
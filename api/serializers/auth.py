@@ -1,6 +1,12 @@
 from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
+from django.utils.translation import gettext_lazy as _
+from api.tokens import RevocableRefreshToken
 
 
 
@@ -119,3 +125,48 @@ class LoginSerializer(serializers.Serializer):
         
         data['user']=user
         return data
+        
+        
+        
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    """Token refresh serializer backed by the in-process revocation list.
+    
+    Same behaviour as simplejwt's TokenRefreshSerializer, but the revocation
+    check is answered by revoked_tokens and rotating a token is a couple of
+    indexed inserts regardless of how many tokens have been blacklisted. The
+    user is always read from the database, never from the JWT user cache, so
+    a user deactivated in any process cannot refresh their tokens. A refresh
+    token replayed while it is being rotated is rejected, as only one
+    blacklist insert can succeed.
+    """
+    
+    
+    token_class = RevocableRefreshToken
+    
+    
+    def validate(self, attrs):
+        """Issue a new access token (and a rotated refresh token)."""
+        refresh = self.token_class(attrs["refresh"])
+        
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        if user_id:
+            user = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+            if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+                raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+        
+        data = {"access": str(refresh.access_token)}
+        
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                blacklisted, revoked = refresh.blacklist()
+                if not revoked:
+                    raise TokenError(_("Token is blacklisted"))
+            
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+            
+            data["refresh"] = str(refresh)
+        
+        return data
@@ -1,6 +1,13 @@
+from functools import lru_cache
+from django.conf import settings
+from django.utils import timezone
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
 from rest_framework import serializers
 from api.models.countries_info import CountryInfo
-import re
+from api.renderers.fast_json import CheckedList, has_ambiguous_float
+from api.utils.instrumentation import timed
+from api.utils.validation import api_validator
 
 class CountryInfoSerializer(serializers.ModelSerializer):
     """Serializer for the CountryInfo model.
@@ -8,111 +15,112 @@ class CountryInfoSerializer(serializers.ModelSerializer):
     Converts CountryInfo model instances to/from JSON and validates data for
     creating or updating instances. Ensures data aligns with API-sourced country
     information and model constraints.
-    """
-    
-    def validate_name(self, value):
-        """Validate the country name."""
-        if not value:
-            raise serializers.ValidationError("Country name cannot be empty.")
-        if len(value.strip()) < 2:
-            raise serializers.ValidationError("Country name must be at least 2 characters long.")
-        # Allow letters, spaces, apostrophes, hyphens, and basic punctuation
-        if not re.match(r'^[a-zA-Z\s\'\-\,\.]+$', value):
-            raise serializers.ValidationError("Country name can only contain letters, spaces, apostrophes, hyphens, commas, or periods.")
-        return value
-    
-    def validate_capital(self, value):
-        """Validate the capital name."""
-        if value and not re.match(r'^[a-zA-Z\s\'\-\,\.]+$', value):
-            raise serializers.ValidationError("Capital name can only contain letters, spaces, apostrophes, hyphens, commas, or periods.")
-        return value or ""
-    
-    def validate_region(self, value):
-        """Validate the region name."""
-        if value and not re.match(r'^[a-zA-Z\s\'\-\,\.]+$', value):
-            raise serializers.ValidationError("Region name can only contain letters, spaces, apostrophes, hyphens, commas, or periods.")
-        return value or ""
-    
-    def validate_subregion(self, value):
-        """Validate the subregion name."""
-        if value and not re.match(r'^[a-zA-Z\s\'\-\,\.]+$', value):
-            raise serializers.ValidationError("Subregion name can only contain letters, spaces, apostrophes, hyphens, commas, or periods.")
-        return value or ""
-    
-    def validate_population(self, value):
-        """Validate the population."""
-        if value < 0:
-            raise serializers.ValidationError("Population cannot be negative.")
-        if value > 10**10:
-            raise serializers.ValidationError("Population exceeds realistic limits.")
-        return value
-    
-    def validate_area(self, value):
-        """Validate the area."""
-        if value < 0:
-            raise serializers.ValidationError("Area cannot be negative.")
-        if value > 10**8:
-            raise serializers.ValidationError("Area exceeds realistic limits.")
-        return value
-    
-    def validate_languages(self, value):
-        """Validate the languages."""
-        if not isinstance(value, list):
-            raise serializers.ValidationError("Languages must be a list.")
-        if not all(isinstance(lang, str) and lang.strip() for lang in value):
-            raise serializers.ValidationError("Each language must be a non-empty string.")
-        if len(value) > 100:
-            raise serializers.ValidationError("Too many languages specified.")
-        return value
-    
-    def validate_currencies(self, value):
-        """Validate the currencies."""
-        if not isinstance(value, list):
-            raise serializers.ValidationError("Currencies must be a list.")
-        if not all(isinstance(curr, str) and curr.strip() for curr in value):
-            raise serializers.ValidationError("Each currency must be a non-empty string.")
-        if len(value) > 50:
-            raise serializers.ValidationError("Too many currencies specified.")
-        return value
     
-    def validate_timezones(self, value):
-        """Validate the timezones."""
-        if not isinstance(value, list):
-            raise serializers.ValidationError("Timezones must be a list.")
-        if not all(isinstance(tz, str) and tz.strip() for tz in value):
-            raise serializers.ValidationError("Each timezone must be a non-empty string.")
-        if len(value) > 50:
-            raise serializers.ValidationError("Too many timezones specified.")
-        return value
-    
-    def validate_flag(self, value):
-        """Validate the flag URL."""
-        if value and not re.match(r'^https?://[^\s<>"]+|www\.[^\s<>"]+$', value):
-            raise serializers.ValidationError("Invalid URL format for flag.")
-        return value or ""
-    
-    def validate_cca2(self, value):
-        """Validate the 2-letter country code."""
-        if value and not re.match(r'^[A-Z]{2}$', value):
-            raise serializers.ValidationError("cca2 must be a 2-letter uppercase code.")
-        return value or ""
+    Pass fields=[...] to restrict the output to a subset of the fields.
+    """
     
-    def validate_is_active(self, value):
-        """Validate the is_active field."""
-        if not isinstance(value, bool):
-            raise serializers.ValidationError("is_active must be a boolean value.")
-        return value
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop("fields", None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
     
     def validate(self, data):
-        """Object-level validation."""
-        if not any(data.get(key) for key in ['languages', 'currencies', 'timezones']):
-            raise serializers.ValidationError(
-                "At least one of languages, currencies, or timezones should be provided."
-            )
+        """Validate the record with the batch validator shared with the sync job."""
+        errors = api_validator.validate([data])
+        if errors:
+            raise serializers.ValidationError(errors[0])
         return data
     
     class Meta:
         model = CountryInfo
-        fields = '__all__'
+        exclude = ('content_hash',)
         read_only_fields = ('created_at', 'updated_at')
-        
\ No newline at end of file
+        
+
+
+
+class CountryInfoBulkItemSerializer(CountryInfoSerializer):
+    """Serializer for one item of a bulk write.
+    
+    Field validation is inherited from CountryInfoSerializer, but name and
+    cca2 uniqueness are checked once for the whole batch by the bulk endpoint
+    instead of with one query per item.
+    """
+    
+    class Meta(CountryInfoSerializer.Meta):
+        extra_kwargs = {"name": {"validators": []}, "cca2": {"validators": []}}
+
+
+
+
+def _datetime_field():
+    """Return a DateTimeField bound to the active timezone.
+    
+    DateTimeField otherwise looks the current timezone up for every value.
+    """
+    current = timezone.get_current_timezone() if settings.USE_TZ else None
+    return serializers.DateTimeField(default_timezone=current)
+
+
+@lru_cache(maxsize=None)
+def country_read_fields():
+    """Return the fields CountryInfoSerializer outputs, in output order."""
+    return tuple(CountryInfoSerializer().fields)
+
+
+@lru_cache(maxsize=None)
+def _float_columns(fields):
+    """Return the fields of a field set whose values may hold a float.
+
+    Float and decimal columns, and JSON columns, which hold whatever the feed
+    sent. Unknown names are included, to be safe.
+    """
+    columns = []
+    for name in fields:
+        try:
+            field = CountryInfo._meta.get_field(name)
+        except FieldDoesNotExist:
+            columns.append(name)
+            continue
+        if isinstance(field, (models.FloatField, models.DecimalField, models.JSONField)):
+            columns.append(name)
+    return tuple(columns)
+
+
+def serialize_country_rows(rows, fields=None):
+    """Fast read-only equivalent of CountryInfoSerializer(rows, many=True).data.
+    
+    Rows are dicts from queryset.values() (or model instances). Every column
+    already has its API representation except the datetimes, so only those
+    are converted, without instantiating DRF fields per row. The columns that
+    can hold a float are checked for values orjson would format differently
+    while the rows are built, so FastJSONRenderer does not walk them again.
+    
+    Args:
+        rows (iterable): values() dicts or CountryInfo instances.
+        fields (iterable): Fields to output; defaults to all readable fields.
+    Returns:
+        CheckedList: One dict per row, equal to the DRF serializer's output.
+    """
+    fields = tuple(fields or country_read_fields())
+    datetime_fields = [field for field in fields if field in ("created_at", "updated_at")]
+    float_columns = _float_columns(fields)
+    to_representation = _datetime_field().to_representation
+    results = CheckedList()
+    ambiguous_float = False
+    # values() querysets are evaluated by the loop, so the span includes the row fetch
+    with timed("serialize"):
+        for row in rows:
+            if isinstance(row, dict):
+                item = {field: row[field] for field in fields}
+            else:
+                item = {field: getattr(row, field) for field in fields}
+            for field in datetime_fields:
+                item[field] = to_representation(item[field])
+            if not ambiguous_float:
+                ambiguous_float = any(has_ambiguous_float(item[field]) for field in float_columns)
+            results.append(item)
+    results.ambiguous_float = ambiguous_float
+    return results
@@ -0,0 +1,106 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from api.authentication import user_cache
+from api.models.countries_info import CountryInfo
+from api.utils.instrumentation import install_query_recorder
+from api.utils.lookups import rebuild_lookups
+from api.utils.region_stats import refresh_stats_for_countries
+from api.utils.response_cache import bump_version
+from api.utils.search_index import search_index
+
+
+# Sent after bulk writes (bulk_create / bulk_update) that bypass save() and
+# therefore do not emit post_save. Senders pass the written rows as
+# ``instances``; send it inside the write transaction.
+countries_changed = Signal()
+
+
+@receiver(post_save, sender=CountryInfo)
+@receiver(post_delete, sender=CountryInfo)
+def invalidate_country_cache(sender, **kwargs):
+    """Invalidate cached country responses after a single-row write.
+    
+    The version is bumped once the surrounding transaction commits, so a
+    concurrent reader cannot re-cache the old rows under the new version.
+    """
+    transaction.on_commit(bump_version)
+
+
+@receiver(countries_changed)
+def invalidate_country_cache_after_bulk(sender, **kwargs):
+    """Invalidate cached country responses after a bulk write."""
+    transaction.on_commit(bump_version)
+
+
+
+@receiver(post_save, sender=CountryInfo)
+def update_country_lookups(sender, instance, **kwargs):
+    """Keep the language / currency / timezone lookup rows in sync."""
+    rebuild_lookups([instance])
+
+
+@receiver(countries_changed)
+def update_country_lookups_after_bulk(sender, instances=(), **kwargs):
+    """Rebuild lookup rows for countries written in bulk."""
+    rebuild_lookups(list(instances))
+
+
+
+@receiver(post_save, sender=CountryInfo)
+def update_search_index(sender, instance, **kwargs):
+    """Apply the saved row to the in-process autocomplete index on commit."""
+    transaction.on_commit(lambda: search_index.apply_changes([instance]))
+
+
+@receiver(post_delete, sender=CountryInfo)
+def remove_from_search_index(sender, instance, **kwargs):
+    """Drop a deleted row from the autocomplete index on commit."""
+    country_id = instance.pk
+    transaction.on_commit(lambda: search_index.apply_changes(deleted_ids=[country_id]))
+
+
+@receiver(countries_changed)
+def update_search_index_after_bulk(sender, instances=(), **kwargs):
+    """Apply rows written in bulk to the autocomplete index on commit.
+    
+    Only the indexed fields are kept until commit, not the full instances.
+    """
+    rows = [search_index.snapshot(instance) for instance in instances]
+    transaction.on_commit(lambda: search_index.apply_changes(rows))
+
+
+
+@receiver(post_save, sender=CountryInfo)
+@receiver(post_delete, sender=CountryInfo)
+def update_region_stats(sender, instance, **kwargs):
+    """Refresh the region stats of the groups a written row was and is in."""
+    refresh_stats_for_countries([instance])
+
+
+@receiver(countries_changed)
+def update_region_stats_after_bulk(sender, instances=(), **kwargs):
+    """Refresh the region stats of the groups touched by a bulk write."""
+    refresh_stats_for_countries(list(instances))
+
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Drop a changed or deleted user from the JWT user cache.
+    
+    Deactivations and password changes therefore apply to this process's
+    next request rather than once the cached entry expires.
+    """
+    user_cache.discard(getattr(instance, jwt_settings.USER_ID_FIELD))
+
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    """Count and time the queries of each new database connection per request."""
+    install_query_recorder(connection)
@@ -0,0 +1,67 @@
+from unittest import mock
+from api.models.countries_info import CountryInfo
+from api.tests.utils import APITestCase
+from api.utils.bulk_writes import CONFLICT_ERROR
+from api.utils.synthetic import load_synthetic_countries
+
+
+NEW_COUNTRY = {"name": "Newland", "cca2": "ZZ", "timezones": ["UTC+01:00"]}
+
+
+class BulkWriteTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        load_synthetic_countries(3)
+        self.country = CountryInfo.objects.order_by("id").first()
+
+
+    def bulk(self, **body):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post("/api/v1/countries/bulk/", body, format="json")
+
+
+    def test_upserts_and_deletes_are_applied(self):
+        response = self.bulk(
+            upsert=[NEW_COUNTRY, {"id": self.country.pk, "population": 5, "timezones": ["UTC"]}],
+            delete=[self.country.cca2],
+        )
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(
+            [result["status"] for result in response.json()["results"]], ["created", "updated", "error"]
+        )
+        self.assertTrue(CountryInfo.objects.filter(name="Newland", cca2="ZZ").exists())
+        self.assertEqual(CountryInfo.objects.get(pk=self.country.pk).population, 5)
+
+
+    def test_non_integer_ids_are_rejected(self):
+        response = self.bulk(
+            upsert=[{**NEW_COUNTRY, "id": "abc"}, {**NEW_COUNTRY, "name": "Otherland", "cca2": "ZY", "id": 1.0}],
+            delete=[{"id": True}, 2.5],
+        )
+        self.assertEqual(response.status_code, 207)
+        results = response.json()["results"]
+        self.assertEqual([result["status"] for result in results], ["error"] * 4)
+        self.assertEqual(results[0]["errors"], {"id": ["A valid integer is required."]})
+        self.assertEqual(results[1]["errors"], {"id": ["A valid integer is required."]})
+        self.assertIn("id", results[2]["errors"])
+        self.assertIn("non_field_errors", results[3]["errors"])
+        self.assertFalse(CountryInfo.objects.filter(name__in=["Newland", "Otherland"]).exists())
+        self.assertFalse(CountryInfo.objects.filter(cca2="ABC").exists())
+
+
+    def test_concurrent_write_is_reported_as_a_conflict(self):
+        bulk_create = CountryInfo.objects.bulk_create
+
+        def concurrent_bulk_create(countries, *args, **kwargs):
+            # Another request takes the name after the batch's checks
+            CountryInfo.objects.create(**NEW_COUNTRY, is_active=True)
+            return bulk_create(countries, *args, **kwargs)
+
+        with mock.patch.object(CountryInfo.objects, "bulk_create", concurrent_bulk_create):
+            response = self.bulk(upsert=[NEW_COUNTRY], delete=[self.country.pk])
+        self.assertEqual(response.status_code, 207)
+        results = response.json()["results"]
+        self.assertEqual([result["status"] for result in results], ["error", "error"])
+        self.assertEqual(results[0]["errors"], {"non_field_errors": [CONFLICT_ERROR]})
+        self.assertTrue(CountryInfo.objects.get(pk=self.country.pk).is_active)
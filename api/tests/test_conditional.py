@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta, timezone
+from api.models.countries_info import CountryInfo
+from api.tests.utils import APITestCase
+from api.utils.synthetic import load_synthetic_countries
+
+
+class ListValidatorTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        load_synthetic_countries(3)
+        self.newest = CountryInfo.objects.order_by("id").last()
+        # Pin the timestamps a second apart, HTTP dates have no finer resolution
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        CountryInfo.objects.exclude(pk=self.newest.pk).update(updated_at=now - timedelta(days=1))
+        CountryInfo.objects.filter(pk=self.newest.pk).update(updated_at=now - timedelta(hours=1))
+
+
+    def test_soft_deleting_the_newest_row_is_not_answered_with_304(self):
+        response = self.client.get("/api/v1/countries/")
+        self.assertEqual(response.status_code, 200)
+        last_modified = response["Last-Modified"]
+        self.assertEqual(self.client.get("/api/v1/countries/", headers={"If-Modified-Since": last_modified}).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.delete(f"/api/v1/countries/{self.newest.pk}/").status_code, 204)
+        response = self.client.get("/api/v1/countries/", headers={"If-Modified-Since": last_modified})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(self.newest.name, [row["name"] for row in response.json()["results"]])
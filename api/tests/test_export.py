@@ -0,0 +1,38 @@
+import json
+from django.test import AsyncClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from api.tests.utils import APITestCase
+from api.utils.synthetic import load_synthetic_countries
+
+
+class ExportStreamingTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        load_synthetic_countries(5)
+        self.access_token = str(RefreshToken.for_user(self.user).access_token)
+
+
+    def test_sync_export_streams_every_row(self):
+        response = self.client.get("/api/v1/countries/export/")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.is_async)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 5)
+
+
+    async def test_asgi_export_streams_asynchronously(self):
+        client = AsyncClient()
+        with self.assertLogs("api.requests", "INFO") as logs:
+            response = await client.get(
+                "/api/v1/countries/export/", headers={"Authorization": f"Bearer {self.access_token}"}
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.is_async)
+            self.assertEqual(logs.output, [])  # recorded once the stream ends
+            chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(len(b"".join(chunks).decode().splitlines()), 5)
+        entry = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(entry["route"], "api/v1/countries/export/")
+        # The user lookup, and the export query, which runs while streaming
+        self.assertEqual(entry["queries"], 2)
@@ -0,0 +1,35 @@
+import tempfile
+from unittest import mock
+from django.test import SimpleTestCase, override_settings
+from api.models.countries_info import CountryInfo
+from api.tests.utils import APITestCase
+from api.utils.metrics import MetricStore
+from api.utils.region_stats import resolve_country_group
+from api.utils.synthetic import load_synthetic_countries
+
+
+class MetricStoreTests(SimpleTestCase):
+
+    def test_failed_flush_is_logged_and_retried(self):
+        store = MetricStore()
+        store._flusher = True  # no background flusher; the test flushes
+        with tempfile.TemporaryDirectory() as directory:
+            # A directory cannot be opened as the database
+            with override_settings(METRICS_DB_PATH=directory):
+                store.update(("test_total", "", ""), "sum", amount=1)
+                with self.assertLogs("api.utils.metrics", "ERROR"):
+                    store.flush()
+        self.assertEqual(store._dirty, {("test_total", "", "")})
+
+
+class CacheLookupTests(APITestCase):
+
+    def test_group_lookups_have_their_own_label(self):
+        load_synthetic_countries(1)
+        country = CountryInfo.objects.get()
+        with mock.patch("api.utils.response_cache.CACHE_LOOKUPS") as lookups:
+            for _ in range(2):
+                self.assertEqual(resolve_country_group(country.pk), (country.region, country.subregion))
+        self.assertEqual(lookups.inc.call_args_list, [
+            mock.call(cache="groups", result="miss"), mock.call(cache="groups", result="hit"),
+        ])
@@ -0,0 +1,41 @@
+from django.test import SimpleTestCase
+from rest_framework.renderers import JSONRenderer
+from api.renderers import FastJSONRenderer
+from api.renderers.fast_json import CheckedList, has_ambiguous_float
+from api.serializers.countries_info import serialize_country_rows
+from api.utils.synthetic import synthetic_countries
+
+
+class FastJSONRendererTests(SimpleTestCase):
+
+    def assertRendersLikeDRF(self, data):
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+    def test_serialized_rows_carry_the_float_check(self):
+        countries = list(synthetic_countries(3))
+        rows = serialize_country_rows(countries)
+        self.assertIsInstance(rows, CheckedList)
+        self.assertFalse(rows.ambiguous_float)
+        self.assertRendersLikeDRF({"count": 3, "results": rows})
+
+        countries[1].area = 1e-05
+        rows = serialize_country_rows(countries)
+        self.assertTrue(rows.ambiguous_float)
+        self.assertTrue(has_ambiguous_float({"count": 3, "results": rows}))
+        self.assertRendersLikeDRF({"count": 3, "results": rows})
+
+
+    def test_floats_in_json_columns_are_checked(self):
+        countries = list(synthetic_countries(2))
+        countries[0].currencies = [{"name": "Euro", "rate": 1e16}]
+        rows = serialize_country_rows(countries)
+        self.assertTrue(rows.ambiguous_float)
+        self.assertRendersLikeDRF(rows)
+
+
+    def test_checked_rows_are_not_walked_again(self):
+        rows = CheckedList([{"area": 1e-05}])
+        # Trusts the flag set by the serializer
+        self.assertFalse(has_ambiguous_float({"results": rows}))
+        self.assertTrue(has_ambiguous_float({"results": list(rows)}))
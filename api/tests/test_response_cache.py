@@ -0,0 +1,96 @@
+from api.models.countries_info import CountryInfo
+from api.tests.utils import APITestCase, bump_in_other_process
+from api.utils.fetch_countries import sync_countries, transform_record
+from api.utils.response_cache import bump_version, get_version
+from api.utils.synthetic import load_synthetic_countries, synthetic_records
+
+
+class DataVersionTests(APITestCase):
+
+    def test_bump_is_seen_by_this_process(self):
+        version = get_version()
+        self.assertEqual(bump_version(), version + 1)
+        self.assertEqual(get_version(), version + 1)
+
+
+    def test_bump_from_another_process_is_seen(self):
+        version = get_version()
+        self.assertEqual(bump_in_other_process(), version + 1)
+        self.assertEqual(get_version(), version + 1)
+
+
+class ListCacheInvalidationTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        load_synthetic_countries(3)
+        self.country = CountryInfo.objects.order_by("id").first()
+
+
+    def names(self):
+        response = self.client.get("/api/v1/countries/")
+        self.assertEqual(response.status_code, 200)
+        return [row["name"] for row in response.json()["results"]]
+
+
+    def test_write_through_the_api_invalidates_cached_pages(self):
+        self.assertIn(self.country.name, self.names())
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                f"/api/v1/countries/{self.country.pk}/", {"name": "Renamedland", "timezones": ["UTC+01:00"]}, format="json"
+            )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertIn("Renamedland", self.names())
+
+
+    def test_delete_invalidates_cached_pages(self):
+        self.assertIn(self.country.name, self.names())
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(f"/api/v1/countries/{self.country.pk}/")
+        self.assertEqual(response.status_code, 204)
+        self.assertNotIn(self.country.name, self.names())
+
+
+    def test_sync_invalidates_cached_pages_only_when_it_writes(self):
+        records = [transform_record(record) for record in synthetic_records(3)]
+        self.names()
+        version = get_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            sync_countries(records)
+        self.assertEqual(get_version(), version)
+
+        records[0]["name"] = "Renamedland"
+        with self.captureOnCommitCallbacks(execute=True):
+            sync_countries(records)
+        self.assertGreater(get_version(), version)
+        self.assertIn("Renamedland", self.names())
+
+
+    def test_write_from_another_process_invalidates_cached_pages(self):
+        self.assertIn(self.country.name, self.names())
+        # A write by another process: the row changes without any signal
+        # here, only the shared version moves
+        CountryInfo.objects.filter(pk=self.country.pk).update(name="Renamedland")
+        self.assertNotIn("Renamedland", self.names())
+        bump_in_other_process()
+        self.assertIn("Renamedland", self.names())
+
+
+class CacheKeyTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        load_synthetic_countries(3)
+
+
+    def test_invalid_filter_is_rejected_with_a_warm_cache(self):
+        self.assertEqual(self.client.get("/api/v1/countries/").status_code, 200)
+        for _ in range(2):
+            self.assertEqual(self.client.get("/api/v1/countries/", {"language": " "}).status_code, 400)
+
+
+    def test_empty_and_reordered_parameters_share_a_page(self):
+        self.assertEqual(self.client.get("/api/v1/countries/?region=Europe&name=").status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/v1/countries/?name=&include_deleted=false&region=Europe")
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,51 @@
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from api.authentication import user_cache
+from api.tests.utils import APITestCase
+from api.tokens import RevocableRefreshToken
+from api.utils.revocation import BloomFilter, revoked_tokens
+
+
+class BloomFilterTests(SimpleTestCase):
+
+    def test_adding_an_item_again_does_not_count_it_twice(self):
+        bloom = BloomFilter(100, 0.01)
+        bloom.add("first")
+        bloom.add("first")
+        bloom.add("second")
+        self.assertEqual(bloom.count, 2)
+        self.assertIn("first", bloom)
+
+
+class RevocationListTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        revoked_tokens.reset()
+        self.addCleanup(revoked_tokens.reset)
+
+
+    def test_token_revoked_here_is_counted_once_after_the_sync(self):
+        token = RevocableRefreshToken.for_user(self.user)
+        self.assertFalse(revoked_tokens.is_revoked(token["jti"]))
+        count = revoked_tokens._filter.count
+
+        _, revoked = token.blacklist()
+        self.assertTrue(revoked)
+        # The next sync reads the new blacklist row back
+        revoked_tokens._next_sync = 0.0
+        self.assertTrue(revoked_tokens.is_revoked(token["jti"]))
+        self.assertEqual(revoked_tokens._filter.count, count + 1)
+
+
+class TokenRefreshTests(APITestCase):
+
+    def test_refresh_reads_the_user_from_the_database(self):
+        refresh = RevocableRefreshToken.for_user(self.user)
+        # Warm the JWT user cache, then deactivate the user behind its back
+        user_cache.set(self.user.pk, self.user)
+        self.addCleanup(user_cache.discard, self.user.pk)
+        get_user_model().objects.filter(pk=self.user.pk).update(is_active=False)
+
+        response = self.client.post("/auth/v1/token/refresh/", {"refresh": str(refresh)}, format="json")
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,37 @@
+from api.models.countries_info import CountryInfo
+from api.tests.utils import APITestCase, bump_in_other_process
+from api.utils.search_index import search_index
+from api.utils.synthetic import load_synthetic_countries
+
+
+class SearchIndexStalenessTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        load_synthetic_countries(3)
+        self.country = CountryInfo.objects.order_by("id").first()
+        # The index is process-wide; drop what earlier tests left in it
+        search_index.rebuild()
+
+
+    def suggestions(self, query):
+        response = self.client.get("/api/v1/countries/suggest/", {"q": query})
+        self.assertEqual(response.status_code, 200)
+        return [row["name"] for row in response.json()["results"]]
+
+
+    def test_local_write_is_applied(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                f"/api/v1/countries/{self.country.pk}/",
+                {"name": "Quixland", "timezones": ["UTC+01:00"]},
+                format="json",
+            )
+        self.assertEqual(self.suggestions("quix"), ["Quixland"])
+
+
+    def test_write_from_another_process_rebuilds_the_index(self):
+        CountryInfo.objects.filter(pk=self.country.pk).update(name="Quixland")
+        self.assertEqual(self.suggestions("quix"), [])
+        bump_in_other_process()
+        self.assertEqual(self.suggestions("quix"), ["Quixland"])
@@ -0,0 +1,98 @@
+import json
+from api.models.countries_info import CountryInfo
+from api.signals import countries_changed
+from api.tests.utils import APITestCase
+from api.utils.fetch_countries import populate_database, sync_countries, transform_record
+from api.utils.synthetic import synthetic_records
+
+
+def feed(count, revision=0):
+    return [transform_record(record) for record in synthetic_records(count, revision=revision)]
+
+
+class SyncCountriesTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.changed = []
+        countries_changed.connect(self.record_changes)
+        self.addCleanup(countries_changed.disconnect, self.record_changes)
+
+
+    def record_changes(self, sender, instances, **kwargs):
+        self.changed.extend(instances)
+
+
+    def test_first_sync_creates_and_second_is_a_no_op(self):
+        report = sync_countries(feed(5), batch_size=2)
+        self.assertEqual((report["created"], report["received"]), (5, 5))
+        self.assertEqual(CountryInfo.objects.filter(is_active=True).count(), 5)
+
+        self.changed.clear()
+        report = sync_countries(feed(5), batch_size=2)
+        self.assertEqual((report["created"], report["updated"], report["unchanged"]), (0, 0, 5))
+        self.assertEqual(self.changed, [])
+
+
+    def test_changed_records_are_updated_and_missing_ones_deactivated(self):
+        sync_countries(feed(5))
+        records = feed(4, revision=1)
+        report = sync_countries(records)
+        # Record 0 changes in every revision; record 4 is no longer in the feed
+        self.assertEqual((report["updated"], report["unchanged"], report["deactivated"]), (1, 3, 1))
+        self.assertEqual(CountryInfo.objects.get(name=records[0]["name"]).population, records[0]["population"])
+        self.assertFalse(CountryInfo.objects.get(name=feed(5)[4]["name"]).is_active)
+
+
+    def test_renamed_country_takes_its_code_from_the_old_row(self):
+        records = feed(3)
+        sync_countries(records)
+        old = CountryInfo.objects.get(name=records[0]["name"])
+        records[0] = {**records[0], "name": "Renamedland"}
+
+        self.changed.clear()
+        report = sync_countries(records)
+        self.assertEqual((report["created"], report["deactivated"]), (1, 1))
+        self.assertEqual(CountryInfo.objects.get(name="Renamedland").cca2, old.cca2)
+        released = CountryInfo.objects.get(pk=old.pk)
+        self.assertEqual((released.cca2, released.is_active), ("", False))
+        self.assertGreater(released.updated_at, old.updated_at)
+        self.assertIn(old.pk, {country.pk for country in self.changed})
+
+
+    def test_duplicate_code_in_the_feed_is_rejected(self):
+        records = feed(3)
+        records[2] = {**records[2], "cca2": records[0]["cca2"]}
+        report = sync_countries(records, batch_size=2)
+        self.assertEqual((report["created"], report["rejected"]), (2, 1))
+        self.assertEqual(report["errors"][0]["name"], records[2]["name"])
+        self.assertIn("cca2", report["errors"][0]["errors"])
+        self.assertFalse(CountryInfo.objects.filter(name=records[2]["name"]).exists())
+
+
+class MalformedRecordTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.records = list(synthetic_records(4))
+        self.records[1]["population"] = "unknown"
+        self.records[2]["area"] = {"km2": 10}
+        self.feed = self.directory / "feed.json"
+        self.feed.write_text(json.dumps(self.records), encoding="utf-8")
+
+
+    def assertOnlyMalformedRejected(self, report):
+        self.assertEqual((report["created"], report["rejected"]), (2, 2))
+        self.assertEqual(
+            {error["name"] for error in report["errors"]},
+            {self.records[1]["name"]["common"], self.records[2]["name"]["common"]},
+        )
+        self.assertEqual(CountryInfo.objects.count(), 2)
+
+
+    def test_streaming_sync_rejects_only_the_malformed_records(self):
+        self.assertOnlyMalformedRejected(populate_database(source=str(self.feed)))
+
+
+    def test_preprocessed_sync_rejects_only_the_malformed_records(self):
+        self.assertOnlyMalformedRejected(populate_database(stream=False, source=str(self.feed)))
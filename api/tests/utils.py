@@ -0,0 +1,56 @@
+import logging
+import multiprocessing
+import shutil
+import tempfile
+from pathlib import Path
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from api.utils.response_cache import CACHE_ALIAS, bump_version
+
+
+def _bump_in_child(queue):
+    queue.put(bump_version())
+
+
+def bump_in_other_process():
+    """Bump the data version from a forked process and return the new version."""
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    process = context.Process(target=_bump_in_child, args=(queue,))
+    process.start()
+    version = queue.get(timeout=10)
+    process.join(timeout=10)
+    return version
+
+
+class APITestCase(TestCase):
+    """Test case with the host-shared SQLite stores moved to a temporary directory.
+
+    Throttle buckets, data versions, metrics and feed snapshots normally live
+    under var/ and are shared with any server running on the host; each test
+    gets its own files (in self.directory), an empty page cache and an
+    authenticated client, and the per-request log lines are silenced.
+    """
+
+    def setUp(self):
+        self.directory = directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        shared_state = override_settings(
+            THROTTLE_DB_PATH=directory / "throttle.sqlite3",
+            COUNTRIES_VERSION_DB_PATH=directory / "versions.sqlite3",
+            METRICS_DB_PATH=directory / "metrics.sqlite3",
+            COUNTRIES_SNAPSHOT_DIR=directory / "snapshots",
+        )
+        shared_state.enable()
+        self.addCleanup(shared_state.disable)
+        caches[CACHE_ALIAS].clear()
+
+        request_log = logging.getLogger("api.requests")
+        self.addCleanup(request_log.setLevel, request_log.level)
+        request_log.setLevel(logging.WARNING)
+
+        self.user = get_user_model().objects.create_user("tester", password="secret-password")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
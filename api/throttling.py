@@ -0,0 +1,141 @@
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from django.conf import settings
+from rest_framework.throttling import AnonRateThrottle, ScopedRateThrottle, SimpleRateThrottle, UserRateThrottle
+from api.utils.metrics import THROTTLE_REJECTIONS
+
+
+# One row per throttle key. The bucket is refilled lazily from the time
+# elapsed since its last update and a request is admitted if a whole token
+# is left, in a single upsert, so the check is atomic across processes.
+CONSUME_SQL = """
+    INSERT INTO throttle_buckets (key, tokens, updated_at, allowed)
+    VALUES (:key, :capacity - 1, :now, 1)
+    ON CONFLICT (key) DO UPDATE SET
+        allowed = min(:capacity, tokens + max(0, :now - updated_at) * :rate) >= 1,
+        tokens = min(:capacity, tokens + max(0, :now - updated_at) * :rate)
+            - (min(:capacity, tokens + max(0, :now - updated_at) * :rate) >= 1),
+        updated_at = max(updated_at, :now)
+    RETURNING allowed, tokens
+"""
+
+# The longest DRF rate period; a bucket idle for longer is full whatever its rate.
+MAX_DURATION = 86400
+
+
+class TokenBucketStore:
+    """Token buckets shared by every process on the host, kept in SQLite.
+
+    Each key holds a bucket of num_requests tokens refilled at
+    num_requests / duration tokens per second, so a key costs one fixed-size
+    row and a check is one indexed upsert, however busy the key is. Rows of
+    buckets idle for longer than any rate period are full, carry no state and
+    are deleted every THROTTLE_PRUNE_INTERVAL seconds.
+
+    The database (THROTTLE_DB_PATH) runs in WAL mode without fsync; it only
+    holds rate limiting state, which may be lost on a crash.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._next_prune = 0.0
+
+
+    def _connection(self):
+        """Return this thread's connection, creating the database if needed."""
+        path = Path(settings.THROTTLE_DB_PATH)
+        # A connection must not cross a fork, and tests may point the
+        # setting at another file
+        owner = (os.getpid(), path)
+        if getattr(self._local, "owner", None) != owner:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS throttle_buckets ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL, "
+                "allowed INTEGER NOT NULL) WITHOUT ROWID"
+            )
+            self._local.connection = connection
+            self._local.owner = owner
+        return self._local.connection
+
+
+    def consume(self, key, num_requests, duration):
+        """Take a token from a key's bucket if one is available.
+
+        Args:
+            key (str): The throttle key.
+            num_requests (int): Bucket capacity (the burst size).
+            duration (int): Seconds in which a full bucket refills.
+        Returns:
+            tuple: (True if the request is allowed, seconds until a token is
+            available or None if allowed).
+        """
+        now = time.time()
+        rate = num_requests / duration
+        connection = self._connection()
+        allowed, tokens = connection.execute(
+            CONSUME_SQL, {"key": key, "capacity": num_requests, "now": now, "rate": rate}
+        ).fetchone()
+        if now >= self._next_prune:
+            self._prune(connection, now)
+        return bool(allowed), None if allowed else (1 - tokens) / rate
+
+
+    def _prune(self, connection, now):
+        """Delete the rows of buckets that are full again."""
+        with self._lock:
+            if now < self._next_prune:
+                return
+            self._next_prune = now + getattr(settings, "THROTTLE_PRUNE_INTERVAL", 300)
+        connection.execute("DELETE FROM throttle_buckets WHERE updated_at < ?", (now - MAX_DURATION,))
+
+
+bucket_store = TokenBucketStore()
+
+
+class SharedRateThrottle(SimpleRateThrottle):
+    """SimpleRateThrottle backed by the host-wide token buckets.
+
+    Limits hold across all worker processes, and the per-key state does not
+    grow with the request rate. A rate of N/period allows bursts of N
+    requests and then one request every period / N.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        allowed, self.wait_seconds = bucket_store.consume(self.key, self.num_requests, self.duration)
+        if not allowed:
+            THROTTLE_REJECTIONS.inc(scope=self.scope)
+        return allowed
+
+
+    def wait(self):
+        """Return the seconds until the next request would be allowed."""
+        return self.wait_seconds
+
+
+# Listing the DRF throttle first keeps its key and scope logic, while its
+# super().allow_request() resolves to SharedRateThrottle.
+class SharedAnonRateThrottle(AnonRateThrottle, SharedRateThrottle):
+    """AnonRateThrottle with shared token buckets."""
+
+
+class SharedUserRateThrottle(UserRateThrottle, SharedRateThrottle):
+    """UserRateThrottle with shared token buckets."""
+
+
+class SharedScopedRateThrottle(ScopedRateThrottle, SharedRateThrottle):
+    """ScopedRateThrottle with shared token buckets."""
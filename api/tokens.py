@@ -0,0 +1,45 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+from api.utils.revocation import revoked_tokens
+
+
+class RevocableRefreshToken(RefreshToken):
+    """RefreshToken checked against the in-process revocation list.
+
+    Verifying a token that was never revoked costs no query, and blacklisting
+    or outstanding a token no longer loads its user first.
+    """
+
+    def check_blacklist(self):
+        """Raise TokenError if this token has been blacklisted."""
+        if revoked_tokens.is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+
+    def blacklist(self):
+        """Blacklist this token.
+
+        Returns:
+            tuple: (BlacklistedToken, True if this call revoked the token).
+        """
+        return revoked_tokens.revoke(
+            self.payload[api_settings.JTI_CLAIM],
+            datetime_from_epoch(self.payload["exp"]),
+            str(self),
+            self.payload.get(api_settings.USER_ID_CLAIM),
+        )
+
+
+    def outstand(self):
+        """Record this freshly issued token as outstanding."""
+        return OutstandingToken.objects.create(
+            jti=self.payload[api_settings.JTI_CLAIM],
+            user_id=self.payload.get(api_settings.USER_ID_CLAIM),
+            created_at=self.current_time,
+            token=str(self),
+            expires_at=datetime_from_epoch(self.payload["exp"]),
+        )
@@ -1,11 +1,28 @@
+from django.conf import settings
 from django.urls import path
 from api.views.countries_info import CountryInfoViewSet
 
 
+country_list = CountryInfoViewSet.as_view({"get": "list", "post": "create"})
+country_suggest = CountryInfoViewSet.as_view({"get": "suggest"})
+country_detail = CountryInfoViewSet.as_view({"get": "retrieve", "patch": "partial_update", "delete": "destroy"})
+
+if settings.COUNTRIES_ASYNC_VIEWS:
+    from api.views import async_countries
+    
+    country_list = async_countries.with_sync_writes(async_countries.country_list, country_list)
+    country_suggest = async_countries.with_sync_writes(async_countries.country_suggest, country_suggest)
+    country_detail = async_countries.with_sync_writes(async_countries.country_detail, country_detail)
+
+
 urlpatterns = [
-    path("v1/countries/", CountryInfoViewSet.as_view({"get": "list", "post": "create"}), name="country-list"),
-    path("v1/countries/<int:country_id>/", CountryInfoViewSet.as_view({
-        "get": "retrieve", "patch": "partial_update", "delete": "destroy"}
-    ), name="country-detail"),
+    path("v1/countries/", country_list, name="country-list"),
+    path("v1/countries/export/", CountryInfoViewSet.as_view({"get": "export"}), name="country-export"),
+    path("v1/countries/bulk/", CountryInfoViewSet.as_view({"post": "bulk"}), name="country-bulk"),
+    path("v1/countries/stats/", CountryInfoViewSet.as_view({"get": "stats"}), name="country-stats"),
+    path("v1/countries/suggest/", country_suggest, name="country-suggest"),
+    path("v1/countries/code/", CountryInfoViewSet.as_view({"get": "code"}), name="country-codes"),
+    path("v1/countries/code/<str:cca2>/", CountryInfoViewSet.as_view({"get": "code"}), name="country-code"),
+    path("v1/countries/<int:country_id>/", country_detail, name="country-detail"),
     path("v1/countries/<int:country_id>/restore/", CountryInfoViewSet.as_view({"post": "restore"}), name="country-restore"),
 ]
\ No newline at end of file
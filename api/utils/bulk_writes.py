@@ -0,0 +1,223 @@
+from collections import Counter, defaultdict
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from api.models.countries_info import CountryInfo
+from api.serializers.countries_info import CountryInfoBulkItemSerializer
+from api.signals import countries_changed
+
+
+MAX_BULK_ITEMS = 1000
+
+# Unique fields checked across the batch -> label used in error messages
+UNIQUE_FIELDS = {"name": "Country name", "cca2": "Country code"}
+
+
+# Reported for the items of a batch whose write hit a unique constraint
+# because a concurrent request took a name or code after the batch's checks
+CONFLICT_ERROR = "Conflicts with a concurrent write of the same name or code; retry the item."
+
+
+class InvalidKey(ValueError):
+    """Raised by _item_key for an item that cannot name a country.
+
+    Attributes:
+        errors (dict): The item's errors, in serializer error format.
+    """
+
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def _item_key(item):
+    """Return the ("id", value) or ("cca2", value) key of a bulk item, or None.
+
+    Upserts are objects that may carry an id or cca2; deletes may also be a
+    bare id (int) or cca2 (str). An id must be an integer or a string of
+    digits; anything else (1.0, "abc", true) is rejected rather than guessed.
+
+    Raises:
+        InvalidKey: If an object's id, or a bare item, is not a valid key.
+    """
+    if isinstance(item, dict):
+        if item.get("id") in (None, ""):
+            code = item.get("cca2")
+            return ("cca2", code.strip().upper()) if isinstance(code, str) and code.strip() else None
+        if isinstance(item["id"], str) and item["id"].strip().isdigit():
+            return ("id", int(item["id"]))
+        if isinstance(item["id"], int) and not isinstance(item["id"], bool):
+            return ("id", item["id"])
+        raise InvalidKey({"id": ["A valid integer is required."]})
+    if isinstance(item, str) and item.strip():
+        return ("id", int(item)) if item.strip().isdigit() else ("cca2", item.strip().upper())
+    if isinstance(item, int) and not isinstance(item, bool):
+        return ("id", item)
+    raise InvalidKey({"non_field_errors": ["Each delete must be an id, a country code or an object carrying either."]})
+
+
+def _item_keys(items, key_errors):
+    """Return the _item_key of each item (None for invalid ones, whose errors go to key_errors by index)."""
+    keys = []
+    for index, item in enumerate(items):
+        try:
+            keys.append(_item_key(item))
+        except InvalidKey as exc:
+            key_errors[index] = exc.errors
+            keys.append(None)
+    return keys
+
+
+def apply_bulk_changes(upserts, deletes):
+    """Validate and apply a batch of upserts and soft-deletes.
+
+    Every key in the batch is resolved with a single query, items are
+    validated with CountryInfoBulkItemSerializer, name and cca2 uniqueness
+    are checked for the whole batch with one query each, and all valid items
+    are written with bulk_create / bulk_update in one transaction. Invalid
+    items are reported and skipped. If a concurrent request takes a name or
+    code between the checks and the write, the transaction is rolled back
+    and every item that was to be written is reported as a conflict.
+
+    Args:
+        upserts (list): Country objects keyed by id or cca2. Items without a
+            matching row are created (an unknown id is an error).
+        deletes (list): Ids, cca2 codes or objects carrying either.
+    Returns:
+        list: One result dict per item (upserts first, then deletes) with the
+        index, op, status ("created", "updated", "deleted" or "error"), id and
+        errors.
+    """
+    upsert_errors, delete_errors = {}, {}
+    upsert_keys = _item_keys([item if isinstance(item, dict) else {} for item in upserts], upsert_errors)
+    delete_keys = _item_keys(deletes, delete_errors)
+    keys = [key for key in upsert_keys + delete_keys if key]
+    ids = {value for kind, value in keys if kind == "id"}
+    codes = {value for kind, value in keys if kind == "cca2"}
+
+    by_id, by_code = {}, {}
+    if keys:
+        for country in CountryInfo.objects.filter(Q(id__in=ids) | Q(cca2__in=codes)).order_by("id"):
+            by_id[country.pk] = country
+            by_code.setdefault(country.cca2, country)
+
+    def resolve(key):
+        if key is None:
+            return None
+        return by_id.get(key[1]) if key[0] == "id" else by_code.get(key[1])
+
+    results = []
+    pending = []
+    touched = set()
+
+    for index, (item, key) in enumerate(zip(upserts, upsert_keys)):
+        result = {"index": index, "op": "upsert", "status": "error", "id": None}
+        results.append(result)
+        if not isinstance(item, dict):
+            result["errors"] = {"non_field_errors": ["Each upsert must be an object."]}
+            continue
+        if index in upsert_errors:
+            result["errors"] = upsert_errors[index]
+            continue
+        instance = resolve(key)
+        if key and key[0] == "id" and instance is None:
+            result["errors"] = {"id": [f"Country with ID {key[1]} does not exist."]}
+            continue
+        if instance is not None and instance.pk in touched:
+            result["errors"] = {"non_field_errors": ["Country is modified more than once in this batch."]}
+            continue
+
+        data = {field: value for field, value in item.items() if field != "id"}
+        serializer = CountryInfoBulkItemSerializer(instance, data=data, partial=instance is not None)
+        if not serializer.is_valid():
+            result["errors"] = serializer.errors
+            continue
+        if instance is not None:
+            touched.add(instance.pk)
+            result["id"] = instance.pk
+        pending.append((result, instance, serializer.validated_data))
+
+    # Check name and cca2 uniqueness for the whole batch at once
+    for field, label in UNIQUE_FIELDS.items():
+        values = {
+            id(result): data.get(field, getattr(instance, field) if instance else None)
+            for result, instance, data in pending
+        }
+        counts = Counter(value for value in values.values() if value)
+        taken = dict(CountryInfo.objects.filter(**{f"{field}__in": list(counts)}).values_list(field, "id"))
+        unique = []
+        for result, instance, data in pending:
+            value = values[id(result)]
+            owner = taken.get(value)
+            if counts[value] > 1:
+                result["errors"] = {field: [f"{label} appears more than once in this batch."]}
+            elif owner is not None and (instance is None or owner != instance.pk):
+                result["errors"] = {field: [f"country info with this {field} already exists."]}
+            else:
+                unique.append((result, instance, data))
+        pending = unique
+    valid = pending
+
+    to_delete = []
+    for index, key in enumerate(delete_keys):
+        result = {"index": index, "op": "delete", "status": "error", "id": None}
+        results.append(result)
+        instance = resolve(key)
+        if index in delete_errors:
+            result["errors"] = delete_errors[index]
+        elif instance is None:
+            result["errors"] = {"non_field_errors": ["Country not found."]}
+        elif instance.pk in touched:
+            result["errors"] = {"non_field_errors": ["Country is modified more than once in this batch."]}
+        else:
+            touched.add(instance.pk)
+            result["id"] = instance.pk
+            to_delete.append((result, instance))
+
+    now = timezone.now()
+    to_create = []
+    update_groups = defaultdict(list)
+    for result, instance, data in valid:
+        if instance is None:
+            instance = CountryInfo(**data)
+            to_create.append((result, instance))
+        else:
+            for field, value in data.items():
+                setattr(instance, field, value)
+            instance.updated_at = now
+            update_groups[tuple(sorted(data)) + ("content_hash", "updated_at")].append((result, instance))
+            result["status"] = "updated"
+        instance.refresh_content_hash()
+    for result, instance in to_delete:
+        instance.is_active = False
+        instance.updated_at = now
+        result["status"] = "deleted"
+
+    changed = [instance for _, instance in to_create]
+    try:
+        with transaction.atomic():
+            if to_create:
+                CountryInfo.objects.bulk_create(changed)
+            for fields, entries in update_groups.items():
+                countries = [instance for _, instance in entries]
+                CountryInfo.objects.bulk_update(countries, fields=list(fields))
+                changed.extend(countries)
+            if to_delete:
+                countries = [instance for _, instance in to_delete]
+                CountryInfo.objects.bulk_update(countries, fields=["is_active", "updated_at"])
+                changed.extend(countries)
+            if changed:
+                countries_changed.send(sender=CountryInfo, instances=changed)
+    except IntegrityError:
+        # A concurrent request took a name or code after the uniqueness
+        # checks; nothing of the batch was written
+        written = [*to_create, *(entry for entries in update_groups.values() for entry in entries), *to_delete]
+        for result, _ in written:
+            result["status"] = "error"
+            result["errors"] = {"non_field_errors": [CONFLICT_ERROR]}
+        return results
+
+    for result, instance in to_create:
+        result["status"] = "created"
+        result["id"] = instance.pk
+    return results
@@ -0,0 +1,121 @@
+import hashlib
+from django.db.models import Count, Max, Subquery
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def _make_etag(*parts):
+    """Build a strong, quoted ETag from the given parts."""
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return quote_etag(digest[:40])
+
+
+def _field(row, name):
+    """Read a field from a model instance or a values() dict."""
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+
+def _timestamp(value):
+    """Convert a datetime to an integer POSIX timestamp (None stays None)."""
+    return int(value.timestamp()) if value else None
+
+
+def queryset_validators(queryset, request):
+    """Compute the ETag and Last-Modified values for a list response.
+
+    The validators are derived from the newest updated_at of the whole table
+    and the row count of the filtered queryset, resolved in a single aggregate
+    query. The newest row of the filtered set alone would not do: once it is
+    soft-deleted or edited out of the filter, Last-Modified would go back in
+    time and a client's If-Modified-Since would still match. The full path
+    (including page, page_size and filters) is part of the ETag so each page
+    gets its own validator.
+
+    Args:
+        queryset: The filtered queryset backing the list response.
+        request: The current request.
+    Returns:
+        tuple: The quoted ETag, the Last-Modified timestamp (or None) and the
+        row count, which spares the paginator its own COUNT query.
+    """
+    summary = queryset.order_by().aggregate(**_summary_aggregates(queryset))
+    return _summary_validators(summary, request)
+
+
+async def aqueryset_validators(queryset, request):
+    """Async variant of queryset_validators, using the async ORM."""
+    summary = await queryset.order_by().aaggregate(**_summary_aggregates(queryset))
+    return _summary_validators(summary, request)
+
+
+def _summary_aggregates(queryset):
+    # Every row of the table counts, soft-deleted ones included, since a
+    # delete or an edit bumps the updated_at of the row it takes out
+    newest = queryset.model._base_manager.order_by("-updated_at").values("updated_at")[:1]
+    return {"last_modified": Max(Subquery(newest)), "total": Count("pk")}
+
+
+def _summary_validators(summary, request):
+    last_modified = summary["last_modified"]
+    etag = _make_etag(
+        request.get_full_path(),
+        last_modified.isoformat() if last_modified else "",
+        summary["total"],
+    )
+    return etag, _timestamp(last_modified), summary["total"]
+
+
+def rows_validators(rows, request, *extra):
+    """Compute the ETag and Last-Modified values for an already fetched page.
+
+    Used by keyset pagination, where aggregating over the whole filtered
+    queryset would cost as much as the count query it avoids.
+
+    Args:
+        rows (list): The model instances or values() dicts on the page.
+        request: The current request.
+        *extra: Additional values the page depends on (e.g. its cursors).
+    Returns:
+        tuple: The quoted ETag and the Last-Modified timestamp (or None).
+    """
+    pairs = [(_field(row, "id"), _field(row, "updated_at")) for row in rows]
+    stamps = [updated_at for _, updated_at in pairs if updated_at]
+    last_modified = max(stamps) if stamps else None
+    etag = _make_etag(
+        request.get_full_path(),
+        ",".join(f"{pk}:{updated_at.isoformat() if updated_at else ''}" for pk, updated_at in pairs),
+        *extra,
+    )
+    return etag, _timestamp(last_modified)
+
+
+def instance_validators(instance, request):
+    """Compute the ETag and Last-Modified values for a detail response.
+
+    Args:
+        instance: The model instance (or values() dict) being retrieved.
+        request: The current request.
+    Returns:
+        tuple: The quoted ETag and the Last-Modified timestamp (or None).
+    """
+    updated_at = _field(instance, "updated_at")
+    etag = _make_etag(
+        request.get_full_path(),
+        _field(instance, "id"),
+        updated_at.isoformat() if updated_at else "",
+    )
+    return etag, _timestamp(updated_at)
+
+
+def not_modified_response(request, etag, last_modified):
+    """Return a 304 response if the client's validators still match, else None."""
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def set_validators(response, etag, last_modified):
+    """Attach ETag, Last-Modified and revalidation headers to a response."""
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
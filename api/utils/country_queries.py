@@ -0,0 +1,178 @@
+from rest_framework.exceptions import NotFound, ValidationError
+from api.utils.lookups import LOOKUP_FIELDS, filter_by_lookup
+
+
+GROUP_FIELDS = ("region", "subregion")
+
+# Most codes accepted by one ?codes= parameter
+MAX_CODES = 250
+
+
+def _split(raw):
+    """Split a comma-separated parameter value into its non-empty items."""
+    return [value.strip() for value in raw.split(",") if value.strip()]
+
+
+def parse_codes(query_params):
+    """Parse the ?codes= parameter (comma-separated or repeated ISO cca2 codes).
+
+    Returns:
+        list: The distinct upper-cased codes, in request order.
+    Raises:
+        ValidationError: If a value is empty, a code is malformed or there
+            are more than MAX_CODES codes.
+    """
+    codes = []
+    for raw in query_params.getlist("codes"):
+        values = _split(raw)
+        if not values:
+            raise ValidationError("Codes cannot be empty.")
+        codes.extend(value.upper() for value in values)
+    codes = list(dict.fromkeys(codes))
+    invalid = [code for code in codes if not (code.isascii() and code.isalpha() and len(code) <= 3)]
+    if invalid:
+        raise ValidationError(f"Invalid country code(s): {', '.join(invalid)}.")
+    if len(codes) > MAX_CODES:
+        raise ValidationError(f"At most {MAX_CODES} codes can be requested at once.")
+    return codes
+
+
+def filter_by_codes(queryset, codes):
+    """Filter a CountryInfo queryset to the given cca2 codes.
+
+    The redundant non-empty condition lets SQLite use the partial unique
+    index on cca2.
+    """
+    return queryset.filter(cca2__in=codes).exclude(cca2="")
+
+
+def parse_country_filters(query_params):
+    """Parse and validate the country list filters.
+
+    Only the query parameters are inspected, so the result can be applied by
+    both the sync and the async views; the countries referenced by
+    region_country_id / subregion_country_id are resolved by the caller.
+
+    Args:
+        query_params (QueryDict): The request's query parameters.
+    Returns:
+        dict: include_deleted, groups (region/subregion -> names),
+        country_ids (region/subregion -> id), lookups (kind -> value groups),
+        codes and name.
+    Raises:
+        ValidationError: If a filter value is empty or malformed.
+    """
+    filters = {
+        "include_deleted": query_params.get("include_deleted", "false").lower() == "true",
+        "groups": {},
+        "country_ids": {},
+        "lookups": {},
+        "codes": parse_codes(query_params),
+        "name": None,
+    }
+
+    for field in GROUP_FIELDS:
+        values = []
+        for raw in query_params.getlist(field):
+            names = _split(raw)
+            if raw and not names:
+                raise ValidationError(f"{field.capitalize()} cannot be empty.")
+            values.extend(names)
+        if values:
+            filters["groups"][field] = values
+
+        country_id = query_params.get(f"{field}_country_id")
+        if country_id:
+            if not country_id.isdigit():
+                raise ValidationError(f"{field}_country_id must be an integer.")
+            filters["country_ids"][field] = int(country_id)
+
+    for kind in LOOKUP_FIELDS:
+        groups = []
+        for raw in query_params.getlist(kind):
+            values = _split(raw)
+            if raw and not values:
+                raise ValidationError(f"{kind.capitalize()} cannot be empty.")
+            if values:
+                groups.append(values)
+        if groups:
+            filters["lookups"][kind] = groups
+
+    name = query_params.get("name")
+    if name:
+        if not name.strip():
+            raise ValidationError("Name cannot be empty.")
+        filters["name"] = name.strip()
+    return filters
+
+
+def apply_country_filters(queryset, filters, country_groups):
+    """Apply parsed filters to a CountryInfo queryset.
+
+    Args:
+        queryset: The CountryInfo queryset to filter.
+        filters (dict): The result of parse_country_filters.
+        country_groups (dict): region/subregion -> the (region, subregion) of
+            the country named by the matching *_country_id filter, or None if
+            it does not exist.
+    Returns:
+        QuerySet: The filtered queryset (not evaluated).
+    Raises:
+        NotFound: If a *_country_id filter names an unknown country.
+    """
+    if not filters["include_deleted"]:
+        queryset = queryset.filter(is_active=True)
+
+    for position, field in enumerate(GROUP_FIELDS):
+        values = filters["groups"].get(field)
+        if values:
+            queryset = queryset.filter(**{f"{field}__in": values})
+        if field in filters["country_ids"]:
+            group = country_groups.get(field)
+            if group is None:
+                raise NotFound(f"Country with ID {filters['country_ids'][field]} does not exist.")
+            value = group[position]
+            queryset = queryset.filter(**{field: value}) if value else queryset.none()
+
+    for kind, groups in filters["lookups"].items():
+        queryset = filter_by_lookup(queryset, kind, groups)
+
+    if filters["codes"]:
+        queryset = filter_by_codes(queryset, filters["codes"])
+
+    if filters["name"]:
+        queryset = queryset.filter(name__icontains=filters["name"])
+    return queryset
+
+
+def parse_requested_fields(query_params, available):
+    """Resolve the ?fields= and ?exclude= sparse fieldset parameters.
+
+    Both take comma-separated field names.
+
+    Args:
+        query_params (QueryDict): The request's query parameters.
+        available (list): The serializer's field names, in output order.
+    Returns:
+        list: The fields to return, or None for all of them.
+    Raises:
+        ValidationError: If a field is unknown or nothing is left selected.
+    """
+    selections = {}
+    for param in ("fields", "exclude"):
+        names = _split(query_params.get(param, ""))
+        if not names:
+            continue
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            raise ValidationError(f"Unknown field(s) in {param}: {', '.join(unknown)}.")
+        selections[param] = set(names)
+
+    selected = [
+        name for name in available
+        if ("fields" not in selections or name in selections["fields"])
+        and name not in selections.get("exclude", ())
+    ]
+    if not selected:
+        raise ValidationError("At least one field must be selected.")
+    return selected if len(selected) < len(available) else None
@@ -0,0 +1,88 @@
+import csv
+import io
+import json
+from asgiref.sync import sync_to_async
+from rest_framework.fields import DateTimeField
+from api.serializers.countries_info import CountryInfoSerializer
+
+
+EXPORT_CHUNK_SIZE = 2000
+JSON_FIELDS = ("languages", "currencies", "timezones")
+DATETIME_FIELDS = ("created_at", "updated_at")
+
+_datetime_field = DateTimeField()
+
+
+def export_fields():
+    """Return the exported columns, in the same order as the API output."""
+    return list(CountryInfoSerializer().fields)
+
+
+def iter_rows(queryset, fields):
+    """Stream rows as dicts with values formatted like the API output.
+
+    Rows are read with values() over a server-side iterator, so no model
+    instances are built and memory stays constant.
+    """
+    for row in queryset.values(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        for field in DATETIME_FIELDS:
+            if field in row:
+                row[field] = _datetime_field.to_representation(row[field])
+        yield row
+
+
+def iter_ndjson(queryset, fields=None):
+    """Yield the queryset as newline-delimited JSON, a chunk of rows at a time."""
+    fields = fields or export_fields()
+    lines = []
+    for row in iter_rows(queryset, fields):
+        lines.append(json.dumps(row, ensure_ascii=False, separators=(",", ":")))
+        if len(lines) >= EXPORT_CHUNK_SIZE:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def iter_csv(queryset, fields=None):
+    """Yield the queryset as CSV (JSON columns encoded as JSON strings)."""
+    fields = fields or export_fields()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    pending = 0
+    for row in iter_rows(queryset, fields):
+        writer.writerow([
+            json.dumps(row[field], ensure_ascii=False) if field in JSON_FIELDS else row[field]
+            for field in fields
+        ])
+        pending += 1
+        if pending >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+
+async def aiter_chunks(chunks):
+    """Iterate a sync chunk generator from async code, one chunk at a time.
+
+    Under ASGI Django consumes a sync streaming response with
+    sync_to_async(list), buffering the whole export in memory. Each chunk is
+    produced in the thread-sensitive sync thread instead, so the database
+    iterator keeps its connection and memory stays constant.
+    """
+    iterator = iter(chunks)
+    next_chunk = sync_to_async(next)
+    try:
+        while (chunk := await next_chunk(iterator, None)) is not None:
+            yield chunk
+    finally:
+        await sync_to_async(iterator.close)()
+
+
+EXPORT_FORMATS = {
+    "ndjson": (iter_ndjson, "application/x-ndjson", "countries.ndjson"),
+    "csv": (iter_csv, "text/csv", "countries.csv"),
+}
@@ -1,46 +1,176 @@
-import requests
-import pandas as pd
-import numpy as np
-from api.models.countries_info import CountryInfo
+import codecs
+import json
+import time
+from array import array
+from collections import defaultdict
+from itertools import islice
+from api.models.countries_info import CONTENT_FIELDS, CountryInfo, compute_content_hash
+from django.conf import settings
 from django.db import transaction
+from django.utils import timezone
+from api.signals import countries_changed
+from api.utils.metrics import observe_sync_run
+from api.utils.region_stats import deferred_stats_refresh
+from api.utils.snapshots import UpstreamSnapshot
+from api.utils.validation import feed_validator
 
-def fetch_data():
+
+# requests and pandas are imported inside the functions that use them, so that
+# importing this module (e.g. while loading management commands) stays cheap.
+
+API_URL = "https://restcountries.com/v3.1/all"
+DEFAULT_BATCH_SIZE = 500
+STREAM_CHUNK_SIZE = 64 * 1024
+MAX_REPORTED_ERRORS = 20
+
+
+class FeedResult:
+    """Outcome of fetching the upstream feed into the local snapshot.
+    
+    Attributes:
+        status (str): FRESH (new payload stored), UNCHANGED (downloaded, same
+            hash), NOT_MODIFIED (upstream answered 304), FALLBACK (upstream
+            failed, serving the stored snapshot) or FAILED.
+        snapshot (UpstreamSnapshot): The snapshot to read from (None if FAILED).
+        sha256 (str): Hash of the snapshot payload.
+        size (int): Raw bytes downloaded in this run.
+        error (str): Error message when the upstream fetch failed.
+    """
+    
+    FRESH = "fresh"
+    UNCHANGED = "unchanged"
+    NOT_MODIFIED = "not_modified"
+    FALLBACK = "fallback"
+    FAILED = "failed"
+    
+    def __init__(self, status, snapshot=None, sha256="", size=0, error=None):
+        self.status = status
+        self.snapshot = snapshot
+        self.sha256 = sha256
+        self.size = size
+        self.error = error
+    
+    @property
+    def already_synced(self):
+        """True if this exact payload was already applied to the database."""
+        return bool(self.snapshot) and self.snapshot.load_meta().get("synced_sha256") == self.sha256
+    
+    def mark_synced(self):
+        """Record that this payload has been applied to the database."""
+        meta = self.snapshot.load_meta()
+        meta["synced_sha256"] = self.sha256
+        self.snapshot.save_meta(meta)
+
+
+def _describe_fetch_error(exc, response=None):
+    """Turn an exception raised while fetching the feed into an error message."""
+    import requests
+    
+    if isinstance(exc, (requests.exceptions.Timeout, TimeoutError)):
+        return "Error: The request to the API timed out."
+    if isinstance(exc, requests.exceptions.ConnectionError):
+        return "Error: Could not connect to the API. Check internet connection."
+    if isinstance(exc, requests.exceptions.HTTPError):
+        status_code = response.status_code if response is not None else "unknown"
+        return f"Error: HTTP error occurred: {exc} (Status: {status_code})"
+    if isinstance(exc, requests.exceptions.RequestException):
+        return f"Error: An issue occurred with the request: {str(exc)}"
+    if isinstance(exc, OSError):
+        return f"Error: Could not read the source file: {str(exc)}"
+    return f"Error: An unexpected error occurred: {str(exc)}"
+
+
+def _with_deadline(chunks, deadline):
+    """Pass chunks through, raising TimeoutError once the deadline has passed."""
+    for chunk in chunks:
+        if time.monotonic() > deadline:
+            raise TimeoutError("The upstream transfer exceeded its deadline.")
+        yield chunk
+
+
+def fetch_feed(source=None):
+    """Fetch the upstream feed into the local snapshot.
+    
+    HTTP sources are requested with If-None-Match / If-Modified-Since taken from
+    the stored snapshot and a 304 short-circuits the download. The payload is
+    streamed to disk while being hashed, so an unchanged payload is detected
+    without parsing it. If the upstream is slow or unreachable, the stored
+    snapshot is used instead. Local file paths (or file:// URLs) are accepted as
+    sources so syncs can run without network access.
+    
+    Args:
+        source (str): URL or path of the feed; defaults to COUNTRIES_API_URL.
+    Returns:
+        FeedResult: The outcome; read the payload from result.snapshot.
+    """
+    source = str(source or getattr(settings, "COUNTRIES_API_URL", API_URL))
+    snapshot = UpstreamSnapshot(settings.COUNTRIES_SNAPSHOT_DIR, source)
+    meta = snapshot.load_meta()
+    timeout = getattr(settings, "COUNTRIES_FETCH_TIMEOUT", 10)
+    deadline = time.monotonic() + getattr(settings, "COUNTRIES_FETCH_DEADLINE", 120)
+    response = None
+    
+    try:
+        if source.startswith(("http://", "https://")):
+            import requests
+            
+            headers = {}
+            if snapshot.exists():
+                if meta.get("etag"):
+                    headers["If-None-Match"] = meta["etag"]
+                if meta.get("last_modified"):
+                    headers["If-Modified-Since"] = meta["last_modified"]
+            with requests.get(source, headers=headers, timeout=timeout, stream=True) as response:
+                if response.status_code == 304 and snapshot.exists():
+                    return FeedResult(FeedResult.NOT_MODIFIED, snapshot, meta.get("sha256", ""))
+                response.raise_for_status()
+                chunks = _with_deadline(response.iter_content(chunk_size=STREAM_CHUNK_SIZE), deadline)
+                sha256, size, changed = snapshot.write(chunks)
+                meta["etag"] = response.headers.get("ETag", "")
+                meta["last_modified"] = response.headers.get("Last-Modified", "")
+        else:
+            path = source[len("file://"):] if source.startswith("file://") else source
+            with open(path, "rb") as source_file:
+                sha256, size, changed = snapshot.write(iter(lambda: source_file.read(STREAM_CHUNK_SIZE), b""))
+    except Exception as e:
+        error_message = _describe_fetch_error(e, response)
+        if snapshot.exists():
+            print(f"{error_message} Falling back to the local snapshot.")
+            return FeedResult(FeedResult.FALLBACK, snapshot, meta.get("sha256", ""), error=error_message)
+        print(error_message)
+        return FeedResult(FeedResult.FAILED, error=error_message)
+    
+    meta.update(source=source, sha256=sha256, size=size, fetched_at=timezone.now().isoformat())
+    snapshot.save_meta(meta)
+    return FeedResult(FeedResult.FRESH if changed else FeedResult.UNCHANGED, snapshot, sha256, size)
+
+
+def fetch_data(source=None):
     """Fetch data from the external API.
-    This function fetches data from an external API and returns the response.
+    This function fetches the feed through the local snapshot (see fetch_feed)
+    and returns the decoded payload.
     
+    Args:
+        source (str): URL or path of the feed; defaults to COUNTRIES_API_URL.
     Returns:
         list: The response from the API.
         str: Error message if any, else None.
     """
-    api_url = "https://restcountries.com/v3.1/all"
-    countries_data = []
-    error_message = None
+    feed = fetch_feed(source)
+    if feed.snapshot is None:
+        return [], feed.error
     
     try:
-        response = requests.get(api_url, timeout=10)
-        response.raise_for_status()
-        countries_data = response.json()
-        
-        # Sort data alphabetically by country name
-        countries_data.sort(key=lambda x: x.get('name', {}).get('common', ''))
-        print(f"Number of countries fetched: {len(countries_data)}")
-    except requests.exceptions.Timeout:
-        error_message = "Error: The request to the API timed out."
-    except requests.exceptions.ConnectionError:
-        error_message = "Error: Could not connect to the API. Check internet connection."
-    except requests.exceptions.HTTPError as http_err:
-        error_message = f"Error: HTTP error occurred: {http_err} (Status: {response.status_code})"
-    except requests.exceptions.JSONDecodeError:
+        countries_data = json.loads(b"".join(feed.snapshot.iter_chunks()))
+    except ValueError:
         error_message = "Error: Failed to decode JSON response from the API."
-    except requests.exceptions.RequestException as req_err:
-        error_message = f"Error: An issue occurred with the request: {str(req_err)}"
-    except Exception as e:
-        error_message = f"Error: An unexpected error occurred: {str(e)}"
-
-    if error_message:
         print(error_message)
-
-    return countries_data, error_message
+        return [], error_message
+    
+    # Sort data alphabetically by country name
+    countries_data.sort(key=lambda x: x.get('name', {}).get('common', ''))
+    print(f"Number of countries fetched: {len(countries_data)}")
+    return countries_data, None
 
 def preprocess_data(fetched_data):
     """Preprocess the fetched data using Pandas.
@@ -54,6 +184,8 @@ def preprocess_data(fetched_data):
     if not fetched_data:
         return []
 
+    import pandas as pd
+
     # Convert fetched data to a Pandas DataFrame
     df = pd.DataFrame(fetched_data)
 
@@ -64,8 +196,8 @@ def preprocess_data(fetched_data):
         "capital": df["capital"].apply(lambda x: x[0] if isinstance(x, list) and x else ""),
         "region": df["region"].fillna(""),
         "subregion": df["subregion"].fillna(""),
-        "population": df["population"].fillna(0).astype(int),
-        "area": df["area"].fillna(0.0).astype(float),
+        "population": df["population"].fillna(0).apply(lambda x: coerce_number(x, int)),
+        "area": df["area"].fillna(0.0).apply(lambda x: coerce_number(x, float)),
         "languages": df["languages"].apply(lambda x: list(x.values()) if isinstance(x, dict) else []),
         "currencies": df["currencies"].apply(lambda x: list(x.values()) if isinstance(x, dict) else []),
         "timezones": df["timezones"].apply(lambda x: x if isinstance(x, list) else []),
@@ -76,69 +208,433 @@ def preprocess_data(fetched_data):
     # Convert DataFrame to list of dictionaries
     return processed_data.to_dict("records")
 
-def populate_database():
-    """Populate the database with the processed data using bulk operations.
-    This function takes the processed data and populates the database with it.
+def iter_json_array(chunks):
+    """Incrementally parse a top-level JSON array of objects.
+    
+    Only the undecoded tail of the stream is buffered, so memory is bounded by
+    the largest single element rather than by the whole document.
+    
+    Args:
+        chunks (iterable): Raw UTF-8 byte chunks.
+    Yields:
+        object: Each decoded array element.
+    Raises:
+        ValueError: If the payload is not a complete JSON array.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    position = 0
+    started = False
+    
+    for chunk in chunks:
+        buffer = buffer[position:] + text_decoder.decode(chunk)
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position >= len(buffer):
+                break
+            if not started:
+                if buffer[position] != "[":
+                    raise ValueError("Expected the payload to be a JSON array.")
+                started = True
+                position += 1
+                continue
+            if buffer[position] == "]":
+                return
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # The element is incomplete; wait for the next chunk
+                break
+            yield item
+    
+    raise ValueError("The JSON array ended unexpectedly.")
+
+
+def coerce_number(value, kind):
+    """Convert a numeric feed value to kind, leaving invalid values for the validator.
+    
+    A missing or empty value becomes 0. A value that cannot be converted
+    (e.g. "unknown", a boolean or an object) is returned unchanged, so the
+    batch validator rejects and reports that record alone instead of the
+    whole sync failing.
     
+    Args:
+        value: The value from the feed.
+        kind (type): int or float.
     Returns:
-        None
+        The converted value, or the original one if it is not a number.
     """
-    fetched_data, error_msg = fetch_data()
+    if value is None or value == "":
+        return kind(0)
+    if isinstance(value, (bool, dict, list)):
+        return value
+    try:
+        return kind(value)
+    except (TypeError, ValueError, OverflowError):
+        return value
+
+
+def transform_record(record):
+    """Extract the CountryInfo fields from one upstream record.
     
-    if error_msg:
-        print(f"Error: Failed to fetch data from the API: {error_msg}")
-        return
+    Pure-Python equivalent of preprocess_data for a single record, used by the
+    streaming pipeline.
     
-    if not fetched_data:
-        print("Warning: No data fetched from the API.")
-        return
+    Args:
+        record (dict): A country as returned by the API.
+    Returns:
+        dict: The country fields ready for CountryInfo.
+    """
+    name = record.get("name")
+    capital = record.get("capital")
+    languages = record.get("languages")
+    currencies = record.get("currencies")
+    timezones = record.get("timezones")
+    flags = record.get("flags")
+    return {
+        "name": name.get("common", "") if isinstance(name, dict) else "",
+        "cca2": record.get("cca2") or "",
+        "capital": capital[0] if isinstance(capital, list) and capital else "",
+        "region": record.get("region") or "",
+        "subregion": record.get("subregion") or "",
+        "population": coerce_number(record.get("population"), int),
+        "area": coerce_number(record.get("area"), float),
+        "languages": list(languages.values()) if isinstance(languages, dict) else [],
+        "currencies": list(currencies.values()) if isinstance(currencies, dict) else [],
+        "timezones": timezones if isinstance(timezones, list) else [],
+        "flag": flags.get("png", "") if isinstance(flags, dict) else "",
+        "is_active": True,
+    }
+
+
+def stream_data(feed):
+    """Stream transformed country records from a fetched feed.
     
-    processed_countries = preprocess_data(fetched_data)
-    if not processed_countries:
-        print("Warning: No data to process.")
-        return
+    The snapshot payload is read in fixed-size chunks and parsed
+    incrementally, so the full payload is never held in memory.
+    
+    Args:
+        feed (FeedResult): The result of fetch_feed.
+    Yields:
+        dict: Transformed country records.
+    """
+    for record in iter_json_array(feed.snapshot.iter_chunks()):
+        if isinstance(record, dict):
+            yield transform_record(record)
+
+
+def iter_batches(iterable, size):
+    """Yield lists of at most size items from iterable."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _sync_batch(batch, now, report, seen_ids):
+    """Create or update one batch of processed countries.
     
-    print(f"Number of countries to be populated: {len(processed_countries)}")
+    Incoming records are hashed and compared with the content_hash stored on
+    the existing rows of the batch, so unchanged rows are never loaded in full
+    or rewritten. Changed rows are updated on just the fields that differ.
     
-    created_count = 0
-    updated_count = 0
+    Args:
+        batch (list): Processed country dictionaries.
+        now (datetime): The timestamp written to updated_at.
+        report (dict): The sync report, updated in place.
+        seen_ids (array): Ids of every row present in the feed, extended in place.
+    """
+    incoming = {country["name"]: country for country in batch}
+    hashes = {name: compute_content_hash(country) for name, country in incoming.items()}
     
-    # Define editable fields for bulk_update
-    editable_fields = [
-        "name", "cca2", "capital", "region", "subregion", 
-        "population", "area", "languages", "currencies", 
-        "timezones", "flag", "is_active"
+    # Compare hashes without loading the JSON columns of existing rows
+    existing = {
+        name: (pk, content_hash, is_active)
+        for pk, name, content_hash, is_active in CountryInfo.objects.filter(
+            name__in=list(incoming)
+        ).values_list("id", "name", "content_hash", "is_active")
+    }
+    seen_ids.extend(pk for pk, _, _ in existing.values())
+    changed_names = [
+        name for name, (_, content_hash, is_active) in existing.items()
+        if (content_hash, is_active) != (hashes[name], True)
     ]
+    report["unchanged"] += len(existing) - len(changed_names)
     
-    # Convert processed data to CountryInfo objects
-    existing_countries = {c.name: c for c in CountryInfo.objects.all()}
-    to_create = []
-    to_update = []
+    to_create = [
+        CountryInfo(**country, content_hash=hashes[name])
+        for name, country in incoming.items() if name not in existing
+    ]
     
-    for country_data in processed_countries:
-        country_name = country_data["name"]
-        if country_name in existing_countries:
-            # Update existing country
-            country = existing_countries[country_name]
-            for key, value in country_data.items():
-                setattr(country, key, value)
+    # Group changed rows by the set of fields that actually differ
+    to_update = []
+    update_groups = defaultdict(list)
+    for country in CountryInfo.objects.filter(name__in=changed_names):
+        data = incoming[country.name]
+        changed_fields = [field for field in CONTENT_FIELDS if getattr(country, field) != data[field]]
+        if not country.is_active:
+            changed_fields.append("is_active")
+        for field in changed_fields:
+            setattr(country, field, data[field])
+        country.content_hash = hashes[country.name]
+        if changed_fields:
+            country.updated_at = now
             to_update.append(country)
+            update_groups[tuple(changed_fields) + ("content_hash", "updated_at")].append(country)
         else:
-            # Create new country
-            to_create.append(CountryInfo(**country_data))
+            # Only the stored hash was stale; refresh it without touching updated_at
+            update_groups[("content_hash",)].append(country)
+            report["unchanged"] += 1
     
-    # Perform bulk operations within a transaction
-    try:
-        with transaction.atomic():
-            if to_create:
-                CountryInfo.objects.bulk_create(to_create)
-                created_count = len(to_create)
-            if to_update:
-                CountryInfo.objects.bulk_update(to_update, fields=editable_fields)
-                updated_count = len(to_update)
-    except Exception as e:
-        print(f"Error: Failed to save country data in bulk operation. Error: {str(e)}")
+    released = _release_codes([*to_create, *to_update], now)
+    if to_create:
+        CountryInfo.objects.bulk_create(to_create)
+        seen_ids.extend(country.pk for country in to_create)
+    for fields, countries in update_groups.items():
+        CountryInfo.objects.bulk_update(countries, fields=list(fields))
+    
+    report["created"] += len(to_create)
+    report["updated"] += len(to_update)
+    updated_ids = {country.pk for country in to_update}
+    changed = to_create + to_update + [country for country in released if country.pk not in updated_ids]
+    if changed:
+        # Bulk operations skip post_save, so notify listeners (response
+        # cache, lookup tables, search index) within the same transaction.
+        countries_changed.send(sender=CountryInfo, instances=changed)
+
+
+def _release_codes(countries, now):
+    """Clear the codes held by other rows before the given rows are written.
+    
+    Rows are matched by name, so a country renamed upstream gets a new row
+    while the old one, which still holds the same code, is only deactivated
+    at the end of the sync; codes swapped between countries clash the same
+    way. The released rows get an empty content hash, so they are rewritten
+    if they are still in the feed.
+    
+    Args:
+        countries (list): CountryInfo rows about to be created or updated.
+        now (datetime): The timestamp written to updated_at.
+    Returns:
+        list: The rows whose code was released.
+    """
+    claims = {country.cca2: country.name for country in countries if country.cca2}
+    if not claims:
+        return []
+    released = [
+        country for country in CountryInfo.objects.filter(cca2__in=list(claims))
+        if claims[country.cca2] != country.name
+    ]
+    for country in released:
+        country.cca2 = ""
+        country.content_hash = ""
+        country.updated_at = now
+    if released:
+        CountryInfo.objects.bulk_update(released, fields=["cca2", "content_hash", "updated_at"])
+    return released
+
+
+def _reject_invalid(batch, report, seen_ids, seen_codes):
+    """Drop the records of a batch that fail feed validation.
+    
+    Besides the feed validator's checks, a record claiming a country code
+    already used by another country earlier in the feed is rejected, since
+    codes are unique.
+    Existing rows whose incoming record was rejected are marked as seen, so
+    they keep their last good version instead of being deactivated.
+    
+    Args:
+        batch (list): Processed country dictionaries.
+        report (dict): The sync report, updated in place.
+        seen_ids (array): Ids of every row present in the feed, extended in place.
+        seen_codes (dict): Country code -> name of the first valid record
+            using it, updated in place.
+    Returns:
+        list: The valid records of the batch.
+    """
+    errors = feed_validator.validate(batch)
+    for index, country in enumerate(batch):
+        code = country.get("cca2")
+        if index in errors or not code:
+            continue
+        holder = seen_codes.setdefault(code, country["name"])
+        if holder != country["name"]:
+            errors[index] = {"cca2": [f"Country code {code} is already used by {holder!r} in this feed."]}
+    if not errors:
+        return batch
+    
+    report["rejected"] += len(errors)
+    for index, row_errors in errors.items():
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append({"name": batch[index].get("name"), "errors": row_errors})
+    names = [
+        batch[index]["name"] for index in errors
+        if isinstance(batch[index].get("name"), str) and batch[index]["name"]
+    ]
+    seen_ids.extend(CountryInfo.objects.filter(name__in=names).values_list("id", flat=True))
+    return [country for index, country in enumerate(batch) if index not in errors]
+
+
+def _deactivate_missing(seen_ids, now, report, batch_size):
+    """Soft-deactivate active rows whose id was not seen in the feed.
+    
+    The sorted seen ids are merged against the active ids streamed from the
+    database in id order, so neither side is loaded as model objects in full.
+    """
+    seen = array("q", sorted(seen_ids))
+    index = 0
+    missing = []
+    
+    def flush():
+        countries = list(CountryInfo.objects.filter(id__in=missing))
+        for country in countries:
+            country.is_active = False
+            country.updated_at = now
+        CountryInfo.objects.bulk_update(countries, fields=["is_active", "updated_at"])
+        report["deactivated"] += len(countries)
+        countries_changed.send(sender=CountryInfo, instances=countries)
+        missing.clear()
+    
+    active_ids = CountryInfo.objects.filter(is_active=True).order_by("id").values_list("id", flat=True)
+    for pk in active_ids.iterator(chunk_size=batch_size):
+        while index < len(seen) and seen[index] < pk:
+            index += 1
+        if index >= len(seen) or seen[index] != pk:
+            missing.append(pk)
+            if len(missing) >= batch_size:
+                flush()
+    if missing:
+        flush()
+
+
+def sync_countries(processed_countries, batch_size=DEFAULT_BATCH_SIZE):
+    """Apply processed country records to the database, writing only changes.
+    
+    Records are consumed in fixed-size batches, so a generator input keeps peak
+    memory bounded by the batch size (plus one integer per seen row and one
+    entry per country code). New rows are bulk created, changed rows are bulk
+    updated on the fields that differ, and active rows missing from the feed
+    are soft-deactivated. Records failing feed validation or reusing a country
+    code already in the feed are rejected and reported instead of written.
+    Listeners are only notified when something was written, so a no-op sync
+    leaves downstream caches intact. Everything runs in one transaction, and region
+    stats are refreshed once at the end rather than per batch.
+    
+    Args:
+        processed_countries (iterable): Country dictionaries (a list from
+            preprocess_data or a generator from stream_data).
+        batch_size (int): Number of records written per bulk operation.
+    Returns:
+        dict: Created/updated/unchanged/deactivated/rejected counts and the
+        first validation errors.
+    """
+    report = {"created": 0, "updated": 0, "unchanged": 0, "deactivated": 0, "rejected": 0, "errors": []}
+    now = timezone.now()
+    seen_ids = array("q")
+    seen_codes = {}
+    
+    with transaction.atomic(), deferred_stats_refresh():
+        received = 0
+        for batch in iter_batches(processed_countries, batch_size):
+            received += len(batch)
+            batch = _reject_invalid(batch, report, seen_ids, seen_codes)
+            if batch:
+                _sync_batch(batch, now, report, seen_ids)
+        
+        # Never wipe the table because of an empty (or entirely invalid) feed
+        if received > report["rejected"]:
+            _deactivate_missing(seen_ids, now, report, batch_size)
+    
+    report["received"] = received
+    return report
+
+
+@observe_sync_run
+def populate_database(stream=True, batch_size=DEFAULT_BATCH_SIZE, source=None, force=False):
+    """Populate the database with the processed data using bulk operations.
+    This function fetches the upstream data and applies it with sync_countries.
+    
+    If the upstream answers 304, or the downloaded payload has the same hash as
+    the one last synced, the sync is skipped entirely.
+    
+    Args:
+        stream (bool): Stream and transform the feed incrementally in batches.
+            When False, the payload is loaded whole and preprocessed with pandas.
+        batch_size (int): Number of records written per bulk operation.
+        source (str): URL or path of the feed; defaults to COUNTRIES_API_URL.
+        force (bool): Sync even if the payload was already applied.
+    Returns:
+        dict: The sync report (counts, feed status, fetched bytes and per-stage
+        timings in seconds), or None if nothing could be fetched or saved.
+    """
+    timings = {}
+    started = time.perf_counter()
+    feed = fetch_feed(source)
+    timings["fetch"] = time.perf_counter() - started
+    
+    if feed.snapshot is None:
+        print(f"Error: Failed to fetch data from the API: {feed.error}")
         return
     
-    print(f"Database population complete. Created: {created_count}, Updated: {updated_count}")
-    
\ No newline at end of file
+    report = {
+        "created": 0, "updated": 0, "unchanged": 0, "deactivated": 0, "rejected": 0, "errors": [], "received": 0,
+    }
+    if feed.already_synced and not force:
+        print("Upstream data has not changed since the last sync; nothing to do.")
+    elif stream:
+        stage_started = time.perf_counter()
+        try:
+            report = sync_countries(stream_data(feed), batch_size=batch_size)
+        except ValueError as e:
+            print(f"Error: Failed to decode JSON response from the API: {str(e)}")
+            return
+        except Exception as e:
+            print(f"Error: Failed to save country data in bulk operation. Error: {str(e)}")
+            return
+        if not report["received"]:
+            print("Warning: No data fetched from the API.")
+            return
+        timings["sync"] = time.perf_counter() - stage_started
+        feed.mark_synced()
+    else:
+        try:
+            fetched_data = json.loads(b"".join(feed.snapshot.iter_chunks()))
+        except ValueError:
+            print("Error: Failed to fetch data from the API: Error: Failed to decode JSON response from the API.")
+            return
+        
+        if not fetched_data:
+            print("Warning: No data fetched from the API.")
+            return
+        
+        stage_started = time.perf_counter()
+        processed_countries = preprocess_data(fetched_data)
+        timings["preprocess"] = time.perf_counter() - stage_started
+        if not processed_countries:
+            print("Warning: No data to process.")
+            return
+        
+        print(f"Number of countries to be populated: {len(processed_countries)}")
+        
+        stage_started = time.perf_counter()
+        try:
+            report = sync_countries(processed_countries, batch_size=batch_size)
+        except Exception as e:
+            print(f"Error: Failed to save country data in bulk operation. Error: {str(e)}")
+            return
+        timings["sync"] = time.perf_counter() - stage_started
+        feed.mark_synced()
+    
+    timings["total"] = time.perf_counter() - started
+    report["feed_status"] = feed.status
+    report["fetched_bytes"] = feed.size
+    report["timings"] = timings
+    
+    print(
+        f"Database population complete ({feed.status}). Created: {report['created']}, "
+        f"Updated: {report['updated']}, Unchanged: {report['unchanged']}, "
+        f"Deactivated: {report['deactivated']}, Rejected: {report['rejected']} ({timings['total']:.2f}s)"
+    )
+    return report
@@ -0,0 +1,109 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+# Metrics of the request being handled. A context variable rather than a
+# thread local, so queries run by async views through sync_to_async (in
+# another thread, on another connection) still count towards their request.
+_current = ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    """Query and timing counters of one request.
+
+    Attributes:
+        queries (int): Number of SQL statements executed.
+        sql_seconds (float): Total time spent executing them.
+        statements (Counter): Executions per SQL template (parameters are
+            not part of the template, so a query repeated per row shows up as
+            one template with a high count).
+        spans (dict): Seconds spent per named phase (see timed()).
+    """
+
+    __slots__ = ("started", "queries", "sql_seconds", "statements", "spans")
+
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.statements = Counter()
+        self.spans = {}
+
+
+    def elapsed(self):
+        """Return the seconds since the request started."""
+        return time.perf_counter() - self.started
+
+
+    def repeated_statements(self, threshold):
+        """Return (template, count) for the templates run at least threshold times, most frequent first."""
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= threshold]
+
+
+def start_request():
+    """Start collecting metrics for the current request.
+
+    Returns:
+        tuple: (RequestMetrics, token to pass to end_request).
+    """
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def resume_request(metrics):
+    """Make metrics current again, e.g. while a streaming response produces a chunk.
+
+    Returns:
+        Token to pass to end_request.
+    """
+    return _current.set(metrics)
+
+
+def end_request(token):
+    """Stop collecting metrics for the request started with the given token."""
+    _current.reset(token)
+
+
+def current_metrics():
+    """Return the metrics of the request being handled, or None outside a request."""
+    return _current.get()
+
+
+@contextmanager
+def timed(name):
+    """Add the time spent in the block to the current request's named span.
+
+    Spans of the same name are summed. Outside a request this does nothing.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.spans[name] = metrics.spans.get(name, 0.0) + time.perf_counter() - started
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper counting and timing the statements of a request."""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.sql_seconds += time.perf_counter() - started
+        metrics.queries += 1
+        metrics.statements[sql] += 1
+
+
+def install_query_recorder(connection):
+    """Add record_query to a database connection's execute wrappers, once."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
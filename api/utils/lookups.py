@@ -0,0 +1,74 @@
+from api.models.country_lookups import CountryLookup
+
+
+# Lookup kind -> CountryInfo JSON field it is derived from
+LOOKUP_FIELDS = {
+    CountryLookup.LANGUAGE: "languages",
+    CountryLookup.CURRENCY: "currencies",
+    CountryLookup.TIMEZONE: "timezones",
+}
+
+
+def normalize_value(value):
+    """Normalize a lookup value for case-insensitive exact matching."""
+    return " ".join(str(value).split()).casefold()
+
+
+def iter_lookup_values(country):
+    """Yield the (kind, normalized value) pairs derived from a country.
+
+    Currencies fetched from the upstream API are objects such as
+    {"name": "Euro", "symbol": "€"}; those are indexed by their name.
+
+    Args:
+        country: A CountryInfo instance (or any object with the JSON fields).
+    Yields:
+        tuple: Unique (kind, value) pairs.
+    """
+    seen = set()
+    for kind, field in LOOKUP_FIELDS.items():
+        for item in getattr(country, field, None) or []:
+            if isinstance(item, dict):
+                item = item.get("name", "")
+            value = normalize_value(item)[:200]
+            if value and (kind, value) not in seen:
+                seen.add((kind, value))
+                yield kind, value
+
+
+def rebuild_lookups(countries):
+    """Replace the lookup rows of the given countries.
+
+    Args:
+        countries (list): Saved CountryInfo instances.
+    """
+    countries = [country for country in countries if country.pk is not None]
+    if not countries:
+        return
+    CountryLookup.objects.filter(country_id__in=[country.pk for country in countries]).delete()
+    CountryLookup.objects.bulk_create([
+        CountryLookup(country_id=country.pk, kind=kind, value=value)
+        for country in countries
+        for kind, value in iter_lookup_values(country)
+    ])
+
+
+def filter_by_lookup(queryset, kind, groups):
+    """Filter a CountryInfo queryset by normalized lookup values.
+
+    Values within a group are OR'ed; groups are AND'ed. Every group becomes an
+    indexed (kind, value) subquery, so the filter stays a single query.
+
+    Args:
+        queryset: The CountryInfo queryset to filter.
+        kind (str): One of the CountryLookup kinds.
+        groups (list): Lists of raw values.
+    Returns:
+        QuerySet: The filtered queryset.
+    """
+    for values in groups:
+        normalized = {normalize_value(value) for value in values}
+        queryset = queryset.filter(
+            id__in=CountryLookup.objects.filter(kind=kind, value__in=normalized).values("country_id")
+        )
+    return queryset
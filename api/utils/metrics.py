@@ -0,0 +1,401 @@
+import atexit
+import logging
+import math
+import multiprocessing.util
+import os
+import sqlite3
+import threading
+import time
+from functools import wraps
+from pathlib import Path
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Every process keeps its samples in memory and a background thread writes
+# them, as absolute per-process values, to one SQLite file shared by the
+# processes of the host. The metrics view sums them over processes, so the
+# exposed values are the same whichever worker answers the scrape.
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS metric_samples (
+        process TEXT NOT NULL, name TEXT NOT NULL, labels TEXT NOT NULL, le TEXT NOT NULL,
+        mode TEXT NOT NULL, value REAL NOT NULL, updated_at REAL NOT NULL,
+        PRIMARY KEY (process, name, labels, le)
+    ) WITHOUT ROWID
+"""
+UPSERT_SQL = """
+    INSERT INTO metric_samples (process, name, labels, le, mode, value, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (process, name, labels, le) DO UPDATE SET
+        value = excluded.value, updated_at = excluded.updated_at
+"""
+# The samples of exited processes are folded into the "archived" process, so
+# counters keep their totals across worker restarts without the table growing.
+ARCHIVE_SUMS_SQL = """
+    INSERT INTO metric_samples (process, name, labels, le, mode, value, updated_at)
+    SELECT 'archived', name, labels, le, mode, SUM(value), MAX(updated_at)
+    FROM metric_samples WHERE process IN ({processes}) AND mode = 'sum'
+    GROUP BY name, labels, le
+    ON CONFLICT (process, name, labels, le) DO UPDATE SET
+        value = value + excluded.value, updated_at = max(updated_at, excluded.updated_at)
+"""
+ARCHIVE_LATEST_SQL = """
+    INSERT INTO metric_samples (process, name, labels, le, mode, value, updated_at)
+    SELECT 'archived', name, labels, le, mode, value, MAX(updated_at)
+    FROM metric_samples WHERE process IN ({processes}) AND mode = 'latest'
+    GROUP BY name, labels, le
+    ON CONFLICT (process, name, labels, le) DO UPDATE SET
+        value = excluded.value, updated_at = excluded.updated_at
+    WHERE excluded.updated_at >= metric_samples.updated_at
+"""
+ARCHIVED = "archived"
+
+# Request latency buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value):
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _process_alive(process):
+    """Return True unless the process behind a sample owner has exited."""
+    pid = int(process.split(":", 1)[0])
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MetricStore:
+    """This process's metric samples and the host-wide sample table.
+
+    Samples are updated in memory under a lock and written to METRICS_DB_PATH
+    every METRICS_FLUSH_INTERVAL seconds by a daemon thread (and at exit), so
+    recording a metric never touches the disk. Rows are owned by a
+    "pid:start time" token; a forked child starts from empty samples under a
+    new token. Processes are assumed to share one host (and pid namespace):
+    the rows of exited processes are found with kill(pid, 0).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self.process = f"{self._pid}:{time.time():.6f}"
+        self._samples = {}
+        self._dirty = set()
+        self._local = threading.local()
+        self._flusher = None
+
+
+    def _connection(self):
+        """Return this thread's connection, creating the database if needed."""
+        path = Path(settings.METRICS_DB_PATH)
+        # A connection must not cross a fork, and tests may point the
+        # setting at another file
+        owner = (os.getpid(), path)
+        if getattr(self._local, "owner", None) != owner:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute(SCHEMA)
+            self._local.connection = connection
+            self._local.owner = owner
+        return self._local.connection
+
+
+    def update(self, key, mode, amount=None, value=None):
+        """Add amount to a sample, or set it to value.
+
+        Args:
+            key (tuple): (sample name, label string, le).
+            mode (str): How processes are aggregated: "sum", "livesum" (sum
+                over running processes) or "latest" (most recently set value).
+        """
+        now = time.time()
+        with self._lock:
+            if os.getpid() != self._pid:
+                self._reset()
+            sample = self._samples.get(key)
+            if sample is None:
+                sample = self._samples[key] = [mode, 0.0, now]
+            sample[1] = value if amount is None else sample[1] + amount
+            sample[2] = now
+            self._dirty.add(key)
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run_flusher, name="metrics-flusher", daemon=True)
+                self._flusher.start()
+                # multiprocessing children (e.g. uvicorn workers) exit without
+                # running atexit, and drop the finalizers of their parent
+                multiprocessing.util.Finalize(None, self.flush, exitpriority=10)
+
+
+    def _run_flusher(self):
+        while True:
+            time.sleep(getattr(settings, "METRICS_FLUSH_INTERVAL", 1.0))
+            self.flush()
+
+
+    def flush(self):
+        """Write this process's changed samples to the shared table."""
+        with self._lock:
+            if os.getpid() != self._pid or not self._dirty:
+                return
+            rows = [(self.process, *key, *self._samples[key]) for key in self._dirty]
+            self._dirty = set()
+        try:
+            connection = self._connection()
+            with connection:
+                connection.execute("BEGIN")
+                connection.executemany(UPSERT_SQL, rows)
+        except sqlite3.Error:
+            logger.exception("Failed to write metrics to %s; retrying at the next flush.", settings.METRICS_DB_PATH)
+            with self._lock:
+                self._dirty.update(row[1:4] for row in rows)
+
+
+    def collect(self):
+        """Return the samples aggregated over the processes of the host.
+
+        This process's pending samples are written first, and the rows of
+        exited processes are archived.
+
+        Returns:
+            dict: (sample name, label string, le) -> aggregated value.
+        """
+        self.flush()
+        connection = self._connection()
+        processes = [row[0] for row in connection.execute("SELECT DISTINCT process FROM metric_samples")]
+        exited = [process for process in processes if process != ARCHIVED and not _process_alive(process)]
+        if exited:
+            placeholders = ", ".join("?" * len(exited))
+            with connection:
+                connection.execute("BEGIN IMMEDIATE")
+                connection.execute(ARCHIVE_SUMS_SQL.format(processes=placeholders), exited)
+                connection.execute(ARCHIVE_LATEST_SQL.format(processes=placeholders), exited)
+                connection.execute(f"DELETE FROM metric_samples WHERE process IN ({placeholders})", exited)
+
+        values, latest = {}, {}
+        for name, labels, le, mode, value, updated_at in connection.execute(
+            "SELECT name, labels, le, mode, value, updated_at FROM metric_samples"
+        ):
+            key = (name, labels, le)
+            if mode == "latest":
+                if key not in latest or updated_at >= latest[key]:
+                    latest[key] = updated_at
+                    values[key] = value
+            else:
+                # Exited processes' "livesum" rows were deleted above
+                values[key] = values.get(key, 0.0) + value
+        return values
+
+
+metric_store = MetricStore()
+atexit.register(metric_store.flush)
+
+# Metric families by name, in registration (and exposition) order
+REGISTRY = {}
+
+
+class Metric:
+    """A metric family; subclasses define how samples are recorded."""
+
+    type = None
+    mode = "sum"
+
+    def __init__(self, name, documentation, labelnames=(), mode=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        if mode is not None:
+            self.mode = mode
+        REGISTRY[name] = self
+
+
+    def label_string(self, labels):
+        """Format label values (keyword arguments) in labelnames order."""
+        return ",".join(f'{name}="{_escape(labels[name])}"' for name in self.labelnames)
+
+
+    def expose(self, values):
+        """Return the exposition lines of this family."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        samples = sorted((labels, value) for (name, labels, le), value in values.items() if name == self.name)
+        if not samples and not self.labelnames and self.type == "counter":
+            samples = [("", 0.0)]
+        for labels, value in samples:
+            lines.append(f"{self.name}{{{labels}}} {_format_value(value)}" if labels else f"{self.name} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    """A value that only goes up, summed over processes."""
+
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        metric_store.update((self.name, self.label_string(labels), ""), self.mode, amount=amount)
+
+
+class Gauge(Metric):
+    """A value that goes up and down.
+
+    With mode "livesum" the values of the running processes are added up
+    (e.g. requests in flight); with mode "latest" the most recently set value
+    is exposed, whichever process set it (e.g. the last sync's duration).
+    """
+
+    type = "gauge"
+    mode = "livesum"
+
+    def set(self, value, **labels):
+        metric_store.update((self.name, self.label_string(labels), ""), self.mode, value=value)
+
+
+    def inc(self, amount=1, **labels):
+        metric_store.update((self.name, self.label_string(labels), ""), self.mode, amount=amount)
+
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """Observations counted into buckets, summed over processes.
+
+    Each observation updates a single bucket sample (plus the sum and count);
+    the cumulative le buckets are built at exposition.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(set(buckets) | {math.inf}))
+        self.bucket_labels = [_format_value(bound) for bound in self.buckets]
+
+
+    def observe(self, value, **labels):
+        label_string = self.label_string(labels)
+        for bound, le in zip(self.buckets, self.bucket_labels):
+            if value <= bound:
+                break
+        metric_store.update((f"{self.name}_bucket", label_string, le), self.mode, amount=1)
+        metric_store.update((f"{self.name}_sum", label_string, ""), self.mode, amount=value)
+        metric_store.update((f"{self.name}_count", label_string, ""), self.mode, amount=1)
+
+
+    def expose(self, values):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        label_sets = sorted({labels for (name, labels, le) in values if name == f"{self.name}_count"})
+        for labels in label_sets:
+            prefix = f"{labels}," if labels else ""
+            cumulative = 0.0
+            for le in self.bucket_labels:
+                cumulative += values.get((f"{self.name}_bucket", labels, le), 0.0)
+                lines.append(f'{self.name}_bucket{{{prefix}le="{le}"}} {_format_value(cumulative)}')
+            for suffix in ("_sum", "_count"):
+                value = _format_value(values.get((f"{self.name}{suffix}", labels, ""), 0.0))
+                lines.append(f"{self.name}{suffix}{{{labels}}} {value}" if labels else f"{self.name}{suffix} {value}")
+        return lines
+
+
+def render_metrics():
+    """Render every registered family in the Prometheus text format (0.0.4)."""
+    values = metric_store.collect()
+    lines = []
+    for metric in REGISTRY.values():
+        lines.extend(metric.expose(values))
+    return "\n".join(lines) + "\n"
+
+
+REQUEST_DURATION = Histogram(
+    "countries_http_request_duration_seconds", "Request latency by route, method and status.",
+    ["route", "method", "status"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "countries_http_requests_in_flight", "Requests being handled by the running worker processes.",
+)
+CACHE_LOOKUPS = Counter(
+    "countries_cache_lookups_total", "Cache lookups by cache (responses, groups, users) and result (hit, miss).",
+    ["cache", "result"],
+)
+THROTTLE_REJECTIONS = Counter(
+    "countries_throttle_rejections_total", "Requests rejected by a throttle, by throttle scope.", ["scope"],
+)
+SYNC_RUNS = Counter(
+    "countries_sync_runs_total", "Upstream sync runs by result (success, skipped, failure).", ["result"],
+)
+SYNC_LAST_DURATION = Gauge(
+    "countries_sync_last_duration_seconds", "Duration of the last sync run.", mode="latest",
+)
+SYNC_LAST_SUCCESS = Gauge(
+    "countries_sync_last_success_timestamp_seconds", "Unix time the last successful sync run finished.",
+    mode="latest",
+)
+SYNC_ROWS = Counter(
+    "countries_sync_rows_total", "Rows written by sync runs, by action.", ["action"],
+)
+SYNC_LAST_ROWS = Gauge(
+    "countries_sync_last_rows", "Rows handled by the last successful sync run, by action.", ["action"],
+    mode="latest",
+)
+SYNC_FETCHED_BYTES = Counter(
+    "countries_sync_fetched_bytes_total", "Bytes of upstream payload downloaded by sync runs.",
+)
+SYNC_LAST_FETCHED_BYTES = Gauge(
+    "countries_sync_last_fetched_bytes", "Bytes downloaded by the last successful sync run.", mode="latest",
+)
+SYNC_ACTIONS = ("created", "updated", "unchanged", "deactivated", "rejected")
+
+
+def observe_sync_run(populate):
+    """Record the sync metrics of each call of a populate_database-like function.
+
+    A None result or an exception counts as a failure; a run that found the
+    upstream unchanged counts as skipped. Sync runs are rare and often happen
+    in short-lived processes, so the samples are written immediately.
+    """
+    @wraps(populate)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        report = None
+        try:
+            report = populate(*args, **kwargs)
+            return report
+        finally:
+            SYNC_LAST_DURATION.set(time.perf_counter() - started)
+            if report is None:
+                SYNC_RUNS.inc(result="failure")
+            else:
+                SYNC_FETCHED_BYTES.inc(report.get("fetched_bytes") or 0)
+                if "sync" not in report.get("timings", {}):
+                    SYNC_RUNS.inc(result="skipped")
+                else:
+                    SYNC_RUNS.inc(result="success")
+                    SYNC_LAST_SUCCESS.set(time.time())
+                    SYNC_LAST_FETCHED_BYTES.set(report.get("fetched_bytes") or 0)
+                    for action in SYNC_ACTIONS:
+                        SYNC_ROWS.inc(report.get(action, 0), action=action)
+                        SYNC_LAST_ROWS.set(report.get(action, 0), action=action)
+            metric_store.flush()
+    return wrapper
@@ -0,0 +1,237 @@
+import threading
+from contextlib import contextmanager
+from django.db import transaction
+from api.models.countries_info import CountryInfo
+from api.models.region_stats import RegionStats
+from api.utils.response_cache import get_cached, get_version, set_cached
+
+
+STAT_FIELDS = ("id", "name", "region", "subregion", "population", "area", "is_active")
+
+# Extreme member label -> (field, True for the maximum / False for the minimum)
+EXTREMES = {
+    "largest": ("area", True),
+    "smallest": ("area", False),
+    "most_populous": ("population", True),
+    "least_populous": ("population", False),
+}
+
+
+# Groups awaiting a refresh inside deferred_stats_refresh (per thread)
+_deferred = threading.local()
+
+
+def _empty_stats():
+    return {"countries": 0, "population": 0, "area": 0.0, "extremes": {}}
+
+
+def _offer_member(extremes, member):
+    """Record member as an extreme wherever it beats the current one (ties go to the first name)."""
+    for label, (field, maximum) in EXTREMES.items():
+        current = extremes.get(label)
+        if (
+            current is None
+            or (member[field] != current[field] and (member[field] > current[field]) == maximum)
+            or (member[field] == current[field] and member["name"] < current["name"])
+        ):
+            extremes[label] = member
+
+
+def _merge(stats, other):
+    """Add the counts, totals and extremes of other into stats."""
+    stats["countries"] += other["countries"]
+    stats["population"] += other["population"]
+    stats["area"] += other["area"]
+    for member in other["extremes"].values():
+        _offer_member(stats["extremes"], member)
+
+
+def compute_group_stats(rows):
+    """Aggregate country rows into stats per (scope, region, subregion).
+
+    Args:
+        rows (iterable): Country dicts with the STAT_FIELDS keys.
+    Returns:
+        dict: (scope, region, subregion) -> counts, totals and extreme members.
+    """
+    groups = {}
+    for row in rows:
+        member = {"id": row["id"], "name": row["name"], "area": row["area"], "population": row["population"]}
+        scopes = (RegionStats.ALL, RegionStats.ACTIVE) if row["is_active"] else (RegionStats.ALL,)
+        for scope in scopes:
+            stats = groups.setdefault((scope, row["region"], row["subregion"]), _empty_stats())
+            stats["countries"] += 1
+            stats["population"] += row["population"]
+            stats["area"] += row["area"]
+            _offer_member(stats["extremes"], member)
+    return groups
+
+
+def refresh_region_stats(groups=None):
+    """Recompute the stats rows of the given (region, subregion) groups.
+
+    Only the countries of the affected regions are read, through the
+    (region, subregion) index. Call it inside the write's transaction so the
+    stats commit together with the rows they summarize.
+
+    Args:
+        groups (iterable): (region, subregion) pairs; None refreshes every group.
+    """
+    queryset = CountryInfo.objects.order_by()
+    existing = RegionStats.objects.all()
+    if groups is not None:
+        groups = set(groups)
+        if not groups:
+            return
+        regions = {region for region, _ in groups}
+        queryset = queryset.filter(region__in=regions)
+        existing = existing.filter(region__in=regions)
+
+    computed = compute_group_stats(
+        row for row in queryset.values(*STAT_FIELDS).iterator()
+        if groups is None or (row["region"], row["subregion"]) in groups
+    )
+    stale = [
+        stats.pk for stats in existing.only("region", "subregion")
+        if groups is None or (stats.region, stats.subregion) in groups
+    ]
+    with transaction.atomic():
+        RegionStats.objects.filter(pk__in=stale).delete()
+        RegionStats.objects.bulk_create([
+            RegionStats(scope=scope, region=region, subregion=subregion, **stats)
+            for (scope, region, subregion), stats in computed.items()
+        ])
+
+
+def refresh_stats_for_countries(countries):
+    """Refresh the stats of the groups written countries were loaded in and are now in.
+
+    Falls back to a full refresh if a country's region or subregion was
+    deferred, since its previous group is then unknown.
+
+    Args:
+        countries (list): CountryInfo instances that were just saved, updated
+            or deleted.
+    """
+    groups = set()
+    for country in countries:
+        loaded = getattr(country, "_loaded_group", ())
+        if loaded is None or "region" not in country.__dict__ or "subregion" not in country.__dict__:
+            groups = None
+            break
+        groups.add((country.region, country.subregion))
+        if loaded:
+            groups.add(loaded)
+    pending = getattr(_deferred, "groups", False)
+    if pending is not False:
+        _deferred.groups = None if groups is None or pending is None else pending | groups
+    elif groups is None or groups:
+        refresh_region_stats(groups)
+
+    # The rows are now stored in their current group
+    for country in countries:
+        if "region" in country.__dict__ and "subregion" in country.__dict__:
+            country._loaded_group = (country.region, country.subregion)
+
+
+@contextmanager
+def deferred_stats_refresh():
+    """Collect the stats refreshes of a multi-batch write and run them once on exit.
+
+    Refreshing per batch re-reads the affected regions every time, which is
+    quadratic in the size of a large sync. Use it inside the write's
+    transaction; nested uses join the outermost one.
+    """
+    if getattr(_deferred, "groups", False) is not False:
+        yield
+        return
+    _deferred.groups = set()
+    try:
+        yield
+        groups = _deferred.groups
+    finally:
+        del _deferred.groups
+    if groups is None or groups:
+        refresh_region_stats(groups)
+
+
+def resolve_country_group(country_id):
+    """Return the (region, subregion) of a country, cached per data version.
+
+    Backs the region_country_id / subregion_country_id filters, so they cost a
+    single filtered query instead of a lookup plus the filter. Any write bumps
+    the version, so a moved country is never resolved to its old group.
+
+    Args:
+        country_id (int): The country's id.
+    Returns:
+        tuple: (region, subregion), or None if the country does not exist.
+    """
+    key = _group_key(country_id)
+    entry = get_cached(key, cache="groups")
+    if entry is None:
+        entry = {"group": _group_query(country_id).first()}
+        set_cached(key, entry)
+    return entry["group"]
+
+
+async def aresolve_country_group(country_id):
+    """Async variant of resolve_country_group, using the async ORM."""
+    key = _group_key(country_id)
+    entry = get_cached(key, cache="groups")
+    if entry is None:
+        entry = {"group": await _group_query(country_id).afirst()}
+        set_cached(key, entry)
+    return entry["group"]
+
+
+def _group_key(country_id):
+    return f"countries:group:{get_version()}:{country_id}"
+
+
+def _group_query(country_id):
+    return CountryInfo.objects.filter(id=country_id).values_list("region", "subregion")
+
+
+def _format(stats):
+    area = stats["area"]
+    return {
+        "countries": stats["countries"],
+        "population": stats["population"],
+        "area": area,
+        "density": round(stats["population"] / area, 2) if area else None,
+        **{label: stats["extremes"].get(label) for label in EXTREMES},
+    }
+
+
+def region_stats_summary(include_deleted=False):
+    """Build the stats response from the summary table.
+
+    Region and overall figures are merged from the subregion rows, so the
+    cost is proportional to the number of groups, not countries.
+
+    Args:
+        include_deleted (bool): Include soft-deleted countries.
+    Returns:
+        dict: Per-region figures with their subregions, plus the totals.
+    """
+    scope = RegionStats.ALL if include_deleted else RegionStats.ACTIVE
+    regions = {}
+    totals = _empty_stats()
+    for row in RegionStats.objects.filter(scope=scope).order_by("region", "subregion"):
+        stats = {
+            "countries": row.countries, "population": row.population,
+            "area": row.area, "extremes": row.extremes,
+        }
+        region, subregions = regions.setdefault(row.region, (_empty_stats(), []))
+        _merge(region, stats)
+        _merge(totals, stats)
+        subregions.append({"subregion": row.subregion, **_format(stats)})
+
+    return {
+        "regions": [
+            {"region": name, **_format(stats), "subregions": subregions}
+            for name, (stats, subregions) in regions.items()
+        ],
+        "totals": _format(totals),
+    }
@@ -0,0 +1,154 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from urllib.parse import quote
+from django.conf import settings
+from django.core.cache import caches
+from api.utils.metrics import CACHE_LOOKUPS
+
+
+CACHE_ALIAS = "countries"
+VERSION_KEY = "countries:version"
+
+# Query parameters whose value is interpreted as a boolean flag by the views.
+BOOLEAN_PARAMS = ("include_deleted",)
+
+# Query parameters whose mere presence changes the response, even when empty
+# (an empty cursor selects the first page in keyset pagination mode).
+PRESENCE_PARAMS = ("cursor",)
+
+
+def _cache():
+    """Return the cache backend used for country responses."""
+    return caches[CACHE_ALIAS]
+
+
+class VersionStore:
+    """Data version counters shared by every process on the host, kept in SQLite.
+
+    The cached pages themselves stay in each process's local cache, but the
+    version they are keyed on lives in COUNTRIES_VERSION_DB_PATH, so a write
+    from any process (a worker, populate_countries, the admin shell)
+    invalidates the pages of all of them. Reading the version is one
+    primary key lookup on a WAL database and never waits for writers.
+
+    Versions only grow: a lost database starts again at 1, which is why it
+    is synced to disk (synchronous=NORMAL) unlike the throttle state.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+
+    def _connection(self):
+        """Return this thread's connection, creating the database if needed."""
+        path = Path(settings.COUNTRIES_VERSION_DB_PATH)
+        # A connection must not cross a fork, and tests may point the
+        # setting at another file
+        owner = (os.getpid(), path)
+        if getattr(self._local, "owner", None) != owner:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS data_versions ("
+                "key TEXT PRIMARY KEY, version INTEGER NOT NULL) WITHOUT ROWID"
+            )
+            self._local.connection = connection
+            self._local.owner = owner
+        return self._local.connection
+
+
+    def get(self, key):
+        """Return the current version of key (1 if it was never bumped)."""
+        row = self._connection().execute(
+            "SELECT version FROM data_versions WHERE key = ?", (key,)
+        ).fetchone()
+        return 1 if row is None else row[0]
+
+
+    def bump(self, key):
+        """Atomically increment the version of key and return the new one."""
+        return self._connection().execute(
+            "INSERT INTO data_versions (key, version) VALUES (?, 2) "
+            "ON CONFLICT (key) DO UPDATE SET version = version + 1 RETURNING version",
+            (key,),
+        ).fetchone()[0]
+
+
+versions = VersionStore()
+
+
+def get_version():
+    """Return the current data version of the countries table.
+
+    The version is bumped after every committed write, in whichever process
+    made it, which implicitly invalidates all cached pages built against an
+    older version.
+    """
+    return versions.get(VERSION_KEY)
+
+
+def bump_version():
+    """Invalidate all cached country responses by bumping the data version."""
+    return versions.bump(VERSION_KEY)
+
+
+def normalize_query(query_params):
+    """Normalize query parameters into a canonical, order-independent string.
+
+    Only empty values are dropped (the views ignore them) unless the
+    parameter's presence is significant. Any other value is kept verbatim,
+    blank ones included, since the views reject those: a request that fails
+    validation must never share a key with a valid one. Boolean flags are
+    always present and reduced to "true"/"false" the way the views read them
+    (the last value wins), parameters are sorted by name and repeated values
+    keep their order.
+
+    Args:
+        query_params (QueryDict): The request query parameters.
+    Returns:
+        str: The canonical query string.
+    """
+    items = []
+    for key in sorted(set(query_params.keys()) | set(BOOLEAN_PARAMS)):
+        if key in BOOLEAN_PARAMS:
+            values = ["true" if query_params.get(key, "false").lower() == "true" else "false"]
+        else:
+            values = [value for value in query_params.getlist(key) if value]
+        if values:
+            # Repeated parameters stay distinct from comma-separated values,
+            # and quoting keeps "&" or "=" inside a value from forging others
+            items.extend(f"{quote(key, safe='')}={quote(value, safe='')}" for value in values)
+        elif key in PRESENCE_PARAMS:
+            items.append(f"{quote(key, safe='')}=")
+    return "&".join(items)
+
+
+def list_cache_key(request, prefix="list"):
+    """Build the cache key for a list request at the current data version."""
+    raw = f"{request.get_host()}{request.path}?{normalize_query(request.query_params)}"
+    digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+    return f"countries:{prefix}:{get_version()}:{digest}"
+
+
+def get_cached(key, cache="responses"):
+    """Return the cached entry stored under key, or None on a miss.
+
+    Args:
+        key (str): The cache key.
+        cache (str): The cache label the lookup is counted under.
+    Returns:
+        The cached entry, or None on a miss.
+    """
+    entry = _cache().get(key)
+    CACHE_LOOKUPS.inc(cache=cache, result="miss" if entry is None else "hit")
+    return entry
+
+
+def set_cached(key, entry):
+    """Store an entry using the cache's default TTL."""
+    _cache().set(key, entry)
@@ -0,0 +1,186 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+logger = logging.getLogger(__name__)
+
+MIN_FILTER_CAPACITY = 10000
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings.
+
+    Membership tests never give false negatives; false positives occur at
+    roughly error_rate while no more than capacity items have been added.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+
+    def _positions(self, item):
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + index * second) % self.size for index in range(self.hashes)]
+
+
+    def add(self, item):
+        """Add an item to the filter.
+
+        count only grows when a bit changes, so adding an item again (a jti
+        revoked here and then seen again by the sync) does not inflate it.
+        """
+        added = False
+        for position in self._positions(item):
+            mask = 1 << (position & 7)
+            if not self._bits[position >> 3] & mask:
+                self._bits[position >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+
+
+    def __contains__(self, item):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationList:
+    """In-process view of the refresh token blacklist.
+
+    Answers "is this jti revoked" from a Bloom filter of the blacklisted jtis,
+    so the common case (a token that was never revoked) costs no query; a
+    filter hit is confirmed against the blacklist tables by the unique jti
+    index. Rows blacklisted by other processes are picked up by a delta query
+    on the BlacklistedToken primary key every TOKEN_REVOCATION_SYNC_INTERVAL
+    seconds; revocations made in this process apply immediately.
+
+    Expired tokens are deleted from the blacklist tables in bounded batches
+    every TOKEN_REVOCATION_PRUNE_INTERVAL seconds, and the filter is rebuilt
+    from the remaining rows once it holds more entries than it was sized for,
+    so neither the tables nor the filter grow without bound.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._last_id = 0
+        self._next_sync = 0.0
+        self._next_prune = 0.0
+
+
+    def is_revoked(self, jti):
+        """Return True if the token with the given jti has been blacklisted."""
+        self._refresh()
+        if jti not in self._filter:
+            return False
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+
+    def revoke(self, jti, expires_at, token, user_id=None):
+        """Blacklist a token, recording it as outstanding if needed.
+
+        The blacklist row is inserted rather than looked up first, so when the
+        same token is revoked concurrently (e.g. a refresh token replayed
+        during rotation) exactly one caller wins.
+
+        Args:
+            jti (str): The token's jti claim.
+            expires_at (datetime): When the token expires.
+            token (str): The encoded token.
+            user_id: The token's user id claim, if any.
+        Returns:
+            tuple: (BlacklistedToken, True if this call revoked the token).
+        """
+        outstanding, _ = OutstandingToken.objects.get_or_create(
+            jti=jti,
+            defaults={"user_id": user_id, "created_at": timezone.now(), "token": token, "expires_at": expires_at},
+        )
+        try:
+            with transaction.atomic():
+                blacklisted = BlacklistedToken.objects.create(token=outstanding)
+        except IntegrityError:
+            return BlacklistedToken.objects.get(token=outstanding), False
+
+        self._refresh()
+        with self._lock:
+            self._filter.add(jti)
+        return blacklisted, True
+
+
+    def reset(self):
+        """Drop the filter; the next check reloads it from the database."""
+        with self._lock:
+            self._filter = None
+
+
+    def _refresh(self):
+        """Load, sync, rebuild and prune as due."""
+        now = time.monotonic()
+        if self._filter is not None and now < self._next_sync:
+            return
+        with self._lock:
+            if self._filter is not None and now < self._next_sync:
+                return
+            if now >= self._next_prune:
+                self._prune(now)
+            if self._filter is None or self._filter.count > self._filter.capacity:
+                self._rebuild()
+            else:
+                self._sync()
+            self._next_sync = now + getattr(settings, "TOKEN_REVOCATION_SYNC_INTERVAL", 1.0)
+
+
+    def _rebuild(self):
+        """Build a new filter from the unexpired blacklist rows."""
+        live = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+        capacity = max(MIN_FILTER_CAPACITY, 2 * live.count())
+        bloom = BloomFilter(capacity, getattr(settings, "TOKEN_REVOCATION_ERROR_RATE", 0.001))
+        last_id = 0
+        for pk, jti in live.order_by("id").values_list("id", "token__jti").iterator(chunk_size=5000):
+            bloom.add(jti)
+            last_id = pk
+        self._filter = bloom
+        self._last_id = max(self._last_id, last_id)
+        logger.info("Loaded %d revoked tokens into the revocation filter (capacity %d).", bloom.count, capacity)
+
+
+    def _sync(self):
+        """Add the rows blacklisted since the last sync, by any process."""
+        for pk, jti in BlacklistedToken.objects.filter(id__gt=self._last_id).order_by("id").values_list("id", "token__jti"):
+            self._filter.add(jti)
+            self._last_id = pk
+
+
+    def _prune(self, now):
+        """Delete one batch of expired outstanding tokens (and their blacklist rows).
+
+        Tokens are issued with a fixed lifetime, so the expired rows are the
+        oldest ones and are found by walking the primary key from the start.
+        A full batch schedules the next one for the next sync.
+        """
+        batch = getattr(settings, "TOKEN_REVOCATION_PRUNE_BATCH", 1000)
+        expired = list(
+            OutstandingToken.objects.filter(expires_at__lte=timezone.now())
+            .order_by("id").values_list("id", flat=True)[:batch]
+        )
+        if expired:
+            BlacklistedToken.objects.filter(token_id__in=expired).delete()
+            OutstandingToken.objects.filter(id__in=expired).delete()
+        full = len(expired) == batch
+        self._next_prune = now if full else now + getattr(settings, "TOKEN_REVOCATION_PRUNE_INTERVAL", 3600)
+
+
+revoked_tokens = RevocationList()
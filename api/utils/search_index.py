@@ -0,0 +1,212 @@
+import heapq
+import threading
+import unicodedata
+from collections import defaultdict
+from types import SimpleNamespace
+from api.models.countries_info import CountryInfo
+from api.utils.response_cache import get_version
+
+
+SEARCH_FIELDS = ("name", "cca2", "capital")
+MAX_GRAM = 3
+
+# Match ranks, best first
+PREFIX, WORD_START, SUBSTRING = 0, 1, 2
+MATCH_LABELS = {PREFIX: "prefix", WORD_START: "word_start", SUBSTRING: "substring"}
+
+
+def fold(text):
+    """Fold text for diacritic- and case-insensitive matching."""
+    decomposed = unicodedata.normalize("NFKD", str(text or ""))
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+
+def grams(text):
+    """Return every 1- to 3-character substring of the folded text."""
+    return {
+        text[start:start + size]
+        for size in range(1, MAX_GRAM + 1)
+        for start in range(len(text) - size + 1)
+    }
+
+
+def match_rank(query, text):
+    """Rank how the folded query matches the folded text (None if it doesn't)."""
+    position = text.find(query)
+    if position < 0:
+        return None
+    if position == 0:
+        return PREFIX
+    # Look for a later occurrence that starts a word
+    while position > 0:
+        if not text[position - 1].isalnum():
+            return WORD_START
+        position = text.find(query, position + 1)
+    return SUBSTRING
+
+
+class CountrySearchIndex:
+    """In-process n-gram index over active countries for autocomplete.
+
+    Every 1- to 3-gram of the folded name, cca2 and capital maps to the ids of
+    the countries containing it. A query is resolved by intersecting the posting
+    sets of its grams, verifying the candidates and ranking them
+    prefix > word-start > substring (name before cca2 before capital).
+
+    The index is tagged with the data version it reflects, which is shared by
+    all processes (see response_cache.VersionStore). Local writes are applied
+    incrementally; a write committed by another process bumps the shared
+    version past the index's, so the next query rebuilds the index.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._postings = defaultdict(set)
+        self._version = None
+
+
+    def _add(self, row):
+        """Index a row (a dict with id, name, cca2, capital and flag)."""
+        folded = {field: fold(row[field]) for field in SEARCH_FIELDS}
+        self._entries[row["id"]] = (row, folded)
+        for text in folded.values():
+            for gram in grams(text):
+                self._postings[gram].add(row["id"])
+
+
+    def _remove(self, country_id):
+        """Drop a country from the index."""
+        entry = self._entries.pop(country_id, None)
+        if entry is None:
+            return
+        for text in entry[1].values():
+            for gram in grams(text):
+                ids = self._postings.get(gram)
+                if ids is not None:
+                    ids.discard(country_id)
+                    if not ids:
+                        del self._postings[gram]
+
+
+    @staticmethod
+    def _indexed_rows():
+        return CountryInfo.objects.filter(is_active=True).values("id", "flag", *SEARCH_FIELDS)
+
+
+    def _load(self, rows, version):
+        """Replace the index contents with the given rows."""
+        with self._lock:
+            self._entries = {}
+            self._postings = defaultdict(set)
+            for row in rows:
+                self._add(row)
+            self._version = version
+
+
+    def rebuild(self):
+        """Rebuild the whole index from the active rows in the database."""
+        with self._lock:
+            version = get_version()
+            self._load(self._indexed_rows(), version)
+
+
+    async def arebuild(self):
+        """Async variant of rebuild, reading the rows with the async ORM."""
+        version = get_version()
+        rows = [row async for row in self._indexed_rows()]
+        self._load(rows, version)
+
+
+    @staticmethod
+    def snapshot(country):
+        """Return a lightweight copy of the fields the index needs from a row."""
+        return SimpleNamespace(
+            pk=country.pk,
+            is_active=country.is_active,
+            **{field: getattr(country, field) for field in ("id", "flag", *SEARCH_FIELDS)},
+        )
+
+
+    def apply_changes(self, countries=(), deleted_ids=()):
+        """Apply saved or deleted rows to the index after their write committed.
+
+        Must run right after the write's cache version bump, so the index is
+        exactly one version behind if no other process wrote meanwhile.
+        """
+        with self._lock:
+            version = get_version()
+            if self._version is None or self._version != version - 1:
+                self._version = None
+                return
+            for country_id in deleted_ids:
+                self._remove(country_id)
+            for country in countries:
+                self._remove(country.pk)
+                if country.is_active:
+                    self._add({field: getattr(country, field) for field in ("id", "flag", *SEARCH_FIELDS)})
+            self._version = version
+
+
+    def search(self, query, limit=10):
+        """Return up to limit ranked matches for the query.
+
+        Args:
+            query (str): The text typed by the user.
+            limit (int): Maximum number of matches to return.
+        Returns:
+            list: Dicts with the country fields plus the matched field and kind.
+        """
+        query = fold(query)
+        if not query:
+            return []
+
+        with self._lock:
+            if self._is_stale():
+                self.rebuild()
+            return self._search(query, limit)
+
+
+    async def asearch(self, query, limit=10):
+        """Async variant of search; a stale index is rebuilt with the async ORM."""
+        query = fold(query)
+        if not query:
+            return []
+
+        if self._is_stale():
+            await self.arebuild()
+        with self._lock:
+            return self._search(query, limit)
+
+
+    def _is_stale(self):
+        return self._version is None or self._version != get_version()
+
+
+    def _search(self, query, limit):
+        """Rank the matches of an already folded query against the current index."""
+        query_grams = {query} if len(query) <= MAX_GRAM else {
+            query[start:start + MAX_GRAM] for start in range(len(query) - MAX_GRAM + 1)
+        }
+        postings = sorted((self._postings.get(gram, set()) for gram in query_grams), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:]) if postings else set()
+
+        scored = []
+        for country_id in candidates:
+            row, folded = self._entries[country_id]
+            best = None
+            for field_rank, field in enumerate(SEARCH_FIELDS):
+                rank = match_rank(query, folded[field])
+                if rank is not None and (best is None or (rank, field_rank) < best[:2]):
+                    best = (rank, field_rank, field)
+            if best is not None:
+                scored.append((best[0], best[1], len(folded["name"]), folded["name"], row, best[2]))
+
+        return [
+            {**row, "matched_field": field, "match": MATCH_LABELS[rank]}
+            for rank, _, _, _, row, field in heapq.nsmallest(limit, scored, key=lambda item: item[:4])
+        ]
+
+
+search_index = CountrySearchIndex()
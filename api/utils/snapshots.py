@@ -0,0 +1,86 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class UpstreamSnapshot:
+    """The last good raw payload of an upstream feed, stored on local disk.
+
+    The payload is kept gzip-compressed next to a small JSON metadata file
+    holding the response's ETag and Last-Modified headers, the SHA-256 of the
+    raw payload, and the hash of the payload that was last synced into the
+    database. Each source gets its own pair of files.
+    """
+
+    def __init__(self, directory, source):
+        key = hashlib.sha1(str(source).encode("utf-8")).hexdigest()[:12]
+        self.directory = Path(directory)
+        self.payload_path = self.directory / f"countries-{key}.json.gz"
+        self.meta_path = self.directory / f"countries-{key}.meta.json"
+
+
+    def exists(self):
+        """Return True if a payload has been stored."""
+        return self.payload_path.exists() and self.meta_path.exists()
+
+
+    def load_meta(self):
+        """Return the stored metadata, or an empty dict."""
+        try:
+            with open(self.meta_path, encoding="utf-8") as meta_file:
+                return json.load(meta_file)
+        except (OSError, ValueError):
+            return {}
+
+
+    def save_meta(self, meta):
+        """Atomically replace the metadata file."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as meta_file:
+            json.dump(meta, meta_file)
+        os.replace(temp_path, self.meta_path)
+
+
+    def iter_chunks(self):
+        """Yield the decompressed payload in fixed-size chunks."""
+        with gzip.open(self.payload_path, "rb") as payload_file:
+            while chunk := payload_file.read(READ_CHUNK_SIZE):
+                yield chunk
+
+
+    def write(self, chunks):
+        """Store a new payload from an iterable of raw byte chunks.
+
+        The payload is compressed and hashed while it streams to a temporary
+        file, which only replaces the current snapshot if the hash differs.
+
+        Args:
+            chunks (iterable): Raw payload chunks.
+        Returns:
+            tuple: (sha256 hex digest, raw byte count, True if the payload changed).
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw_file, gzip.GzipFile(fileobj=raw_file, mode="wb") as payload_file:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    size += len(chunk)
+                    payload_file.write(chunk)
+            sha256 = digest.hexdigest()
+            changed = not self.exists() or self.load_meta().get("sha256") != sha256
+            if changed:
+                os.replace(temp_path, self.payload_path)
+            return sha256, size, changed
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
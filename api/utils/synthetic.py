@@ -0,0 +1,201 @@
+import json
+import random
+import shutil
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import islice
+from pathlib import Path
+from api.models.countries_info import CountryInfo, compute_content_hash
+from api.utils.fetch_countries import transform_record
+from api.utils.lookups import rebuild_lookups
+from api.utils.region_stats import refresh_region_stats
+from api.utils.response_cache import bump_version
+
+
+# Synthetic datasets for benchmarks: deterministic for a given (count, seed,
+# revision), shaped like the upstream feed, and valid for both the feed and
+# the API validators (letters-only names, 2-letter codes).
+
+REGIONS = {
+    "Africa": ["Northern Africa", "Eastern Africa", "Middle Africa", "Southern Africa", "Western Africa"],
+    "Americas": ["Caribbean", "Central America", "North America", "South America"],
+    "Asia": ["Central Asia", "Eastern Asia", "South-Eastern Asia", "Southern Asia", "Western Asia"],
+    "Europe": ["Eastern Europe", "Northern Europe", "Southern Europe", "Western Europe"],
+    "Oceania": ["Australia and New Zealand", "Melanesia", "Micronesia", "Polynesia"],
+}
+GROUPS = [(region, subregion) for region, subregions in REGIONS.items() for subregion in subregions]
+LANGUAGES = [
+    ("eng", "English"), ("fra", "French"), ("spa", "Spanish"), ("por", "Portuguese"),
+    ("ara", "Arabic"), ("deu", "German"), ("rus", "Russian"), ("zho", "Chinese"),
+    ("hin", "Hindi"), ("swa", "Swahili"), ("ita", "Italian"), ("jpn", "Japanese"),
+]
+CURRENCIES = [
+    ("EUR", "Euro", "€"), ("USD", "United States dollar", "$"), ("GBP", "British pound", "£"),
+    ("JPY", "Japanese yen", "¥"), ("INR", "Indian rupee", "₹"), ("XOF", "West African CFA franc", "Fr"),
+]
+SYLLABLES = [
+    "ba", "ka", "lo", "mi", "nu", "ra", "sa", "te", "vo", "zi",
+    "da", "fe", "go", "hi", "ju", "ke", "ma", "no", "pe", "ri",
+]
+# In a revision, every CHANGE_EVERY-th record differs from the base dataset
+CHANGE_EVERY = 100
+
+
+def synthetic_word(index):
+    """Return a distinct letters-only word for every non-negative index."""
+    # Bijective base-len(SYLLABLES) numeration, so no two indexes share a word
+    parts = []
+    index += 1
+    while index:
+        index, digit = divmod(index - 1, len(SYLLABLES))
+        parts.append(SYLLABLES[digit])
+    return "".join(reversed(parts)).capitalize()
+
+
+def synthetic_code(index):
+    """Return a unique 2-letter code for the first 676 indexes, then ""."""
+    if index >= 26 * 26:
+        return ""
+    return chr(65 + index // 26) + chr(65 + index % 26)
+
+
+def synthetic_records(count, seed=0, revision=0, prefix=""):
+    """Yield upstream-format country records.
+
+    Args:
+        count (int): Number of records.
+        seed (int): Seed of the dataset.
+        revision (int): 0 for the base dataset; revision n changes the
+            population of every CHANGE_EVERY-th record, like an upstream update.
+        prefix (str): Letters prepended to every name, to keep the dataset
+            apart from rows already in the table.
+    Yields:
+        dict: Records shaped like the restcountries payload.
+    """
+    rng = random.Random(seed)
+    for index in range(count):
+        name = f"{prefix}{synthetic_word(index)}land"
+        region, subregion = GROUPS[rng.randrange(len(GROUPS))]
+        languages = rng.sample(LANGUAGES, rng.randint(1, 3))
+        currency = CURRENCIES[rng.randrange(len(CURRENCIES))]
+        population = rng.randint(1000, 1_400_000_000)
+        if revision and index % CHANGE_EVERY == 0:
+            population += revision
+        offset = rng.randint(-11, 12)
+        yield {
+            "name": {"common": name, "official": f"Republic of {name}"},
+            "cca2": synthetic_code(index),
+            "capital": [f"Port {synthetic_word(index)}"],
+            "region": region,
+            "subregion": subregion,
+            "population": population,
+            "area": round(rng.uniform(1, 17_000_000), 1),
+            "languages": dict(languages),
+            "currencies": {currency[0]: {"name": currency[1], "symbol": currency[2]}},
+            "timezones": [f"UTC{'+' if offset >= 0 else '-'}{abs(offset):02d}:00"],
+            "flags": {"png": f"https://flags.example.com/{index}.png"},
+        }
+
+
+def synthetic_countries(count, seed=0, codes=True, prefix=""):
+    """Build unsaved CountryInfo rows from synthetic_records.
+
+    Args:
+        count (int): Number of rows.
+        seed (int): Seed of the dataset.
+        codes (bool): Keep the cca2 codes; pass False when inserting next to
+            real countries, whose codes are unique.
+        prefix (str): Letters prepended to every name (see synthetic_records).
+    Yields:
+        CountryInfo: Unsaved rows with their content hash set.
+    """
+    for record in synthetic_records(count, seed, prefix=prefix):
+        data = transform_record(record)
+        if not codes:
+            data["cca2"] = ""
+        yield CountryInfo(**data, content_hash=compute_content_hash(data))
+
+
+def load_synthetic_countries(count, seed=0, batch_size=5000):
+    """Insert a synthetic dataset with its lookup rows and region stats.
+
+    Rows are bulk created without per-batch signals, so even a million rows
+    load in one pass; the stats are computed once at the end and cached
+    responses are invalidated.
+
+    Returns:
+        int: The number of rows inserted.
+    """
+    rows = synthetic_countries(count, seed)
+    inserted = 0
+    while batch := list(islice(rows, batch_size)):
+        CountryInfo.objects.bulk_create(batch)
+        rebuild_lookups(batch)
+        inserted += len(batch)
+    refresh_region_stats()
+    bump_version()
+    return inserted
+
+
+def write_synthetic_feed(path, count, seed=0, revision=0):
+    """Write a synthetic upstream payload (a JSON array) to path, streaming.
+
+    Returns:
+        Path: The written file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as feed:
+        feed.write("[")
+        for index, record in enumerate(synthetic_records(count, seed, revision)):
+            if index:
+                feed.write(",")
+            feed.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+        feed.write("]")
+    return path
+
+
+@contextmanager
+def stand_in_upstream(path):
+    """Serve a feed file over local HTTP like the upstream API.
+
+    Responses carry a content ETag and honour If-None-Match, so the fetch
+    stage runs exactly as against the real upstream, without network access.
+    The file may be replaced while serving.
+
+    Yields:
+        str: The feed URL.
+    """
+    path = Path(path)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            # The ETag comes from the file's size and mtime, so large feeds
+            # are streamed from disk and never read whole into memory
+            stat = path.stat()
+            etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(stat.st_size))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            with path.open("rb") as feed:
+                shutil.copyfileobj(feed, self.wfile)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/v3.1/all"
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,184 @@
+import re
+from rest_framework.settings import api_settings
+
+
+# Patterns are compiled once at import instead of on every field validation
+STRICT_TEXT_RE = re.compile(r"^[a-zA-Z\s'\-,\.]+$")
+FEED_TEXT_RE = re.compile(r"^(?:\w|[\s'’\-,.()&/])+$")
+FLAG_RE = re.compile(r'^https?://[^\s<>"]+|www\.[^\s<>"]+$')
+CCA2_RE = re.compile(r"^[A-Z]{2}$")
+
+TEXT_LABELS = {
+    "name": "Country name",
+    "capital": "Capital name",
+    "region": "Region name",
+    "subregion": "Subregion name",
+}
+# Field -> (label, upper limit)
+NUMERIC_LIMITS = {
+    "population": ("Population", 10**10),
+    "area": ("Area", 10**8),
+}
+# Field -> (label, item label, maximum length)
+LIST_LIMITS = {
+    "languages": ("Languages", "language", 100),
+    "currencies": ("Currencies", "currency", 50),
+    "timezones": ("Timezones", "timezone", 50),
+}
+
+
+class CountryBatchValidator:
+    """Validate a list of country dicts in one pass.
+
+    Checks run column by column over the whole batch: text fields against
+    precompiled patterns (memoized per distinct value, since regions and
+    subregions repeat), numeric ranges with a single pass over the column
+    before any per-row error reporting, and the shape of the JSON list
+    fields. Only the fields present in a row are checked, so partial updates
+    validate just what they change.
+
+    Args:
+        text_pattern (Pattern): Allowed characters of names, capitals,
+            regions and subregions.
+        text_rule (str): How text_pattern is described in error messages.
+        currency_objects (bool): Also accept currencies given as objects with
+            a name, as the upstream feed sends them.
+    """
+
+    def __init__(self, text_pattern, text_rule, currency_objects=False):
+        self.text_pattern = text_pattern
+        self.text_rule = text_rule
+        self.currency_objects = currency_objects
+
+
+    def validate(self, rows):
+        """Validate a batch of country dicts.
+
+        Args:
+            rows (list): Country dicts (serializer data or processed feed records).
+        Returns:
+            dict: Row index -> {field: [messages]} for every invalid row. A row
+            with no field errors but none of languages, currencies or
+            timezones gets a non-field error.
+        """
+        errors = {}
+
+        def add(index, field, message):
+            errors.setdefault(index, {}).setdefault(field, []).append(message)
+
+        self._check_text(rows, "name", add, required=True)
+        self._check_cca2(rows, add)
+        for field in ("capital", "region", "subregion"):
+            self._check_text(rows, field, add)
+        for field in NUMERIC_LIMITS:
+            self._check_range(rows, field, add)
+        for field in LIST_LIMITS:
+            self._check_list(rows, field, add)
+        self._check_flag(rows, add)
+        for index, row in enumerate(rows):
+            if "is_active" in row and not isinstance(row["is_active"], bool):
+                add(index, "is_active", "is_active must be a boolean value.")
+
+        for index, row in enumerate(rows):
+            if index not in errors and not any(row.get(field) for field in LIST_LIMITS):
+                add(
+                    index, api_settings.NON_FIELD_ERRORS_KEY,
+                    "At least one of languages, currencies, or timezones should be provided.",
+                )
+        return errors
+
+
+    def _check_text(self, rows, field, add, required=False):
+        label = TEXT_LABELS[field]
+        matches = {}
+        for index, row in enumerate(rows):
+            if field not in row:
+                continue
+            value = row[field]
+            if not isinstance(value, str):
+                add(index, field, f"{label} must be a string.")
+                continue
+            if required:
+                if not value:
+                    add(index, field, f"{label} cannot be empty.")
+                    continue
+                if len(value.strip()) < 2:
+                    add(index, field, f"{label} must be at least 2 characters long.")
+                    continue
+            if not value:
+                continue
+            valid = matches.get(value)
+            if valid is None:
+                valid = matches[value] = self.text_pattern.match(value) is not None
+            if not valid:
+                add(index, field, f"{label} {self.text_rule}")
+
+
+    def _check_range(self, rows, field, add):
+        label, limit = NUMERIC_LIMITS[field]
+        column = [(index, row[field]) for index, row in enumerate(rows) if field in row]
+        try:
+            # NaN fails both comparisons, so it takes the slow path too
+            if all(0 <= value <= limit for _, value in column):
+                return
+        except TypeError:
+            pass
+        for index, value in column:
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value != value:
+                add(index, field, f"{label} must be a number.")
+            elif value < 0:
+                add(index, field, f"{label} cannot be negative.")
+            elif value > limit:
+                add(index, field, f"{label} exceeds realistic limits.")
+
+
+    def _check_list(self, rows, field, add):
+        label, item_label, limit = LIST_LIMITS[field]
+        objects = self.currency_objects and field == "currencies"
+        for index, row in enumerate(rows):
+            if field not in row:
+                continue
+            value = row[field]
+            if not isinstance(value, list):
+                add(index, field, f"{label} must be a list.")
+            elif not all(_valid_item(item, objects) for item in value):
+                if objects:
+                    add(index, field, f"Each {item_label} must be a non-empty string or an object with a name.")
+                else:
+                    add(index, field, f"Each {item_label} must be a non-empty string.")
+            elif len(value) > limit:
+                add(index, field, f"Too many {label.lower()} specified.")
+
+
+    def _check_cca2(self, rows, add):
+        for index, row in enumerate(rows):
+            value = row.get("cca2")
+            if value and not (isinstance(value, str) and CCA2_RE.match(value)):
+                add(index, "cca2", "cca2 must be a 2-letter uppercase code.")
+
+
+    def _check_flag(self, rows, add):
+        for index, row in enumerate(rows):
+            value = row.get("flag")
+            if value and not (isinstance(value, str) and FLAG_RE.match(value)):
+                add(index, "flag", "Invalid URL format for flag.")
+
+
+def _valid_item(item, objects=False):
+    """Return True for a non-empty string (or, if allowed, an object with a name)."""
+    if objects and isinstance(item, dict):
+        item = item.get("name")
+    return isinstance(item, str) and bool(item.strip())
+
+
+# Records written through the API: ASCII text, plain string list items
+api_validator = CountryBatchValidator(
+    STRICT_TEXT_RE, "can only contain letters, spaces, apostrophes, hyphens, commas, or periods.",
+)
+# Records from the upstream feed: any script (e.g. "Côte d'Ivoire"), digits,
+# and currency objects like {"name": "Euro", "symbol": "€"}
+feed_validator = CountryBatchValidator(
+    FEED_TEXT_RE, "can only contain letters, digits, spaces, apostrophes, hyphens, commas, periods, "
+    "parentheses, ampersands, or slashes.",
+    currency_objects=True,
+)
@@ -0,0 +1,196 @@
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import (
+    APIException,
+    AuthenticationFailed,
+    NotAuthenticated,
+    NotFound,
+    Throttled,
+    ValidationError,
+)
+from rest_framework.request import Request
+from api.authentication import CachedUserJWTAuthentication
+from api.models.countries_info import CountryInfo
+from api.renderers import FastJSONRenderer
+from api.serializers.countries_info import country_read_fields, serialize_country_rows
+from api.utils.conditional import (
+    aqueryset_validators,
+    instance_validators,
+    not_modified_response,
+    rows_validators,
+    set_validators,
+)
+from api.utils.country_queries import apply_country_filters, parse_country_filters, parse_requested_fields
+from api.utils.instrumentation import timed
+from api.utils.region_stats import aresolve_country_group
+from api.utils.response_cache import get_cached, list_cache_key, set_cached
+from api.utils.search_index import search_index
+from api.views.countries_info import ALWAYS_LOADED_FIELDS, CountryInfoPagination, CountryInfoViewSet
+
+
+# Native async read handlers for ASGI deployments. They mirror the list,
+# retrieve and suggest actions of CountryInfoViewSet (same filters, cache
+# entries, validators and JSON output) but use the async ORM throughout, so a
+# request waiting on the database or a slow client holds no worker thread.
+# Responses are always JSON; the browsable API stays on the sync views.
+
+authenticator = CachedUserJWTAuthentication()
+
+
+def json_response(data, status=200):
+    """Render data the way the DRF views do for JSON clients."""
+    return HttpResponse(FastJSONRenderer().render(data), status=status, content_type="application/json")
+
+
+def error_response(request, exc):
+    """Mirror DRF's exception handler for the given API exception."""
+    data = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+    response = json_response(data, status=exc.status_code)
+    if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+        response["WWW-Authenticate"] = authenticator.authenticate_header(request)
+    if getattr(exc, "wait", None):
+        response["Retry-After"] = "%d" % exc.wait
+    return response
+
+
+def check_throttles(request):
+    """Apply CountryInfoViewSet's throttles, sharing their limits with the sync views.
+
+    Raises:
+        Throttled: If any throttle rejects the request.
+    """
+    waits = [
+        throttle.wait()
+        for throttle in (throttle_class() for throttle_class in CountryInfoViewSet.throttle_classes)
+        if not throttle.allow_request(request, CountryInfoViewSet)
+    ]
+    if waits:
+        raise Throttled(max((wait for wait in waits if wait is not None), default=None))
+
+
+def async_api_view(handler):
+    """Authenticate with JWT, apply the throttles and turn API exceptions into error responses.
+
+    The handler receives a DRF Request wrapper, which exposes query_params
+    and the URL helpers the shared pagination and cache code expect.
+    """
+    @wraps(handler)
+    async def view(request, *args, **kwargs):
+        try:
+            with timed("auth"):
+                authenticated = await authenticator.aauthenticate(request)
+            if authenticated is None:
+                raise NotAuthenticated()
+            request.user = authenticated[0]
+            api_request = Request(request)
+            api_request.user, api_request.auth = authenticated
+            # The throttle store is a blocking SQLite upsert
+            await sync_to_async(check_throttles, thread_sensitive=False)(api_request)
+            return await handler(api_request, *args, **kwargs)
+        except APIException as exc:
+            return error_response(request, exc)
+    return view
+
+
+def with_sync_writes(async_view, sync_view):
+    """Serve GET/HEAD with the async view and other methods with the sync DRF view."""
+    sync_view = sync_to_async(sync_view)
+
+    async def view(request, *args, **kwargs):
+        if request.method in ("GET", "HEAD"):
+            return await async_view(request, *args, **kwargs)
+        return await sync_view(request, *args, **kwargs)
+    return csrf_exempt(view)
+
+
+async def filtered_queryset(request):
+    """Build the filtered country queryset for a request (not evaluated)."""
+    filters = parse_country_filters(request.query_params)
+    with timed("lookup"):
+        country_groups = {
+            field: await aresolve_country_group(country_id)
+            for field, country_id in filters["country_ids"].items()
+        }
+    return apply_country_filters(CountryInfo.objects.order_by("name"), filters, country_groups)
+
+
+def requested_fields(request):
+    """Return the sparse fieldset of a read request (all fields by default)."""
+    available = list(country_read_fields())
+    return parse_requested_fields(request.query_params, available) or available
+
+
+@async_api_view
+async def country_list(request):
+    """Async equivalent of CountryInfoViewSet.list.
+
+    Shares the response cache with the sync view, so either can serve pages
+    the other computed.
+    """
+    cache_key = list_cache_key(request)
+    entry = get_cached(cache_key)
+    if entry is None:
+        fields = requested_fields(request)
+        queryset = await filtered_queryset(request)
+        rows = queryset.values(*dict.fromkeys([*fields, *sorted(ALWAYS_LOADED_FIELDS)]))
+        paginator = CountryInfoPagination()
+        page = total = None
+        if paginator.is_cursor_request(request):
+            page = await paginator.apaginate_queryset(rows, request)
+            cursors = paginator.cursor_paginator
+            etag, last_modified = rows_validators(page, request, cursors.next_cursor, cursors.previous_cursor)
+        else:
+            with timed("count"):
+                etag, last_modified, total = await aqueryset_validators(queryset, request)
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        if page is None:
+            page = await paginator.apaginate_queryset(rows, request, count=total)
+        data = paginator.get_paginated_response(serialize_country_rows(page, fields)).data
+        entry = {"data": data, "etag": etag, "last_modified": last_modified}
+        set_cached(cache_key, entry)
+    else:
+        not_modified = not_modified_response(request, entry["etag"], entry["last_modified"])
+        if not_modified is not None:
+            return not_modified
+
+    return set_validators(json_response(entry["data"]), entry["etag"], entry["last_modified"])
+
+
+@async_api_view
+async def country_detail(request, country_id):
+    """Async equivalent of CountryInfoViewSet.retrieve."""
+    fields = requested_fields(request)
+    queryset = await filtered_queryset(request)
+    row = await queryset.filter(id=country_id).values(
+        *dict.fromkeys([*fields, *sorted(ALWAYS_LOADED_FIELDS)])
+    ).afirst()
+    if row is None:
+        raise NotFound(f"No {CountryInfo._meta.object_name} matches the given query.")
+
+    etag, last_modified = instance_validators(row, request)
+    not_modified = not_modified_response(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+    return set_validators(json_response(serialize_country_rows([row], fields)[0]), etag, last_modified)
+
+
+@async_api_view
+async def country_suggest(request):
+    """Async equivalent of CountryInfoViewSet.suggest."""
+    query = request.query_params.get("q", "")
+    if not query.strip():
+        raise ValidationError("Query cannot be empty.")
+    try:
+        limit = min(max(int(request.query_params.get("limit", 10)), 1), 50)
+    except ValueError:
+        raise ValidationError("Limit must be an integer.")
+
+    return json_response({
+        "query": query,
+        "results": await search_index.asearch(query, limit=limit),
+    })
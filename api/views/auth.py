@@ -5,6 +5,7 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from api.serializers.auth import LoginSerializer
+from api.tokens import RevocableRefreshToken
 
 
 
@@ -70,7 +71,7 @@ class LogoutView(APIView):
                 return Response({
                     "detail": "Refresh token is required."
                 }, status=status.HTTP_400_BAD_REQUEST)
-            token = RefreshToken(refresh_token)
+            token = RevocableRefreshToken(refresh_token)
             token.blacklist()
             return Response({
                 'message': 'Logout successful'
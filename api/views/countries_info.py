@@ -1,20 +1,190 @@
+import base64
+import binascii
+import json
+from collections import Counter
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.exceptions import ValidationError, NotFound
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.decorators import action
+from django.core.handlers.asgi import ASGIRequest
+from django.core.paginator import InvalidPage
 from django.db.models import Q
+from django.http import StreamingHttpResponse
+from api.authentication import CachedUserJWTAuthentication
 from api.models.countries_info import CountryInfo
-from api.serializers.countries_info import CountryInfoSerializer
+from api.serializers.countries_info import (
+    CountryInfoSerializer,
+    country_read_fields,
+    serialize_country_rows,
+)
+from api.throttling import SharedAnonRateThrottle, SharedScopedRateThrottle, SharedUserRateThrottle
+from api.utils.bulk_writes import MAX_BULK_ITEMS, apply_bulk_changes
+from api.utils.conditional import (
+    instance_validators,
+    not_modified_response,
+    queryset_validators,
+    rows_validators,
+    set_validators,
+)
+from api.utils.export import EXPORT_FORMATS, aiter_chunks
+from api.utils.instrumentation import timed
+from api.utils.country_queries import (
+    apply_country_filters,
+    filter_by_codes,
+    parse_codes,
+    parse_country_filters,
+    parse_requested_fields,
+)
+from api.utils.region_stats import region_stats_summary, resolve_country_group
+from api.utils.response_cache import get_cached, list_cache_key, set_cached
+from api.utils.search_index import search_index
+
+
+# Columns always read, even with a sparse fieldset: the primary key, the keyset
+# pagination key and the conditional GET validator.
+ALWAYS_LOADED_FIELDS = {"id", "name", "updated_at"}
+
+
+
+
+class CountryInfoCursorPagination(BasePagination):
+    """Keyset (cursor) pagination for CountryInfoViewSet.
+    
+    Pages are fetched by seeking on (name, id) past the last row of the
+    previous page, which uses the name index and never issues COUNT(*) or
+    OFFSET. Cursors are opaque, URL-safe tokens.
+    """
+    
+    page_size = 25
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor."
+    
+    
+    def get_page_size(self, request):
+        """Return the requested page size, clamped to max_page_size."""
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+            if size > 0:
+                return min(size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+    
+    
+    def encode_cursor(self, row, reverse):
+        """Encode a (name, id) position and direction into an opaque cursor.
+        
+        Rows may be model instances or values() dicts.
+        """
+        name, pk = (row["name"], row["id"]) if isinstance(row, dict) else (row.name, row.pk)
+        payload = json.dumps([name, pk, int(reverse)], separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+    
+    
+    def decode_cursor(self, request):
+        """Decode the cursor query parameter.
+        
+        Returns:
+            tuple: (name, id, reverse), or None for the first page.
+        """
+        encoded = request.query_params.get(self.cursor_query_param, "").strip()
+        if not encoded:
+            return None
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            name, pk, reverse = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            return str(name), int(pk), bool(reverse)
+        except (TypeError, ValueError, UnicodeDecodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+    
+    
+    def _seek(self, queryset, request):
+        """Order and filter the queryset to start at the cursor.
+        
+        Returns:
+            tuple: (queryset limited to one page plus one row, page size, cursor).
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        
+        if cursor is None:
+            queryset = queryset.order_by("name", "id")
+        else:
+            name, pk, reverse = cursor
+            if reverse:
+                queryset = queryset.filter(
+                    Q(name__lt=name) | Q(name=name, id__lt=pk)
+                ).order_by("-name", "-id")
+            else:
+                queryset = queryset.filter(
+                    Q(name__gt=name) | Q(name=name, id__gt=pk)
+                ).order_by("name", "id")
+        
+        # Fetch one extra row to find out whether another page exists
+        return queryset[:page_size + 1], page_size, cursor
+    
+    
+    def _finish(self, rows, page_size, cursor):
+        """Trim the fetched rows to the page and compute the neighbouring cursors."""
+        reverse = cursor is not None and cursor[2]
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+        
+        has_next = True if reverse else has_more
+        has_previous = has_more if reverse else cursor is not None
+        self.next_cursor = self.encode_cursor(rows[-1], False) if rows and has_next else None
+        self.previous_cursor = self.encode_cursor(rows[0], True) if rows and has_previous else None
+        return rows
+    
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return one page of rows positioned after (or before) the cursor."""
+        queryset, page_size, cursor = self._seek(queryset, request)
+        return self._finish(list(queryset), page_size, cursor)
+    
+    
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async variant of paginate_queryset, using the async ORM."""
+        queryset, page_size, cursor = self._seek(queryset, request)
+        return self._finish([row async for row in queryset], page_size, cursor)
+    
+    
+    def get_cursor_link(self, cursor):
+        """Build the absolute URL for the given cursor."""
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+    
+    
+    def get_paginated_response(self, data):
+        """Return the page without a count, with next/previous cursor links."""
+        return Response({
+            "next": self.get_cursor_link(self.next_cursor),
+            "previous": self.get_cursor_link(self.previous_cursor),
+            "results": data,
+        })
+
+
 
 
 class CountryInfoPagination(PageNumberPagination):
     """Custom pagination class for CountryInfoViewSet.
     
     This class customizes the pagination settings for the CountryInfoViewSet.
+    Page-number pagination is used by default; passing the cursor query
+    parameter (an empty value starts at the first page) switches the request
+    to keyset pagination via CountryInfoCursorPagination.
     """
     
     page_size = 25
@@ -23,6 +193,73 @@ class CountryInfoPagination(PageNumberPagination):
     page_query_param = "page"
     last_page_strings = ("last",)
     invalid_page_message = "Invalid page number."
+    cursor_pagination_class = CountryInfoCursorPagination
+    
+    
+    def is_cursor_request(self, request):
+        """Return True if the request opted into keyset pagination."""
+        return self.cursor_pagination_class.cursor_query_param in request.query_params
+    
+    
+    def paginate_queryset(self, queryset, request, view=None, count=None):
+        """Paginate by cursor when requested, otherwise by page number.
+        
+        Args:
+            count (int): The total row count, if already known (e.g. from
+                the validators query); saves the paginator's COUNT query.
+        """
+        self.cursor_paginator = None
+        if self.is_cursor_request(request):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        
+        page = self._get_page(queryset, request, queryset.count() if count is None else count)
+        return None if page is None else list(page)
+    
+    
+    async def apaginate_queryset(self, queryset, request, view=None, count=None):
+        """Async variant of paginate_queryset, using the async ORM.
+        
+        The count is known or awaited up front, so validating the page number
+        and building the links never touch the database.
+        """
+        self.cursor_paginator = None
+        if self.is_cursor_request(request):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return await self.cursor_paginator.apaginate_queryset(queryset, request, view)
+        
+        page = self._get_page(queryset, request, await queryset.acount() if count is None else count)
+        if page is None:
+            return None
+        page.object_list = [row async for row in page.object_list]
+        return list(page)
+    
+    
+    def _get_page(self, queryset, request, count):
+        """Select the requested page (not evaluated) given the total row count."""
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = count
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+    
+    
+    def get_paginated_response(self, data):
+        """Build the paginated response for whichever mode was used."""
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
 
 
 
@@ -41,78 +278,311 @@ class CountryInfoViewSet(ModelViewSet):
     permission_classes = [IsAuthenticated]
     authentication_classes = [JWTAuthentication]
     pagination_class = CountryInfoPagination
+    read_authentication_classes = [CachedUserJWTAuthentication]
+    throttle_classes = [SharedAnonRateThrottle, SharedUserRateThrottle, SharedScopedRateThrottle]
+    throttle_scope = "countries"
     
             
     
+    def get_authenticators(self):
+        """Authenticate reads from the cached user row, writes from the database.
+        
+        With the page cache hit, a read then issues no query at all; writes
+        keep checking the user's current state on every request.
+        """
+        if self.request.method in ("GET", "HEAD", "OPTIONS"):
+            return [auth() for auth in self.read_authentication_classes]
+        return super().get_authenticators()
+    
+    
+    def perform_authentication(self, request):
+        """Authenticate the request, timed as the "auth" span of its metrics."""
+        with timed("auth"):
+            super().perform_authentication(request)
+    
+    
     def get_queryset(self):
         """Customize queryset based on query parameters.
         
         Supports filtering by:
-        - region: List countries in the same region as a specific country.
-        - subregion: List countries in the same subregion as a specific country.
+        - region / subregion: List countries in the given regions or
+          subregions (?region=Europe,Asia; exact names, all values OR'ed).
+        - region_country_id: List countries in the same region as a specific country.
+        - subregion_country_id: List countries in the same subregion as a specific country.
         - language: List countries that speak a specific language.
+        - currency: List countries that use a specific currency.
+        - timezone: List countries in a specific timezone.
         - name: Partial search by country name.
+        - codes: Countries with the given ISO cca2 codes (?codes=US,DE,FR).
         - include_deleted: Include deleted countries in the results.
         
-        Returns only active records (is_active=True) by default.
+        Language, currency and timezone matches are exact and case-insensitive.
+        Comma-separated values are OR'ed (?language=english,french) and repeated
+        parameters are AND'ed (?language=english&language=french).
+        
+        Returns only active records (is_active=True) by default. For reads,
+        columns not selected by ?fields= / ?exclude= are deferred.
         """
         queryset = super().get_queryset().order_by("name")
+        filters = parse_country_filters(self.request.query_params)
+        with timed("lookup"):
+            country_groups = {
+                field: resolve_country_group(country_id)
+                for field, country_id in filters["country_ids"].items()
+            }
+        queryset = apply_country_filters(queryset, filters, country_groups)
         
         
-        # Filter active records by default
-        include_deleted = self.request.query_params.get("include_deleted", "false").lower() == "true"
-        if not include_deleted:
-            queryset = queryset.filter(is_active=True)
-        
-        
-        # Filter by region (same region as a specific country)
-        region_country_id = self.request.query_params.get("region_country_id")
-        if region_country_id:
-            try:
-                country = CountryInfo.objects.get(id=region_country_id)
-                if country.region:
-                    queryset = queryset.filter(region=country.region)
-                else:
-                    queryset = queryset.none()
-            except CountryInfo.DoesNotExist:
-                raise NotFound(f"Country with ID {region_country_id} does not exist.")
-            
-            
-        # Filter by subregion (same subregion as a specific country)
-        subregion_country_id = self.request.query_params.get("subregion_country_id")
-        if subregion_country_id:
-            try:
-                country = CountryInfo.objects.get(id=subregion_country_id)
-                if country.subregion:
-                    queryset = queryset.filter(subregion=country.subregion)
-                else:
-                    queryset = queryset.none()
-            except CountryInfo.DoesNotExist:
-                raise NotFound(f"Country with ID {subregion_country_id} does not exist.")
-            
-            
-        # Filter by language
-        language = self.request.query_params.get("language")
-        if language:
-            if not language.strip():
-                raise ValidationError("Language cannot be empty.")
-            queryset = queryset.filter(
-                Q(languages__icontains=[language.lower()]) | 
-                Q(languages__icontains=[language.lower()])
-            )
-            
-            
-        # Filter by name (partial search)
-        name = self.request.query_params.get("name")
-        if name:
-            if not name.strip():
-                raise ValidationError("Name cannot be empty.")
-            queryset = queryset.filter(name__icontains=name.strip())
+        # Only read the columns the response needs (plus those used for
+        # pagination and conditional GET)
+        requested_fields = self.get_requested_fields()
+        if requested_fields is not None:
+            model_fields = {field.name for field in CountryInfo._meta.concrete_fields}
+            queryset = queryset.only(*(ALWAYS_LOADED_FIELDS | (set(requested_fields) & model_fields)))
             
             
         return queryset
     
     
+    def get_requested_fields(self):
+        """Resolve the ?fields= and ?exclude= sparse fieldset parameters.
+        
+        Only applies to reads. Both take comma-separated field names.
+        
+        Returns:
+            list: The serializer fields to return, or None for all of them.
+        """
+        if self.request.method not in ("GET", "HEAD"):
+            return None
+        if hasattr(self, "_requested_fields"):
+            return self._requested_fields
+        
+        self._requested_fields = parse_requested_fields(
+            self.request.query_params, list(self.get_serializer_class()().fields)
+        )
+        return self._requested_fields
+    
+    
+    def get_serializer(self, *args, **kwargs):
+        """Return the serializer, restricted to the requested sparse fieldset."""
+        requested_fields = self.get_requested_fields()
+        if requested_fields is not None:
+            kwargs.setdefault("fields", requested_fields)
+        return super().get_serializer(*args, **kwargs)
+    
+    
+    def list(self, request, *args, **kwargs):
+        """List countries with response caching and conditional GET support.
+        
+        Serialized pages are cached per normalized query string together with
+        their ETag and Last-Modified validators. The cache key embeds the data
+        version, which every committed write bumps in a store shared by all
+        worker processes, so a page is not served after a write has committed
+        (a request racing that commit may still see the previous page).
+        On a miss the validators are computed from the filtered queryset before
+        any serialization happens, so an unchanged page is answered with 304;
+        the same aggregate query provides the paginator's count.
+        Rows are read with values() and serialized by serialize_country_rows
+        rather than per-field DRF serializer calls.
+        """
+        cache_key = list_cache_key(request)
+        entry = get_cached(cache_key)
+        if entry is None:
+            queryset = self.filter_queryset(self.get_queryset())
+            fields = self.get_requested_fields() or country_read_fields()
+            rows = queryset.values(*dict.fromkeys([*fields, *sorted(ALWAYS_LOADED_FIELDS)]))
+            page = total = None
+            if self.paginator is not None and self.paginator.is_cursor_request(request):
+                # Keyset pages are validated from their own rows, so the
+                # whole result set is never aggregated.
+                page = self.paginate_queryset(rows)
+                cursors = self.paginator.cursor_paginator
+                etag, last_modified = rows_validators(
+                    page, request, cursors.next_cursor, cursors.previous_cursor
+                )
+            else:
+                with timed("count"):
+                    etag, last_modified, total = queryset_validators(queryset, request)
+            not_modified = not_modified_response(request, etag, last_modified)
+            if not_modified is not None:
+                return not_modified
+            
+            if page is None and self.paginator is not None:
+                page = self.paginator.paginate_queryset(rows, request, view=self, count=total)
+            if page is not None:
+                data = self.get_paginated_response(serialize_country_rows(page, fields)).data
+            else:
+                data = serialize_country_rows(rows, fields)
+            entry = {"data": data, "etag": etag, "last_modified": last_modified}
+            set_cached(cache_key, entry)
+        else:
+            not_modified = not_modified_response(request, entry["etag"], entry["last_modified"])
+            if not_modified is not None:
+                return not_modified
+        
+        return set_validators(Response(entry["data"]), entry["etag"], entry["last_modified"])
+    
+    
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve a country with conditional GET support.
+        
+        Validators are derived from the row's own updated_at value.
+        """
+        instance = self.get_object()
+        etag, last_modified = instance_validators(instance, request)
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        
+        fields = self.get_requested_fields() or country_read_fields()
+        data = serialize_country_rows([instance], fields)[0]
+        return set_validators(Response(data), etag, last_modified)
+    
+    
+    @action(detail=False, methods=["get"])
+    def code(self, request, cca2=None):
+        """Look countries up by ISO cca2 code.
+        
+        code/<cca2>/ returns one country like retrieve; code/?codes=US,DE,FR
+        returns the matching countries in the requested order plus the codes
+        that matched none. Either form is a single query on the unique cca2
+        index. The list filters and sparse fieldsets apply as usual.
+        """
+        fields = self.get_requested_fields() or country_read_fields()
+        columns = dict.fromkeys([*fields, *sorted(ALWAYS_LOADED_FIELDS), "cca2"])
+        queryset = self.filter_queryset(self.get_queryset())
+        
+        if cca2 is not None:
+            code = cca2.upper()
+            row = filter_by_codes(queryset, [code]).values(*columns).first()
+            if row is None:
+                raise NotFound(f"Country with code {code} does not exist.")
+            etag, last_modified = instance_validators(row, request)
+            not_modified = not_modified_response(request, etag, last_modified)
+            if not_modified is not None:
+                return not_modified
+            return set_validators(Response(serialize_country_rows([row], fields)[0]), etag, last_modified)
+        
+        # get_queryset already filtered on ?codes=
+        codes = parse_codes(request.query_params)
+        if not codes:
+            raise ValidationError("Codes cannot be empty.")
+        by_code = {row["cca2"]: row for row in queryset.values(*columns)}
+        rows = [by_code[code] for code in codes if code in by_code]
+        etag, last_modified = rows_validators(rows, request)
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        
+        data = {
+            "results": serialize_country_rows(rows, fields),
+            "missing": [code for code in codes if code not in by_code],
+        }
+        return set_validators(Response(data), etag, last_modified)
+    
+    
+    @action(detail=False, methods=["get"])
+    def suggest(self, request):
+        """Autocomplete countries by name, cca2 or capital.
+        
+        Served from the in-process search index rather than the database.
+        Matching is diacritic- and case-insensitive and ranked
+        prefix > word-start > substring.
+        
+        Query parameters:
+            q: The text to match.
+            limit: Maximum number of suggestions (default 10, max 50).
+        """
+        query = request.query_params.get("q", "")
+        if not query.strip():
+            raise ValidationError("Query cannot be empty.")
+        try:
+            limit = min(max(int(request.query_params.get("limit", 10)), 1), 50)
+        except ValueError:
+            raise ValidationError("Limit must be an integer.")
+        
+        return Response({
+            "query": query,
+            "results": search_index.search(query, limit=limit),
+        }, status=status.HTTP_200_OK)
+    
+    
+    @action(detail=False, methods=["get"])
+    def stats(self, request):
+        """Population, area, density, country counts and extreme members per region.
+        
+        Served from the RegionStats summary table, which every write keeps up
+        to date for the groups it touches, so the cost depends on the number
+        of regions and subregions rather than countries. Responses are cached
+        like list responses.
+        
+        Query parameters:
+            include_deleted: Include soft-deleted countries (default false).
+        """
+        cache_key = list_cache_key(request, prefix="stats")
+        entry = get_cached(cache_key)
+        if entry is None:
+            include_deleted = request.query_params.get("include_deleted", "false").lower() == "true"
+            entry = {"data": region_stats_summary(include_deleted)}
+            set_cached(cache_key, entry)
+        return Response(entry["data"], status=status.HTTP_200_OK)
+    
+    
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """Stream every matching country as NDJSON or CSV.
+        
+        Accepts the same filters and sparse fieldsets as the list endpoint plus
+        output=ndjson (the default) or output=csv. Rows are streamed from a database iterator
+        without pagination or a count query, so memory use is constant; under
+        ASGI the chunks are handed to the server as an async iterator, which
+        Django would otherwise buffer whole.
+        """
+        output = request.query_params.get("output", "ndjson").lower()
+        if output not in EXPORT_FORMATS:
+            raise ValidationError(f"Output must be one of: {', '.join(EXPORT_FORMATS)}.")
+        
+        render, content_type, filename = EXPORT_FORMATS[output]
+        queryset = self.filter_queryset(self.get_queryset())
+        content = render(queryset, self.get_requested_fields())
+        if isinstance(request._request, ASGIRequest):
+            content = aiter_chunks(content)
+        response = StreamingHttpResponse(content, content_type=f"{content_type}; charset=utf-8")
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+    
+    
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """Apply a batch of upserts and soft-deletes in one transaction.
+        
+        Request body:
+            upsert: Country objects keyed by id or cca2; unknown cca2 creates.
+            delete: Ids, cca2 codes or objects carrying either.
+        
+        Returns 200 when every item succeeded and 207 Multi-Status otherwise,
+        with one result per item. Invalid items are skipped, valid ones applied.
+        """
+        upserts = request.data.get("upsert", []) if isinstance(request.data, dict) else None
+        deletes = request.data.get("delete", []) if isinstance(request.data, dict) else None
+        if not isinstance(upserts, list) or not isinstance(deletes, list):
+            raise ValidationError("Body must be an object with 'upsert' and/or 'delete' lists.")
+        if not upserts and not deletes:
+            raise ValidationError("At least one upsert or delete is required.")
+        if len(upserts) + len(deletes) > MAX_BULK_ITEMS:
+            raise ValidationError(f"A batch can contain at most {MAX_BULK_ITEMS} items.")
+        
+        results = apply_bulk_changes(upserts, deletes)
+        summary = Counter(result["status"] for result in results)
+        return Response({
+            "created": summary["created"],
+            "updated": summary["updated"],
+            "deleted": summary["deleted"],
+            "errors": summary["error"],
+            "results": results,
+        }, status=status.HTTP_207_MULTI_STATUS if summary["error"] else status.HTTP_200_OK)
+    
+    
     def destroy(self, request, *args, **kwargs):
         """Soft delete a country by settings is_active=False.
         
@@ -0,0 +1,28 @@
+import hmac
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import require_GET
+from api.utils.metrics import render_metrics
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def scrape_allowed(request):
+    """Allow scrapes bearing METRICS_TOKEN, or from METRICS_ALLOWED_IPS without one."""
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token:
+        return hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}")
+    return request.META.get("REMOTE_ADDR") in getattr(settings, "METRICS_ALLOWED_IPS", ())
+
+
+@require_GET
+def metrics(request):
+    """Expose the host-wide metrics in the Prometheus text format.
+    
+    The values are aggregated over all worker processes of the host, so any
+    worker can answer the scrape.
+    """
+    if not scrape_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'countries_info_app.settings')
+# Country reads are served by the native async views under ASGI
+os.environ.setdefault('COUNTRIES_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 from datetime import timedelta
 
@@ -32,6 +33,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -66,20 +68,25 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle',
+        'api.throttling.SharedAnonRateThrottle',
+        'api.throttling.SharedUserRateThrottle',
         
     ],
+    # Overridable per deployment, e.g. raised on a server being load tested
     'DEFAULT_THROTTLE_RATES': {
-        'anon': '100/day',
-        'user': '1000/day',
-        'countries': '10/minute',
+        'anon': os.environ.get('COUNTRIES_THROTTLE_ANON_RATE', '100/day'),
+        'user': os.environ.get('COUNTRIES_THROTTLE_USER_RATE', '1000/day'),
+        'countries': os.environ.get('COUNTRIES_THROTTLE_RATE', '10/minute'),
     }
 }
 
@@ -93,8 +100,30 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
+    'TOKEN_REFRESH_SERIALIZER': 'api.serializers.auth.RevocableTokenRefreshSerializer',
 }
 
+# Seconds a user row loaded by CachedUserJWTAuthentication (country reads) is
+# reused without a database query. User changes made in the same process are
+# applied immediately; other processes see them within this window.
+JWT_USER_CACHE_TTL = 60
+JWT_USER_CACHE_MAX_ENTRIES = 10000
+
+# Refresh token revocation (api.utils.revocation). Blacklisted jtis are held in
+# an in-process Bloom filter synced from the blacklist tables every
+# TOKEN_REVOCATION_SYNC_INTERVAL seconds; expired tokens are pruned in batches
+# of TOKEN_REVOCATION_PRUNE_BATCH every TOKEN_REVOCATION_PRUNE_INTERVAL seconds.
+TOKEN_REVOCATION_SYNC_INTERVAL = 1.0
+TOKEN_REVOCATION_ERROR_RATE = 0.001
+TOKEN_REVOCATION_PRUNE_INTERVAL = 3600
+TOKEN_REVOCATION_PRUNE_BATCH = 1000
+
+# Throttle state (api.throttling) is shared by all worker processes on the
+# host through this SQLite database; idle buckets are pruned every
+# THROTTLE_PRUNE_INTERVAL seconds.
+THROTTLE_DB_PATH = BASE_DIR / 'var' / 'throttle.sqlite3'
+THROTTLE_PRUNE_INTERVAL = 300
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -106,6 +135,124 @@ DATABASES = {
     }
 }
 
+# COUNTRIES_DB_PROFILE=production tunes SQLite for concurrent serving: WAL (readers
+# never wait for the sync job's write transaction and vice versa), pragmas
+# applied on connect, persistent connections and IMMEDIATE write transactions
+# (writers queue on busy_timeout instead of failing on lock upgrade).
+# COUNTRIES_DB_READ_ROUTING=1 additionally sends reads of the api models to a
+# query_only 'reader' connection (see api.routers).
+DATABASE_PROFILE = os.environ.get('COUNTRIES_DB_PROFILE', 'default')
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -65536,
+    'mmap_size': 268435456,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+
+if DATABASE_PROFILE == 'production':
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': ''.join(f'PRAGMA {name}={value};' for name, value in SQLITE_PRAGMAS.items()),
+            'transaction_mode': 'IMMEDIATE',
+        },
+    })
+    if os.environ.get('COUNTRIES_DB_READ_ROUTING', '') == '1':
+        reader_pragmas = {name: value for name, value in SQLITE_PRAGMAS.items() if name != 'journal_mode'}
+        DATABASES['reader'] = {
+            **DATABASES['default'],
+            'OPTIONS': {
+                'init_command': ''.join(
+                    f'PRAGMA {name}={value};' for name, value in {**reader_pragmas, 'query_only': 'ON'}.items()
+                ),
+            },
+            'TEST': {'MIRROR': 'default'},
+        }
+        DATABASE_ROUTERS = ['api.routers.ReadConnectionRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# The "countries" alias holds serialized country list pages. Entries expire after
+# TIMEOUT seconds and the least recently used ones are evicted past MAX_ENTRIES.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'countries': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'countries',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 1000,
+            'CULL_FREQUENCY': 10,
+        },
+    },
+}
+
+# The data version the 'countries' pages are keyed on is shared by all worker
+# processes on the host through this SQLite database, so a write in any of
+# them (or in a management command) invalidates every process's pages.
+COUNTRIES_VERSION_DB_PATH = BASE_DIR / 'var' / 'versions.sqlite3'
+
+
+# Upstream countries feed
+# COUNTRIES_API_URL may also be a local file path (or file:// URL) or a local
+# stand-in server. The last good payload is kept in COUNTRIES_SNAPSHOT_DIR and
+# used when the upstream is slower than the timeouts below or unreachable.
+
+COUNTRIES_API_URL = 'https://restcountries.com/v3.1/all'
+COUNTRIES_SNAPSHOT_DIR = BASE_DIR / 'var' / 'snapshots'
+COUNTRIES_FETCH_TIMEOUT = 10
+COUNTRIES_FETCH_DEADLINE = 120
+
+# Per-request instrumentation (api.middleware.RequestInstrumentationMiddleware):
+# query count, SQL / auth / lookup / count / serialize / render / total time as
+# a Server-Timing header and a JSON line on the "api.requests" logger. Requests
+# over the query budget or repeating one SQL statement at least the threshold
+# number of times (N+1) are logged as warnings.
+REQUEST_SERVER_TIMING = True
+REQUEST_QUERY_BUDGET = 20
+REQUEST_REPEATED_QUERY_THRESHOLD = 5
+
+# Prometheus metrics (GET /metrics), aggregated over the worker processes of
+# the host through a shared SQLite file written by each process every
+# METRICS_FLUSH_INTERVAL seconds. Scrapes must send "Authorization: Bearer
+# <METRICS_TOKEN>" when a token is set, otherwise come from METRICS_ALLOWED_IPS.
+METRICS_DB_PATH = BASE_DIR / 'var' / 'metrics.sqlite3'
+METRICS_FLUSH_INTERVAL = 1.0
+METRICS_TOKEN = os.environ.get('COUNTRIES_METRICS_TOKEN', '')
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api': {
+            'handlers': ['console'],
+            'level': os.environ.get('COUNTRIES_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+        'api.requests': {
+            'handlers': ['console'],
+            'level': os.environ.get('COUNTRIES_REQUEST_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+# Serve country reads (list, retrieve, suggest) with the native async views.
+# asgi.py turns this on for ASGI deployments; WSGI workers keep the sync views.
+COUNTRIES_ASYNC_VIEWS = os.environ.get('COUNTRIES_ASYNC_VIEWS', '') == '1'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators